@@ -42,6 +42,18 @@ class Catalog(object):
     @param comments     The character used to indicate the start of a comment in an
                         ASCII catalog.  [default: '#']
     @param hdu          Which hdu to use for FITS files.  [default: 1]
+    @param cache        For ASCII catalogs, whether to save the parsed columns (and the typed
+                        columns if `typed=True`) in a binary file `file_name + '.npz'` next to
+                        the catalog.  Later Catalogs made from the same file load the columns
+                        from this file rather than parsing the text again, which is much faster
+                        for large catalogs.  The binary file is rebuilt if the catalog file's
+                        size or modification time changes, or if `comments` is different.
+                        [default: False]
+    @param typed        For ASCII catalogs, whether to also convert each column to the type that
+                        can hold all its values: int if they are all integers that fit in an int64,
+                        otherwise float if they can all be parsed as floats, otherwise str.  Then
+                        get() returns values of that type, and getFloat() and getInt() don't need
+                        to parse the string again for each access.  [default: False]
 
     Attributes
     ----------
@@ -52,18 +64,20 @@ class Catalog(object):
         ncols      The number of columns in the catalog.
         isfits     Whether the catalog is a fits catalog.
         names      For a fits catalog, the valid column names.
+        data       For an ASCII catalog, a 2-d NumPy array of str with the values.
 
     """
     _req_params = { 'file_name' : str }
-    _opt_params = { 'dir' : str , 'file_type' : str , 'comments' : str , 'hdu' : int }
+    _opt_params = { 'dir' : str , 'file_type' : str , 'comments' : str , 'hdu' : int ,
+                    'cache' : bool , 'typed' : bool }
     _single_params = []
     _takes_rng = False
 
     # _nobjects_only is an intentionally undocumented kwarg that should be used only by
     # the config structure.  It indicates that all we care about is the nobjects parameter.
     # So skip any other calculations that might normally be necessary on construction.
-    def __init__(self, file_name, dir=None, file_type=None, comments='#', hdu=1,
-                 _nobjects_only=False):
+    def __init__(self, file_name, dir=None, file_type=None, comments='#', hdu=1, cache=False,
+                 typed=False, _nobjects_only=False):
 
         # First build full file_name
         self.file_name = file_name.strip()
@@ -84,6 +98,8 @@ class Catalog(object):
         self.file_type = file_type
         self.comments = comments
         self.hdu = hdu
+        self.cache = cache
+        self.typed = typed
 
         if file_type == 'FITS':
             self.readFits(hdu, _nobjects_only)
@@ -100,6 +116,10 @@ class Catalog(object):
     def readAscii(self, comments, _nobjects_only=False):
         """Read in an input catalog from an ASCII file.
         """
+        cache_file = self.file_name + '.npz'
+        if self.cache and self._readAsciiCache(cache_file, comments, _nobjects_only):
+            return
+
         # If all we care about is nobjects, this is quicker:
         if _nobjects_only:
             # See the script devel/testlinecounting.py that tests several possibilities.
@@ -113,23 +133,82 @@ class Catalog(object):
                     self.nobjects = sum(1 for line in f if not line.startswith(comments))
             return
 
-        # Read in the data using the numpy convenience function
         # Note: we leave the data as str, rather than convert to float, so that if
         # we have any str fields, they don't give an error here.  They'll only give an
         # error if one tries to convert them to float at some point.
-        self.data = np.loadtxt(self.file_name, comments=comments, dtype=bytes)
-        # Convert the bytes to str.  For Py2, this is a no op.
-        self.data = self.data.astype(str)
+        self.data = _parseAscii(self.file_name, comments)
+        self._finishAscii()
 
-        # If only one row, then the shape comes in as one-d.
-        if len(self.data.shape) == 1:
-            self.data = self.data.reshape(1, -1)
-        if len(self.data.shape) != 2:
-            raise IOError('Unable to parse the input catalog as a 2-d array')
+        if self.cache:
+            self._writeAsciiCache(cache_file, comments)
 
+    def _readAsciiCache(self, cache_file, comments, _nobjects_only):
+        # Load the columns from the cache file if it was made from the current version of the
+        # catalog with the same comments.  Returns whether this worked.
+        if not os.path.isfile(cache_file):
+            return False
+        try:
+            with np.load(cache_file) as cache:
+                if (str(cache['comments']) != comments or
+                        int(cache['size']) != os.path.getsize(self.file_name) or
+                        float(cache['mtime']) != os.path.getmtime(self.file_name)):
+                    return False
+                nobjects, ncols = [ int(n) for n in cache['shape'] ]
+                if _nobjects_only:
+                    self.nobjects = nobjects
+                    return True
+                str_cols = [ cache['str%d'%icol] for icol in range(ncols) ]
+                if self.typed and 'typed0' in cache.files:
+                    columns = [ cache['typed%d'%icol] for icol in range(ncols) ]
+                else:
+                    columns = None
+        except (IOError, OSError, ValueError, KeyError):  # pragma: no cover
+            # Maybe an old or partial file.  Just remake it.
+            return False
+        self.data = np.column_stack([ col.astype(str) for col in str_cols ])
+        self._finishAscii(columns)
+        if self.typed and columns is None:
+            # Add the typed columns to the cache file for next time.
+            self._writeAsciiCache(cache_file, comments)
+        return True
+
+    def _writeAsciiCache(self, cache_file, comments):
+        # Save each column as its own array, so a column of short values doesn't take as much
+        # space as the widest one.  The str columns are stored as bytes if they are all ASCII,
+        # which is 4 times smaller than numpy's unicode str type.  If the catalog is typed, the
+        # converted columns are saved too.
+        arrays = { 'comments' : np.array(comments),
+                   'size' : np.array(os.path.getsize(self.file_name)),
+                   'mtime' : np.array(os.path.getmtime(self.file_name)),
+                   'shape' : np.array(self.data.shape) }
+        for icol in range(self.ncols):
+            col = self.data[:,icol]
+            try:
+                col = col.astype(np.bytes_)
+            except UnicodeError:  # pragma: no cover
+                pass
+            arrays['str%d'%icol] = col
+            if self.typed:
+                arrays['typed%d'%icol] = self._columns[icol]
+        # Write to a temporary file and then rename it, so other processes never see a
+        # partially written file.  If we can't write it, just don't bother with the cache.
+        tmp_name = cache_file + '.%d.tmp'%os.getpid()
+        try:
+            with open(tmp_name, 'wb') as fout:
+                np.savez(fout, **arrays)
+            os.rename(tmp_name, cache_file)
+        except (IOError, OSError):  # pragma: no cover
+            if os.path.isfile(tmp_name):
+                os.remove(tmp_name)
+
+    def _finishAscii(self, columns=None):
         self.nobjects = self.data.shape[0]
         self.ncols = self.data.shape[1]
         self.isfits = False
+        if self.typed:
+            if columns is None:
+                columns = [ _typedColumn(self.data[:,icol]) for icol in range(self.ncols) ]
+            self._columns = columns
 
     def readFits(self, hdu, _nobjects_only=False):
         """Read in an input catalog from a FITS file.
@@ -158,8 +237,10 @@ class Catalog(object):
         For ASCII catalogs, `col` is the column number.
         For FITS catalogs, `col` is a string giving the name of the column in the FITS table.
 
-        Also, for ASCII catalogs, the "native type" is always str.  For FITS catalogs, it is
-        whatever type is specified for each field in the binary table.
+        Also, for ASCII catalogs, the "native type" is str, unless the catalog was made with
+        `typed=True`, in which case it is int, float or str, depending on what all the values in
+        the column can be parsed as.  For FITS catalogs, it is whatever type is specified for each
+        field in the binary table.
         """
         if self.isfits:
             if col not in self.names:
@@ -175,6 +256,8 @@ class Catalog(object):
                 raise IndexError("Column %d is invalid for catalog %s"%(icol,self.file_name))
             if index < 0 or index >= self.nobjects:
                 raise IndexError("Object %d is invalid for catalog %s"%(index,self.file_name))
+            if self.typed:
+                return self._columns[icol][index]
             return self.data[index, icol]
 
     def getFloat(self, index, col):
@@ -193,6 +276,8 @@ class Catalog(object):
             s += ', comments=%r'%self.comments
         if self.hdu != 1:
             s += ', hdu=%r'%self.hdu
+        if self.typed:
+            s += ', typed=True'
         s += ')'
         return s
 
@@ -203,6 +288,53 @@ class Catalog(object):
     def __hash__(self): return hash(repr(self))
 
 
+def _parseAscii(file_name, comments, chunk_size=100000):
+    """Parse an ASCII catalog into a 2-d NumPy array of str.
+
+    The file is read `chunk_size` lines at a time, and each chunk is split into tokens all at
+    once, which is much faster than np.loadtxt, without holding the whole text in memory as
+    Python strings.
+    """
+    from itertools import islice
+    chunks = []
+    ncols = None
+    with open(file_name) as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if len(lines) == 0:
+                break
+            lines = [ line.split(comments,1)[0] for line in lines ]
+            lines = [ line for line in lines if line.strip() ]
+            if len(lines) == 0:
+                continue
+            if ncols is None:
+                ncols = len(lines[0].split())
+            tokens = ' '.join(lines).split()
+            if ncols == 0 or len(tokens) != ncols * len(lines):
+                raise IOError('Unable to parse the input catalog as a 2-d array')
+            chunks.append(np.array(tokens, dtype=str).reshape(len(lines), ncols))
+    if len(chunks) == 0:
+        raise IOError('Unable to parse the input catalog as a 2-d array')
+    return np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+
+def _typedColumn(col):
+    """Convert a column of str values to int64 if they are all integers, or to float if they all
+    parse as floats.  Otherwise, return it unchanged.
+
+    Integers that don't fit in an int64 are left as str, rather than losing precision as floats.
+    """
+    try:
+        return col.astype(np.int64)
+    except OverflowError:
+        return col
+    except ValueError:
+        pass
+    try:
+        return col.astype(float)
+    except ValueError:
+        return col
+
+
 class Dict(object):
     """A class that reads a python dict from a file.
 
@@ -366,6 +498,18 @@ class OutputCatalog(object):
     Each row corresponds to a different object, and each column stores some item of
     information about that object (e.g. flux or half_light_radius).
 
+    The values are stored in typed NumPy arrays, one for each output column, which grow as
+    needed when rows are added.  So even catalogs with many millions of rows do not take much
+    more memory than the numbers themselves.  For very large catalogs, you can also use
+    openFile() to write the catalog to a file in chunks as it is built, rather than keeping it
+    all in memory until the end:
+
+        >>> cat = galsim.OutputCatalog(names, types)
+        >>> cat.openFile('truth.fits', chunk_size=100000)
+        >>> for obj_num in range(nobj):
+        ...     cat.addRow(row)
+        >>> cat.close()
+
     Note: no type checking is done when the data are added in addRow().  It is up to
     the user to make sure that the values added for each row are compatible with the
     types given here in the `types` parameter.
@@ -386,7 +530,7 @@ class OutputCatalog(object):
         ncols       The number of columns in the catalog.
         names       The names of the columns.
         types       The types of the columns.
-        rows        The rows of data that have been accumulated so far.
+        rows        The rows of data that are currently in memory.
 
     """
     # Watch out for this "Gotcha".  Using _rows=[] as the default argument doesn't work!
@@ -394,42 +538,148 @@ class OutputCatalog(object):
     def __init__(self, names, types=None, _rows=(), _sort_keys=()):
         self.names = names
         if types is None:
-            self.types = [ float for i in names ]
-        else:
-            self.types = types
-        self.rows = list(_rows)
-        self.sort_keys = list(_sort_keys)
+            types = [ float for i in names ]
+        self._stream = None
+        self._nflushed = 0
+        self.setTypes(types)
+        _sort_keys = list(_sort_keys)
+        for i, row in enumerate(_rows):
+            self.addRow(row, _sort_keys[i] if i < len(_sort_keys) else None)
 
     @property
-    def nobjects(self): return len(self.rows)
+    def nobjects(self): return self._nflushed + self._nrows
     @property
     def ncols(self): return len(self.names)
 
+    @property
+    def rows(self):
+        return [ self._getRow(i) for i in range(self._nrows) ]
+
+    @property
+    def sort_keys(self):
+        if self._sort_keys is None:
+            return list(range(self._nflushed + 1, self.nobjects + 1))
+        else:
+            return list(self._sort_keys)
+
     # Again, when we use this through a proxy, we need getters for the attributes.
     def getNames(self): return self.names
     def getTypes(self): return self.types
-    def setTypes(self, types): self.types = types
     def getNObjects(self): return self.nobjects
     def getNCols(self): return self.ncols
 
+    def setTypes(self, types):
+        """Set the types of the columns.
+
+        Any rows that are already in the catalog are converted to the new types.
+        """
+        if self._nflushed > 0:
+            raise RuntimeError("Cannot change the types after rows have been written to a file.")
+        rows = self.rows if hasattr(self, '_columns') else []
+        sort_keys = self._sort_keys if hasattr(self, '_sort_keys') else None
+        self.types = types
+
+        # The kind of each input column, and the names and dtypes of the output columns.
+        self._kinds = []
+        self._out_names = []
+        self._out_types = []
+        for name, t in zip(self.names, types):
+            name = str(name)  # numpy will barf if the name is a unicode string
+            if t in _output_kinds:
+                kind = t
+                suffixes, out_type, _ = _output_kinds[t]
+            else:
+                dt = np.dtype(t) # just used to categorize the type into int, float, str
+                if dt.kind in np.typecodes['AllInteger']:
+                    kind, suffixes, out_type = int, [''], int
+                elif dt.kind in np.typecodes['AllFloat']:
+                    kind, suffixes, out_type = float, [''], float
+                else:
+                    kind, suffixes, out_type = str, [''], object
+            self._kinds.append(kind)
+            self._out_names.extend([ name + s for s in suffixes ])
+            self._out_types.extend([ out_type ] * len(suffixes))
+
+        self._columns = [ np.empty(0, dtype=t) for t in self._out_types ]
+        self._nrows = 0
+        self._sort_keys = None
+        for i, row in enumerate(rows):
+            self.addRow(row, None if sort_keys is None else sort_keys[i])
+
     def addRow(self, row, sort_key=None):
         """Add a row of data to the catalog.
 
         Warning: no type checking is done at this point.  If the values in the row do not
-        match the column types, you may get an error when writing, or you may lose precision,
-        depending on the nature of the mismatch.
+        match the column types, you may get an error when adding the row or writing, or you may
+        lose precision, depending on the nature of the mismatch.
 
         @param row          A list with one item per column in the same order as the names list.
         @param sort_key     If the rows may be added out of order, you can provide a sort_key,
-                            which will be used at the end to re-sort the rows.
+                            which will be used at the end to re-sort the rows.  This is not
+                            allowed after openFile(), since the rows are written in chunks.
         """
         if len(row) != self.ncols:
             raise ValueError("Length of row does not match the number of columns")
-        self.rows.append(tuple(row))
-        if sort_key is None:
-            self.sort_keys.append(self.nobjects)
-        else:
-            self.sort_keys.append(sort_key)
+        if sort_key is not None and self._stream is not None:
+            raise ValueError("Cannot use sort_key when writing the catalog with openFile()")
+        n = self._nrows
+        if self._columns and n == len(self._columns[0]):
+            self._grow()
+        j = 0
+        for kind, val in zip(self._kinds, row):
+            if kind in _output_kinds:
+                for attr in _output_kinds[kind][2]:
+                    self._columns[j][n] = getattr(val, attr)
+                    j += 1
+            else:
+                self._columns[j][n] = str(val) if kind is str else val
+                j += 1
+        self._nrows += 1
+
+        if sort_key is not None:
+            if self._sort_keys is None:
+                self._sort_keys = list(range(self._nflushed + 1, self.nobjects))
+            self._sort_keys.append(sort_key)
+        elif self._sort_keys is not None:
+            self._sort_keys.append(self.nobjects)
+
+        if self._stream is not None and self._nrows >= self._stream['chunk_size']:
+            self._flush()
+
+    def _grow(self):
+        """Increase the size of the column arrays to make room for more rows.
+        """
+        size = max(16, 2*self._nrows)
+        if self._stream is not None:
+            size = min(size, self._stream['chunk_size'])
+        for j, col in enumerate(self._columns):
+            new_col = np.empty(size, dtype=col.dtype)
+            new_col[:self._nrows] = col[:self._nrows]
+            self._columns[j] = new_col
+
+    def _getRow(self, i):
+        """Rebuild row `i` (of the rows in memory) from the column arrays.
+        """
+        row = []
+        j = 0
+        for kind, t in zip(self._kinds, self.types):
+            if kind in _output_kinds:
+                suffixes, out_type, _ = _output_kinds[kind]
+                nout = len(suffixes)
+                vals = [ out_type(self._columns[j+k][i]) for k in range(nout) ]
+                if kind == galsim.Angle:
+                    row.append(vals[0] * galsim.radians)
+                elif kind == galsim.Shear:
+                    row.append(galsim.Shear(g1=vals[0], g2=vals[1]))
+                else:
+                    row.append(kind(*vals))
+                j += nout
+            else:
+                val = self._columns[j][i]
+                # Use the original type if possible, e.g. so bool columns give bools.
+                row.append(val if kind is str else t(val) if isinstance(t, type) else kind(val))
+                j += 1
+        return tuple(row)
 
     def write(self, file_name, dir=None, file_type=None, prec=8):
         """Write the catalog to a file.
@@ -441,73 +691,144 @@ class OutputCatalog(object):
                             extension]
         @param prec         Output precision for ASCII. [default: 8]
         """
-        if dir is not None:
-            import os
-            file_name = os.path.join(dir,file_name)
-
-        # Figure out which file type the catalog is
-        if file_type is None:
-            import os
-            name, ext = os.path.splitext(file_name)
-            if ext.lower().startswith('.fit'):
-                file_type = 'FITS'
-            else:
-                file_type = 'ASCII'
-        file_type = file_type.upper()
-        if file_type not in ['FITS', 'ASCII']:
-            raise ValueError("file_type must be either FITS or ASCII if specified.")
-
+        file_name, file_type = _parse_output_file(file_name, dir, file_type)
         if file_type == 'FITS':
             self.writeFits(file_name)
         elif file_type == 'ASCII':
             self.writeAscii(file_name, prec)
-        else:
+        else:  # pragma: no cover  (_parse_output_file already checked this)
             raise ValueError("Invalid file_type %s"%file_type)
 
-    def makeData(self):
-        """Returns a numpy array of the data as it should be written to an output file.
+    def openFile(self, file_name, dir=None, file_type=None, prec=8, chunk_size=100000):
+        """Start writing the catalog to a file in chunks, rather than keeping it in memory.
+
+        After this call, each time `chunk_size` rows have been added with addRow(), they are
+        written to the file and removed from memory.  Call close() after adding the last row
+        to write any remaining rows and finish the file.
+
+        For ASCII files, the rows are written directly to the output file.  For FITS files, the
+        width of string columns isn't known until the end, so the chunks are written to a
+        temporary file, which is converted into the final (uncompressed) FITS binary table by
+        close().  Either way, only one chunk is in memory at a time.
+
+        @param file_name    The name of the file to write to.
+        @param dir          Optionally a directory name can be provided if `file_name` does not
+                            already include it. [default: None]
+        @param file_type    Which kind of file to write to. [default: determine from the file_name
+                            extension]
+        @param prec         Output precision for ASCII. [default: 8]
+        @param chunk_size   The number of rows to keep in memory before writing them.
+                            [default: 100000]
+        """
+        if self._stream is not None:
+            raise RuntimeError("This OutputCatalog is already being written to a file.")
+        file_name, file_type = _parse_output_file(file_name, dir, file_type)
+        if file_type == 'FITS' and os.path.splitext(file_name)[1] in ['.gz', '.bz2']:
+            raise ValueError("Cannot write compressed FITS files in chunks.")
+        self._stream = { 'file_name' : file_name, 'file_type' : file_type,
+                         'chunk_size' : int(chunk_size) }
+        if file_type == 'ASCII':
+            fid = open(file_name, 'w')
+            header, fmt = _ascii_format(self._out_names, self._out_types, prec)
+            fid.write('# ' + header + '\n')
+            self._stream['fmt'] = fmt
+        else:
+            fid = open(file_name + '.%d.tmp'%os.getpid(), 'w+b')
+            self._stream['str_len'] = [ 1 ] * len(self._out_names)
+        self._stream['fid'] = fid
+        if self._nrows >= self._stream['chunk_size']:
+            self._flush()
+
+    def _flush(self):
+        """Write the rows in memory to the file given in openFile().
+        """
+        if self._nrows == 0: return
+        data = self.makeData()
+        if self._stream['file_type'] == 'ASCII':
+            np.savetxt(self._stream['fid'], data, fmt=self._stream['fmt'])
+        else:
+            np.save(self._stream['fid'], data)
+            str_len = self._stream['str_len']
+            for j, name in enumerate(data.dtype.names):
+                dt = data.dtype[name]
+                if dt.kind not in 'if':
+                    # For str (unicode) arrays, the itemsize is 4 bytes per character.
+                    n = dt.itemsize // 4 if dt.kind == 'U' else dt.itemsize
+                    str_len[j] = max(str_len[j], n)
+        self._nflushed += self._nrows
+        self._nrows = 0
+        self._sort_keys = None
+
+    def close(self):
+        """Finish writing the catalog to the file given in openFile().
         """
-        cols = zip(*self.rows)
+        if self._stream is None: return
+        self._flush()
+        stream = self._stream
+        self._stream = None
+        if stream['file_type'] == 'ASCII':
+            stream['fid'].close()
+        else:
+            self._writeFitsChunks(stream)
 
+    def _writeFitsChunks(self, stream):
+        """Convert the chunks in the temporary file into the final FITS binary table.
+        """
+        from galsim._pyfits import pyfits
+        # Make the table header from an empty table with the final column formats.
         dtypes = []
-        new_cols = []
-        for col, name, t in zip(cols, self.names, self.types):
-            name = str(name)  # numpy will barf if the name is a unicode string
-            dt = np.dtype(t) # just used to categorize the type into int, float, str
-            if dt.kind in np.typecodes['AllInteger']:
-                dtypes.append( (name, int) )
-                new_cols.append(col)
-            elif dt.kind in np.typecodes['AllFloat']:
-                dtypes.append( (name, float) )
-                new_cols.append(col)
-            elif t == galsim.Angle:
-                dtypes.append( (name + ".rad", float) )
-                new_cols.append( [ val.rad for val in col ] )
-            elif t == galsim.PositionI:
-                dtypes.append( (name + ".x", int) )
-                dtypes.append( (name + ".y", int) )
-                new_cols.append( [ val.x for val in col ] )
-                new_cols.append( [ val.y for val in col ] )
-            elif t == galsim.PositionD:
-                dtypes.append( (name + ".x", float) )
-                dtypes.append( (name + ".y", float) )
-                new_cols.append( [ val.x for val in col ] )
-                new_cols.append( [ val.y for val in col ] )
-            elif t == galsim.Shear:
-                dtypes.append( (name + ".g1", float) )
-                dtypes.append( (name + ".g2", float) )
-                new_cols.append( [ val.g1 for val in col ] )
-                new_cols.append( [ val.g2 for val in col ] )
+        for name, t, n in zip(self._out_names, self._out_types, stream['str_len']):
+            if t is object:
+                dtypes.append( (name, 'S%d'%n) )
             else:
-                col = [ str(s).encode() for s in col ]
-                maxlen = np.max([ len(s) for s in col ])
+                dtypes.append( (name, t) )
+        hdu = _make_table_hdu(np.empty(0, dtype=dtypes))
+        hdu.header['NAXIS2'] = self._nflushed
+        fits_dtype = hdu.data.dtype
+
+        tmp_fid = stream['fid']
+        tmp_fid.seek(0)
+        with open(stream['file_name'], 'wb') as fout:
+            fout.write(pyfits.PrimaryHDU().header.tostring().encode())
+            fout.write(hdu.header.tostring().encode())
+            nbytes = 0
+            nrows = 0
+            while nrows < self._nflushed:
+                chunk = np.load(tmp_fid)
+                out = np.empty(len(chunk), dtype=fits_dtype)
+                for name in chunk.dtype.names:
+                    out[name] = chunk[name]
+                fout.write(out.tobytes())
+                nbytes += out.nbytes
+                nrows += len(chunk)
+            # FITS files are made of 2880-byte blocks.  Pad the data with zeros to fill the last.
+            if nbytes % 2880 != 0:
+                fout.write(b'\0' * (2880 - nbytes % 2880))
+        tmp_fid.close()
+        os.remove(tmp_fid.name)
+
+    def makeData(self):
+        """Returns a numpy array of the data as it should be written to an output file.
+
+        If the catalog is being written with openFile(), this only includes the rows that are
+        currently in memory.
+        """
+        n = self._nrows
+        dtypes = []
+        for name, t, col in zip(self._out_names, self._out_types, self._columns):
+            if t is object:
+                maxlen = np.max([ len(s.encode()) for s in col[:n] ]) if n > 0 else 1
                 dtypes.append( (name, str, maxlen) )
-                new_cols.append(col)
+            else:
+                dtypes.append( (name, t) )
 
-        data = np.array(list(zip(*new_cols)), dtype=dtypes)
+        data = np.empty(n, dtype=dtypes)
+        for name, col in zip(self._out_names, self._columns):
+            data[name] = col[:n]
 
-        sort_index = np.argsort(self.sort_keys)
-        data = data[sort_index]
+        if self._sort_keys is not None:
+            sort_index = np.argsort(self._sort_keys)
+            data = data[sort_index]
 
         return data
 
@@ -517,23 +838,11 @@ class OutputCatalog(object):
         @param file_name    The name of the file to write to.
         @param prec         Output precision for floats. [default: 8]
         """
+        if self._stream is not None:
+            raise RuntimeError("This OutputCatalog is being written to %s"%(
+                               self._stream['file_name']))
         data = self.makeData()
-
-        width = prec+8
-        header_form = ""
-        for i in range(len(data.dtype.names)):
-            header_form += "{%d:^%d} "%(i,width)
-        header = header_form.format(*data.dtype.names)
-
-        fmt = []
-        for name in data.dtype.names:
-            dt = data.dtype[name]
-            if dt.kind in np.typecodes['AllInteger']:
-                fmt.append('%%%dd'%(width))
-            elif dt.kind in np.typecodes['AllFloat']:
-                fmt.append('%%%d.%de'%(width,prec))
-            else:
-                fmt.append('%%%ds'%(width))
+        header, fmt = _ascii_format(self._out_names, self._out_types, prec)
 
         try:
             np.savetxt(file_name, data, fmt=fmt, header=header)
@@ -559,28 +868,10 @@ class OutputCatalog(object):
         # Note to developers: Because of problems with pickling in older pyfits versions, this
         # code is duplicated in galsim/config/extra_truth.py, BuildTruthHDU.  If you change
         # this function, you should update BuildTruthHDU as well.
-        from galsim._pyfits import pyfits
-
-        data = self.makeData()
-
-        cols = []
-        for name in data.dtype.names:
-            dt = data.dtype[name]
-            if dt.kind in np.typecodes['AllInteger']:
-                cols.append(pyfits.Column(name=name, format='J', array=data[name]))
-            elif dt.kind in np.typecodes['AllFloat']:
-                cols.append(pyfits.Column(name=name, format='D', array=data[name]))
-            else:
-                cols.append(pyfits.Column(name=name, format='%dA'%dt.itemsize, array=data[name]))
-
-        cols = pyfits.ColDefs(cols)
-
-        # Depending on the version of pyfits, one of these should work:
-        try:
-            tbhdu = pyfits.BinTableHDU.from_columns(cols)
-        except AttributeError:  # pragma: no cover
-            tbhdu = pyfits.new_table(cols)
-        return tbhdu
+        if self._stream is not None:
+            raise RuntimeError("This OutputCatalog is being written to %s"%(
+                               self._stream['file_name']))
+        return _make_table_hdu(self.makeData())
 
     def __repr__(self):
         def make_type_str(t):
@@ -599,3 +890,80 @@ class OutputCatalog(object):
     def __ne__(self, other): return not self.__eq__(other)
     def __hash__(self): return hash(repr(self))
 
+    def __getstate__(self):
+        if self._stream is not None:
+            raise RuntimeError("Cannot pickle an OutputCatalog that is being written to a file.")
+        return self.__dict__
+
+
+# The types of OutputCatalog columns that are written as more than one output column, along
+# with the suffixes for the output column names, the output type, and the attributes to use.
+_output_kinds = {
+    galsim.Angle : ([ '.rad' ], float, [ 'rad' ]),
+    galsim.PositionI : ([ '.x', '.y' ], int, [ 'x', 'y' ]),
+    galsim.PositionD : ([ '.x', '.y' ], float, [ 'x', 'y' ]),
+    galsim.Shear : ([ '.g1', '.g2' ], float, [ 'g1', 'g2' ]),
+}
+
+def _parse_output_file(file_name, dir, file_type):
+    """Get the full file name and the file type for writing an OutputCatalog.
+    """
+    if dir is not None:
+        file_name = os.path.join(dir,file_name)
+
+    # Figure out which file type the catalog is
+    if file_type is None:
+        name, ext = os.path.splitext(file_name)
+        if ext.lower().startswith('.fit'):
+            file_type = 'FITS'
+        else:
+            file_type = 'ASCII'
+    file_type = file_type.upper()
+    if file_type not in ['FITS', 'ASCII']:
+        raise ValueError("file_type must be either FITS or ASCII if specified.")
+    return file_name, file_type
+
+def _ascii_format(names, types, prec):
+    """Get the header line and the np.savetxt formats for writing an OutputCatalog as ASCII.
+    """
+    width = prec+8
+    header_form = ""
+    for i in range(len(names)):
+        header_form += "{%d:^%d} "%(i,width)
+    header = header_form.format(*names)
+
+    fmt = []
+    for t in types:
+        if t is int:
+            fmt.append('%%%dd'%(width))
+        elif t is float:
+            fmt.append('%%%d.%de'%(width,prec))
+        else:
+            fmt.append('%%%ds'%(width))
+    return header, fmt
+
+def _make_table_hdu(data):
+    """Make a FITS binary table HDU from the output of OutputCatalog.makeData().
+    """
+    from galsim._pyfits import pyfits
+
+    cols = []
+    for name in data.dtype.names:
+        dt = data.dtype[name]
+        if dt.kind in np.typecodes['AllInteger']:
+            cols.append(pyfits.Column(name=name, format='J', array=data[name]))
+        elif dt.kind in np.typecodes['AllFloat']:
+            cols.append(pyfits.Column(name=name, format='D', array=data[name]))
+        else:
+            # For str (unicode) arrays, the itemsize is 4 bytes per character.
+            n = dt.itemsize // 4 if dt.kind == 'U' else dt.itemsize
+            cols.append(pyfits.Column(name=name, format='%dA'%n, array=data[name]))
+
+    cols = pyfits.ColDefs(cols)
+
+    # Depending on the version of pyfits, one of these should work:
+    try:
+        tbhdu = pyfits.BinTableHDU.from_columns(cols)
+    except AttributeError:  # pragma: no cover
+        tbhdu = pyfits.new_table(cols)
+    return tbhdu
@@ -26,6 +26,9 @@ Possible uses include galaxies with color gradients, automatically drawing a giv
 different filters, or implementing wavelength-dependent point spread functions.
 """
 
+import os
+import sys
+import types
 import numpy as np
 
 import galsim
@@ -305,6 +308,8 @@ class ChromaticObject(object):
                                 interpolated SED at that wavelength.  Thus, the flux of the
                                 interpolated object should be correct, at the possible expense of
                                 other features. [default: True]
+        @param nproc            How many processes to use for building the grid of images.  If
+                                `nproc <= 0`, use the number of cpus. [default: 1]
 
         @returns the version of the Chromatic object that uses interpolation
                  (This will be an InterpolatedChromaticObject instance.)
@@ -370,6 +375,17 @@ class ChromaticObject(object):
             >>> integrator = galsim.ContinuousIntegrator(rule=galsim.integ.midptRule, N=100)
             >>> image = chromatic_obj.drawImage(bandpass, integrator=integrator)
 
+        With `method='phot'`, there is no integration over wavelength.  Instead, each photon is
+        given a wavelength drawn from the object's SED times the bandpass throughput, and the
+        chromatic parts of the profile (e.g. the dilation and refraction of a ChromaticAtmosphere)
+        are applied to each photon at its own wavelength.  So the cost scales with the number of
+        photons rather than the number of wavelength samples.  The `integrator` is not used in this
+        case, and the photons in any `surface_ops` or `sensor` have their wavelengths set.
+        Chromatic objects without a specific per-photon implementation are evaluated once at 20
+        wavelengths spanning the bandpass, and each photon is shot from the nearest one.  Passing
+        an `integrator` (or `iimult` for a ChromaticConvolution) with `method='phot'` raises a
+        ValueError.
+
         Finally, this method uses a cache to avoid recomputing the integral over the product of
         the bandpass and object SED when possible (i.e., for separable profiles).  Because the
         cache size is finite, users may find that it is more efficient when drawing many images
@@ -397,6 +413,10 @@ class ChromaticObject(object):
         if self.SED.dimensionless:
             raise ValueError("Can only draw ChromaticObjects with spectral SEDs.")
 
+        if kwargs.get('method', None) == 'phot':
+            _check_phot_args(integrator)
+            return self._drawPhot(bandpass, image, kwargs)
+
         # setup output image using fiducial profile
         wave0, prof0 = self._fiducial_profile(bandpass)
         image = prof0.drawImage(image=image, setup_only=True, **kwargs)
@@ -441,6 +461,32 @@ class ChromaticObject(object):
         self._last_wcs = image.wcs
         return image
 
+    def _drawPhot(self, bandpass, image, kwargs):
+        # Draw the profile with photon shooting, giving each photon its own wavelength.
+        wave0, prof0 = self._fiducial_profile(bandpass)
+        image = prof0.drawImage(image=image, setup_only=True, **kwargs)
+        _remove_setup_kwargs(kwargs)
+        shooter = _ChromaticShooter(self, bandpass, prof0)
+        return shooter.drawImage(image=image, **kwargs)
+
+    # The number of wavelengths at which to evaluate the profile when shooting photons from a
+    # chromatic object that doesn't know how to apply its chromaticity to each photon.
+    _shoot_nwave = 20
+
+    def _shoot_waves(self, waves, ud, cache):
+        """Shoot photons from the (unit-normalized) profile at the given wavelengths.
+
+        @param waves    An array of wavelengths in nanometers, one per photon.
+        @param ud       A UniformDeviate to use for the photon shooting.
+        @param cache    A _ShootCache holding the monochromatic profiles made so far while drawing
+                        the current image.
+
+        @returns x, y, flux arrays for the photons, where the fluxes have a mean of 1.
+        """
+        if type(self) is ChromaticObject:
+            return _shoot_waves(self._obj, waves, ud, cache)
+        return _shoot_at_nodes(self, waves, ud, cache, self._shoot_nwave)
+
     def drawKImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
         """Base implementation for drawing the Fourier transform of a ChromaticObject.
 
@@ -1017,8 +1063,19 @@ class InterpolatedChromaticObject(ChromaticObject):
                             interpolated SED at that wavelength.  Thus, the flux of the interpolated
                             object should be correct, at the possible expense of other features.
                             [default: True]
+    @param nproc            How many processes to use for building the grid of images.  Each
+                            process evaluates and draws the object at a subset of the wavelengths.
+                            If `nproc <= 0`, use the number of cpus. [default: 1]
+
+    Since building the grid of images can be slow, the result can be saved to a file with the
+    `write` method and read back in (e.g. by other processes) with the classmethod
+    `InterpolatedChromaticObject.read`:
+
+        >>> psf = chrom_psf.interpolate(waves, nproc=8)
+        >>> psf.write('psf.fits')
+        >>> psf2 = galsim.InterpolatedChromaticObject.read('psf.fits')
     """
-    def __init__(self, original, waves, oversample_fac=1.0, use_exact_SED=True):
+    def __init__(self, original, waves, oversample_fac=1.0, use_exact_SED=True, nproc=1):
 
         self.waves = np.sort(np.array(waves))
         self.oversample = oversample_fac
@@ -1032,9 +1089,17 @@ class InterpolatedChromaticObject(ChromaticObject):
         # Don't interpolate an interpolation.  Go back to the original.
         self.deinterpolated = original.deinterpolated
 
+        if nproc <= 0:
+            from multiprocessing import cpu_count
+            nproc = cpu_count()
+        nproc = min(nproc, len(self.waves))
+
         # Make the objects between which we are going to interpolate.  Note that these do not have
         # to be saved for later, unlike the images.
-        objs = [ self.deinterpolated.evaluateAtWavelength(wave) for wave in self.waves ]
+        if nproc > 1:
+            objs = _map_chunks(_evaluate_chunk, self.deinterpolated, self.waves, nproc)
+        else:
+            objs = [ self.deinterpolated.evaluateAtWavelength(wave) for wave in self.waves ]
 
         # Find the Nyquist scale for each, and to be safe, choose the minimum value to use for the
         # array of images that is being stored.
@@ -1053,22 +1118,147 @@ class InterpolatedChromaticObject(ChromaticObject):
 
         # Finally, now that we have an image scale and size, draw all the images.  Note that
         # `no_pixel` is used (we want the object on its own, without a pixel response).
-        self.ims = [ obj.drawImage(scale=scale, nx=im_size, ny=im_size, method='no_pixel')
-                     for obj in objs ]
+        if nproc > 1:
+            self.ims = _map_chunks(_draw_chunk, (scale, im_size), objs, nproc)
+        else:
+            self.ims = _draw_chunk(((scale, im_size), objs))
         self.fluxes = [ obj.flux for obj in objs ]
 
+    def write(self, file_name):
+        """Write the grid of images and the other information needed to rebuild this object to a
+        FITS file.
+
+        The primary HDU holds the images as a data cube, with the `oversample_fac` and
+        `use_exact_SED` parameters and the SED type in its header.  The first extension is a binary
+        table with the wavelengths and the corresponding stepk, maxk and flux values.  The second
+        extension is a binary table with the SED tabulated at the wavelengths in its `wave_list`
+        (or on a fine grid over the range of `waves` if it has none) along with a flag marking
+        which of those wavelengths are in the object's `wave_list`.  A constant SED is instead
+        stored as a header value.
+
+        The file can be read back in with the classmethod `InterpolatedChromaticObject.read`.
+
+        @param file_name    The file name of the output FITS file.
+        """
+        from galsim._pyfits import pyfits
+
+        hdu_list = pyfits.HDUList()
+        galsim.fits.writeCube(self.ims, hdu_list=hdu_list)
+        header = hdu_list[0].header
+        header['GS_OVERS'] = self.oversample
+        header['GS_EXSED'] = self.use_exact_SED
+        header['GS_SEPAR'] = self.separable
+        header['GS_SPECT'] = self.SED.spectral
+        if self.SED._const:
+            header['GS_SEDC'] = self.SED(self.waves[0])
+        hdu_list.append(self._makeTable([('wave', self.waves), ('stepk', self.stepk_vals),
+                                         ('maxk', self.maxk_vals), ('flux', self.fluxes)]))
+
+        sed_waves = np.union1d(self.waves, self.wave_list)
+        if not self.SED._const:
+            if len(self.SED.wave_list) > 0:
+                sed_waves = np.union1d(sed_waves, self.SED.wave_list)
+            else:
+                sed_waves = np.union1d(sed_waves, np.linspace(self.waves[0], self.waves[-1],
+                                                              self._sed_nsample))
+        in_list = np.in1d(sed_waves, self.wave_list).astype(np.int16)
+        hdu_list.append(self._makeTable([('wave', sed_waves), ('sed', self.SED(sed_waves)),
+                                         ('in_list', in_list)]))
+        galsim.fits.writeFile(file_name, hdu_list)
+
+    # The number of wavelengths at which to tabulate an SED without a wave_list when writing.
+    _sed_nsample = 1000
+
+    @staticmethod
+    def _makeTable(columns):
+        from galsim._pyfits import pyfits
+        cols = pyfits.ColDefs([ pyfits.Column(name=name, format='I' if name == 'in_list' else 'D',
+                                              array=np.asarray(array))
+                                for name, array in columns ])
+        try:
+            return pyfits.BinTableHDU.from_columns(cols)
+        except AttributeError:  # pragma: no cover  (Might need this for older pyfits versions)
+            return pyfits.new_table(cols)
+
+    @classmethod
+    def read(cls, file_name):
+        """Create an InterpolatedChromaticObject from a file written by its `write` method.
+
+        This is much faster than building the grid of images again.
+
+            >>> psf.write('psf.fits')
+            >>> psf2 = galsim.InterpolatedChromaticObject.read('psf.fits')
+
+        The returned object only holds what was written to the file, so it is not connected to
+        the original (non-interpolated) ChromaticObject any more; its `deinterpolated` attribute
+        is the object itself.  The SED is rebuilt from the tabulated values, using linear
+        interpolation between them unless it was constant.
+
+        @param file_name    The file name of the input FITS file.
+        """
+        from galsim._pyfits import pyfits
+
+        ret = cls.__new__(cls)
+        with pyfits.open(file_name) as fits:
+            ret.ims = galsim.fits.readCube(hdu_list=fits, hdu=0)
+            # Make sure the images don't depend on the file still being open.
+            ret.ims = [ im.copy() for im in ret.ims ]
+            header = fits[0].header
+            ret.oversample = header['GS_OVERS']
+            ret.use_exact_SED = bool(header['GS_EXSED'])
+            ret.separable = bool(header['GS_SEPAR'])
+            flux_type = 'fphotons' if header['GS_SPECT'] else '1'
+            data = fits[1].data
+            ret.waves = np.array(data['wave'], dtype=float)
+            ret.stepk_vals = list(data['stepk'])
+            ret.maxk_vals = list(data['maxk'])
+            ret.fluxes = list(data['flux'])
+            data = fits[2].data
+            sed_waves = np.array(data['wave'], dtype=float)
+            ret.wave_list = sed_waves[np.array(data['in_list'], dtype=bool)]
+            if 'GS_SEDC' in header:
+                ret.SED = galsim.SED(float(header['GS_SEDC']), 'nm', flux_type)
+            else:
+                sed_vals = np.array(data['sed'], dtype=float)
+                ret.SED = galsim.SED(galsim.LookupTable(sed_waves, sed_vals, interpolant='linear'),
+                                     'nm', flux_type)
+
+        ret.interpolated = True
+        ret.deinterpolated = ret
+        ret.file_name = file_name
+        return ret
+
     def __eq__(self, other):
-        return (isinstance(other, galsim.InterpolatedChromaticObject) and
-                self.deinterpolated == other.deinterpolated and
+        if not isinstance(other, galsim.InterpolatedChromaticObject):
+            return False
+        if self.deinterpolated is self or other.deinterpolated is other:
+            # At least one was read from a file, so compare what was stored.
+            return (self.deinterpolated is self and other.deinterpolated is other and
+                    np.array_equal(self.waves, other.waves) and
+                    self.oversample == other.oversample and
+                    self.use_exact_SED == other.use_exact_SED and
+                    self.separable == other.separable and
+                    self.SED == other.SED and
+                    np.array_equal(self.wave_list, other.wave_list) and
+                    self.stepk_vals == other.stepk_vals and
+                    self.maxk_vals == other.maxk_vals and
+                    self.fluxes == other.fluxes and
+                    all(im1 == im2 for im1, im2 in zip(self.ims, other.ims)))
+        return (self.deinterpolated == other.deinterpolated and
                 np.array_equal(self.waves, other.waves) and
                 self.oversample == other.oversample and
                 self.use_exact_SED == other.use_exact_SED)
 
     def __hash__(self):
+        if self.deinterpolated is self:
+            return hash(("galsim.InterpolatedChromaticObject", tuple(self.waves), self.oversample,
+                         self.use_exact_SED, self.SED, tuple(self.fluxes)))
         return hash(("galsim.InterpolatedChromaticObject", self.deinterpolated, tuple(self.waves),
                      self.oversample, self.use_exact_SED))
 
     def __repr__(self):
+        if self.deinterpolated is self:
+            return 'galsim.InterpolatedChromaticObject.read(%r)'%self.file_name
         s = 'galsim.InterpolatedChromaticObject(%r,%r'%(self.deinterpolated, self.waves)
         if self.oversample != 1.0:
             s += ', oversample_fac=%r'%self.oversample
@@ -1078,6 +1268,8 @@ class InterpolatedChromaticObject(ChromaticObject):
         return s
 
     def __str__(self):
+        if self.deinterpolated is self:
+            return 'galsim.InterpolatedChromaticObject.read(%r)'%self.file_name
         return 'galsim.InterpolatedChromaticObject(%s,%s)'%(self.deinterpolated, self.waves)
 
     def _imageAtWavelength(self, wave):
@@ -1245,6 +1437,12 @@ class InterpolatedChromaticObject(ChromaticObject):
         if self.SED.dimensionless:
             raise ValueError("Can only draw ChromaticObjects with spectral SEDs.")
 
+        if kwargs.get('method', None) == 'phot':
+            _check_phot_args(integrator)
+            image = self._drawPhot(bandpass, image, kwargs)
+            self._last_wcs = image.wcs
+            return image
+
         int_im = self._get_interp_image(bandpass, image=image, integrator=integrator, **kwargs)
         image = int_im.drawImage(image=image, **kwargs)
         self._last_wcs = image.wcs
@@ -1417,6 +1615,17 @@ class ChromaticAtmosphere(ChromaticObject):
         """
         return self.build_obj().evaluateAtWavelength(wave)
 
+    def _shoot_waves(self, waves, ud, cache):
+        x, y, flux = _shoot_waves(self.base_obj, waves, ud, cache)
+        scale = (waves/self.base_wavelength)**self.alpha
+        shift = galsim.dcr.get_refraction(waves, self.zenith_angle, **self.kw)
+        shift -= self.base_refraction
+        shift *= galsim.radians / self.scale_unit
+        sinp, cosp = self.parallactic_angle.sincos()
+        x = x * scale - shift * sinp
+        y = y * scale + shift * cosp
+        return x, y, flux
+
 
 class ChromaticTransformation(ChromaticObject):
     """A class for modeling a wavelength-dependent affine transformation of a ChromaticObject
@@ -1472,6 +1681,9 @@ class ChromaticTransformation(ChromaticObject):
 
         if obj.interpolated and self.chromatic:
             import warnings
+            if obj.deinterpolated is obj:
+                raise TypeError("Cannot apply a chromatic transformation to an interpolated "
+                                "ChromaticObject that was read from a file.")
             warnings.warn("Cannot render image with chromatic transformation applied to it "
                           "using interpolation between stored images.  Reverting to "
                           "non-interpolated version.")
@@ -1628,6 +1840,25 @@ class ChromaticTransformation(ChromaticObject):
         return galsim.Transformation(ret, jac=jac, offset=offset, flux_ratio=flux_ratio,
                                      gsparams=self.gsparams)
 
+    def _shoot_waves(self, waves, ud, cache):
+        # The flux_ratio and the determinant of the jacobian are already part of self.SED, which
+        # was used to pick the wavelengths, so only the positions need to be transformed here.
+        x, y, flux = _shoot_waves(self.original, waves, ud, cache)
+        if hasattr(self._jac, '__call__'):
+            jac = _wave_func_values(self._jac, waves)
+            x, y = jac[:,0] * x + jac[:,1] * y, jac[:,2] * x + jac[:,3] * y
+        else:
+            (dudx, dudy), (dvdx, dvdy) = self._jac
+            x, y = dudx * x + dudy * y, dvdx * x + dvdy * y
+        if hasattr(self._offset, '__call__'):
+            offset = _wave_func_values(self._offset, waves)
+            x += offset[:,0]
+            y += offset[:,1]
+        else:
+            x += self._offset[0]
+            y += self._offset[1]
+        return x, y, flux
+
     def drawImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
         """
         See ChromaticObject.drawImage for a full description.
@@ -1658,6 +1889,11 @@ class ChromaticTransformation(ChromaticObject):
         self._last_bp = bandpass
         if self.SED.dimensionless:
             raise ValueError("Can only draw ChromaticObjects with spectral SEDs.")
+        if kwargs.get('method', None) == 'phot':
+            _check_phot_args(integrator)
+            image = self._drawPhot(bandpass, image, kwargs)
+            self._last_wcs = image.wcs
+            return image
         if isinstance(self.original, InterpolatedChromaticObject):
             # Pass self._flux_ratio, which *could* depend on wavelength, to _get_interp_image,
             # where it will be used to reweight the stored images.
@@ -1830,6 +2066,30 @@ class ChromaticSum(ChromaticObject):
         return galsim.Add([obj.evaluateAtWavelength(wave) for obj in self.obj_list],
                           gsparams=self.gsparams)
 
+    def _shoot_waves(self, waves, ud, cache):
+        # At each wavelength, pick the summand for each photon according to its SED there.
+        n = len(waves)
+        seds = np.empty((len(self.obj_list), n))
+        for i, obj in enumerate(self.obj_list):
+            seds[i] = obj.SED(waves)
+        abs_seds = np.abs(seds)
+        tot_abs = np.sum(abs_seds, axis=0)
+        u = np.empty(n)
+        ud.generate(u)
+        index = np.sum(u * tot_abs > np.cumsum(abs_seds, axis=0), axis=0)
+        index = np.minimum(index, len(self.obj_list)-1)
+        x = np.empty(n)
+        y = np.empty(n)
+        flux = np.empty(n)
+        for i, obj in enumerate(self.obj_list):
+            use = index == i
+            if np.any(use):
+                x[use], y[use], flux[use] = _shoot_waves(obj, waves[use], ud, cache)
+                flux[use] *= np.sign(seds[i,use])
+        # If any summands are negative, the photons need to be reweighted.
+        flux *= tot_abs / np.sum(seds, axis=0)
+        return x, y, flux
+
     def drawImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
         """Slightly optimized draw method for ChromaticSum instances.
 
@@ -1859,6 +2119,11 @@ class ChromaticSum(ChromaticObject):
         self._last_bp = bandpass
         if self.SED.dimensionless:
             raise ValueError("Can only draw ChromaticObjects with spectral SEDs.")
+        if kwargs.get('method', None) == 'phot':
+            _check_phot_args(integrator)
+            image = self._drawPhot(bandpass, image, kwargs)
+            self._last_wcs = image.wcs
+            return image
         add_to_image = kwargs.pop('add_to_image', False)
         # Use given add_to_image for the first one, then add_to_image=False for the rest.
         image = self.obj_list[0].drawImage(
@@ -1909,7 +2174,20 @@ class ChromaticConvolution(ChromaticObject):
                             edges.]
     @param gsparams         An optional GSParams argument.  See the docstring for GSParams for
                             details. [default: None]
+
+    The wavelength-integrated 'effective' profiles used by drawImage() (see its docstring) are
+    kept in an in-memory cache, whose size can be changed with resize_effective_prof_cache().  If
+    the class attribute `ChromaticConvolution.cache_dir` is set to the name of a directory, then
+    the images of the effective profiles are also stored there, keyed by a hash of the profile,
+    bandpass and drawing parameters, so they can be reused by other processes and later runs.
+    Once the files in the directory take up more than `ChromaticConvolution.cache_max_bytes`
+    bytes (default 1 GB), the least recently used ones are removed.  Profiles that include
+    something that can't be reproduced in another process (e.g. a lambda function, or an object
+    whose class sets `_reproducible = False`) are never stored on disk.
     """
+    cache_dir = None
+    cache_max_bytes = 1024**3
+
     def __init__(self, *args, **kwargs):
         # First check for number of arguments != 0
         if len(args) == 0:
@@ -1991,6 +2269,21 @@ class ChromaticConvolution(ChromaticObject):
 
     @staticmethod
     def _get_effective_prof(insep_obj, bandpass, iimult, integrator, gsparams, wmult):
+        file_name = _effective_prof_file(insep_obj, bandpass, iimult, integrator, wmult)
+        if file_name is not None and os.path.isfile(file_name):
+            try:
+                effective_prof_image = galsim.fits.read(file_name)
+            except (IOError, OSError, ValueError):  # pragma: no cover
+                # Maybe removed or truncated by another process.  Just remake it.
+                pass
+            else:
+                # Mark as recently used.
+                try:
+                    os.utime(file_name, None)
+                except OSError:  # pragma: no cover
+                    pass
+                return galsim.InterpolatedImage(effective_prof_image, gsparams=gsparams)
+
         # Find scale at which to draw effective profile
         _, prof0 = insep_obj._fiducial_profile(bandpass)
         iiscale = prof0.nyquist_scale
@@ -2008,6 +2301,9 @@ class ChromaticConvolution(ChromaticObject):
                     bandpass, scale=iiscale, integrator=integrator,
                     method='no_pixel', wmult=wmult)
 
+        if file_name is not None:
+            _write_effective_prof(effective_prof_image, file_name)
+
         return galsim.InterpolatedImage(effective_prof_image, gsparams=gsparams)
 
     @staticmethod
@@ -2045,6 +2341,16 @@ class ChromaticConvolution(ChromaticObject):
         return galsim.Convolve([obj.evaluateAtWavelength(wave) for obj in self.obj_list],
                                gsparams=self.gsparams)
 
+    def _shoot_waves(self, waves, ud, cache):
+        # Each photon gets shot from every convolutant at its wavelength, and the positions add.
+        x, y, flux = _shoot_waves(self.obj_list[0], waves, ud, cache)
+        for obj in self.obj_list[1:]:
+            x2, y2, flux2 = _shoot_waves(obj, waves, ud, cache)
+            x += x2
+            y += y2
+            flux *= flux2
+        return x, y, flux
+
     def drawImage(self, bandpass, image=None, integrator='trapezoidal', iimult=None, **kwargs):
         """Optimized draw method for the ChromaticConvolution class.
 
@@ -2057,7 +2363,9 @@ class ChromaticConvolution(ChromaticObject):
         that it is more efficient when drawing many images to group images using the same
         SEDs, bandpasses, and inseparable profiles (generally PSFs) together in order to hit the
         cache more often.  The default cache size is 10, but may be resized using the
-        `ChromaticConvolution.resize_effective_prof_cache()` method.
+        `ChromaticConvolution.resize_effective_prof_cache()` method.  The effective profiles can
+        also be stored on disk to share them between processes and runs.  See the
+        ChromaticConvolution docstring for details.
 
         @param bandpass         A Bandpass object representing the filter against which to
                                 integrate.
@@ -2080,6 +2388,11 @@ class ChromaticConvolution(ChromaticObject):
         self._last_bp = bandpass
         if self.SED.dimensionless:
             raise ValueError("Can only draw ChromaticObjects with spectral SEDs.")
+        if kwargs.get('method', None) == 'phot':
+            _check_phot_args(integrator, iimult)
+            image = self._drawPhot(bandpass, image, kwargs)
+            self._last_wcs = image.wcs
+            return image
         # `ChromaticObject.drawImage()` can just as efficiently handle separable cases.
         if self.separable:
             image = ChromaticObject.drawImage(self, bandpass, image=image, **kwargs)
@@ -2220,6 +2533,137 @@ ChromaticConvolution._effective_prof_cache = galsim.utilities.LRU_Cache(
     ChromaticConvolution._get_effective_prof, maxsize=10)
 
 
+class _Unreproducible(Exception):
+    # Raised by _update_cache_key for objects that can't be reproduced in another process.
+    pass
+
+def _update_cache_key(h, obj, memo):
+    # Add a full-precision serialization of obj to the hash object h.  This follows the same
+    # rules as pickle (cf. __reduce_ex__), so it covers the GSObjects, whose parameters live in
+    # the C++ layer, but arrays are hashed from their bytes and floats from their exact repr.
+    # Raise _Unreproducible for things like lambda functions, which pickle can't handle either,
+    # or for objects whose class sets _reproducible = False.
+    import numbers
+    from past.builtins import basestring
+    if obj is None or isinstance(obj, (numbers.Number, basestring, bytes)):
+        h.update(('%s:%r;'%(type(obj).__name__, obj)).encode('utf-8'))
+        return
+    if id(obj) in memo:
+        # Already seen (or a reference cycle).  Just refer back to it.
+        h.update(('ref:%d;'%memo[id(obj)][0]).encode('utf-8'))
+        return
+    # Keep a reference, so the id isn't reused by a temporary object.
+    memo[id(obj)] = (len(memo), obj)
+
+    if isinstance(obj, np.ndarray):
+        h.update(('array:%s:%r;'%(obj.dtype.str, obj.shape)).encode('utf-8'))
+        if obj.dtype.hasobject:
+            for item in obj.ravel():
+                _update_cache_key(h, item, memo)
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(('%s:%d;'%(type(obj).__name__, len(obj))).encode('utf-8'))
+        for item in obj:
+            _update_cache_key(h, item, memo)
+    elif type(obj) in (dict, set, frozenset):
+        # The order of these isn't reproducible, so sort the items by their repr.
+        items = obj.items() if isinstance(obj, dict) else [ (item,) for item in obj ]
+        items = sorted(items, key=lambda item: repr(item[0]))
+        h.update(('%s:%d;'%(type(obj).__name__, len(items))).encode('utf-8'))
+        for item in items:
+            for x in item:
+                _update_cache_key(h, x, memo)
+    elif isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType)):
+        # Functions and classes are only reproducible if they can be imported by name.
+        module = getattr(obj, '__module__', None)
+        name = getattr(obj, '__qualname__', obj.__name__)
+        target = sys.modules.get(module)
+        for part in name.split('.'):
+            target = getattr(target, part, None)
+        if target is not obj:
+            raise _Unreproducible()
+        h.update(('global:%s.%s;'%(module, name)).encode('utf-8'))
+    elif not getattr(obj, '_reproducible', True):
+        raise _Unreproducible()
+    else:
+        try:
+            rv = obj.__reduce_ex__(2)
+        except Exception:
+            raise _Unreproducible()
+        if isinstance(rv, basestring):
+            h.update(('global:%s.%s;'%(getattr(obj, '__module__', None), rv)).encode('utf-8'))
+            return
+        rv = list(rv) + [None] * (5 - len(rv))
+        state = rv[2]
+        if isinstance(state, dict):
+            # Leave out the cached values of lazy properties.  They don't change what the object
+            # is, but whether they have been computed yet depends on what was done with it.
+            cls = type(obj)
+            state = dict( (k, v) for k, v in state.items()
+                          if not isinstance(getattr(cls, k, None), galsim.utilities.lazy_property) )
+        h.update(b'reduce;')
+        for x in (rv[0], rv[1], state):
+            _update_cache_key(h, x, memo)
+        for x in rv[3:5]:
+            _update_cache_key(h, None if x is None else list(x), memo)
+
+def _effective_prof_file(insep_obj, bandpass, iimult, integrator, wmult):
+    # The name of the file in ChromaticConvolution.cache_dir for this effective profile, or None
+    # if it should not be stored on disk.
+    if ChromaticConvolution.cache_dir is None:
+        return None
+    import hashlib
+    if not isinstance(integrator, str):
+        # The integrators record how many evaluations they did last time, which isn't part of
+        # what they do.
+        integrator = (type(integrator), dict( (k, v) for k, v in vars(integrator).items()
+                                              if not k.startswith('last_') ))
+    h = hashlib.sha1()
+    memo = {}
+    try:
+        for x in (galsim.__version__, insep_obj, bandpass, iimult, integrator, wmult):
+            _update_cache_key(h, x, memo)
+    except _Unreproducible:
+        return None
+    return os.path.join(ChromaticConvolution.cache_dir, 'effective_prof_%s.fits'%h.hexdigest())
+
+def _write_effective_prof(image, file_name):
+    # Write to a temporary name first, so other processes never see a partial file.
+    dir = os.path.dirname(file_name)
+    if not os.path.isdir(dir):
+        try:
+            os.makedirs(dir)
+        except OSError:  # pragma: no cover
+            # Probably made by another process in the meantime.
+            pass
+    tmp_name = file_name + '.%d.tmp'%os.getpid()
+    galsim.fits.write(image, tmp_name)
+    os.rename(tmp_name, file_name)
+    _trim_effective_prof_cache(dir, ChromaticConvolution.cache_max_bytes)
+
+def _trim_effective_prof_cache(dir, max_bytes):
+    # Remove the least recently used effective profiles until the total size is below max_bytes.
+    files = []
+    for f in os.listdir(dir):
+        if f.startswith('effective_prof_') and f.endswith('.fits'):
+            name = os.path.join(dir, f)
+            try:
+                st = os.stat(name)
+            except OSError:  # pragma: no cover
+                continue
+            files.append((st.st_mtime, st.st_size, name))
+    total = sum(size for _, size, _ in files)
+    for _, size, name in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(name)
+        except OSError:  # pragma: no cover
+            pass
+        total -= size
+
+
 class ChromaticDeconvolution(ChromaticObject):
     """A class for deconvolving a ChromaticObject.
 
@@ -2467,6 +2911,10 @@ class ChromaticOpticalPSF(ChromaticObject):
     waves, which is commonly satisfied by space telescopes); if they are larger than that, then more
     stringent settings are required.
 
+    The pupil plane (aperture) and the wavefront in nanometers do not depend on wavelength, so they
+    are computed once and shared by all of the OpticalPSFs made by evaluateAtWavelength().  Only the
+    phase scaling and the Fourier transform are redone for each wavelength.
+
     Note that a ChromaticOpticalPSF by itself is NOT the correct thing to use to draw an image of a
     star. Stars (and galaxies too, of course) have an SED that is not flat. To draw a real star, you
     should either multiply the ChromaticOpticalPSF object by an SED, or convolve it with a point
@@ -2566,12 +3014,40 @@ class ChromaticOpticalPSF(ChromaticObject):
         # We need to rescale the stored lam/diam by the ratio of input wavelength to stored fiducial
         # wavelength.  Likewise, the aberrations were in units of wavelength for the fiducial
         # wavelength, so we have to convert to units of waves for *this* wavelength.
+        # The aperture and the wavefront in nm are the same at every wavelength, so reuse the
+        # ones made at the fiducial wavelength.
+        fiducial = self._fiducialPSF()
+        if wave == self.lam:
+            return fiducial
+        kwargs = dict(self.kwargs)
+        kwargs['aper'] = fiducial._aper
         ret = galsim.OpticalPSF(
                 lam=wave, diam=self.diam,
                 aberrations=self.aberrations*(self.lam/wave), scale_unit=self.scale_unit,
-                **self.kwargs)
+                _wavefront_screen=fiducial._screens[0], **kwargs)
         return ret
 
+    def _shoot_waves(self, waves, ud, cache):
+        # Shoot each photon from the nearest of a grid of wavelengths, and then apply the
+        # diffraction scaling from that wavelength to the photon's own wavelength.
+        return _shoot_at_nodes(self, waves, ud, cache, self._shoot_nwave, dilate=True)
+
+    def _fiducialPSF(self):
+        # The OpticalPSF at the fiducial wavelength.  Its aperture, which is made from the user's
+        # keyword arguments in the same way as for any other OpticalPSF, and its wavefront are
+        # shared by the OpticalPSFs at all other wavelengths.
+        if not hasattr(self, '_fiducial'):
+            self._fiducial = galsim.OpticalPSF(
+                    lam=self.lam, diam=self.diam, aberrations=self.aberrations,
+                    scale_unit=self.scale_unit, **self.kwargs)
+        return self._fiducial
+
+    def __getstate__(self):
+        # Don't pickle the (possibly large) pupil plane arrays.  They are remade as needed.
+        d = self.__dict__.copy()
+        d.pop('_fiducial', None)
+        return d
+
 
 class ChromaticAiry(ChromaticObject):
     """A subclass of ChromaticObject meant to represent chromatic Airy profiles.
@@ -2658,6 +3134,187 @@ class ChromaticAiry(ChromaticObject):
             **self.kwargs)
         return ret
 
+    def _shoot_waves(self, waves, ud, cache):
+        # An Airy profile just scales with wavelength.
+        x, y, flux = _shoot_waves(cache.profile(self, self.lam), waves, ud, cache)
+        scale = waves / self.lam
+        return x * scale, y * scale, flux
+
+class _ChromaticShooter(galsim.GSObject):
+    """A GSObject that shoots photons from a ChromaticObject as seen through a Bandpass, giving
+    each photon a wavelength drawn from the object's SED times the bandpass throughput.
+
+    This is only meant to be drawn with photon shooting.  The SBProfile is that of a fiducial
+    monochromatic profile with the same total flux, which is used for things like the calculation
+    of the number of photons to shoot.
+    """
+    def __init__(self, chrom_obj, bandpass, prof0):
+        self._chrom_obj = chrom_obj
+        self._bandpass = bandpass
+        # A new shooter is made for each drawImage call, so this holds the profiles made for the
+        # current image, to be reused by each batch of photons.
+        self._cache = _ShootCache(bandpass)
+        self._flux = chrom_obj.calculateFlux(bandpass)
+        self._sbp = prof0.withFlux(self._flux)._sbp
+
+    def shoot(self, n_photons, rng=None, photons=None):
+        """Shoot photons into a PhotonArray, including their wavelengths.
+
+        @param n_photons    The number of photons to use for photon shooting.
+        @param rng          If provided, a random number generator to use for photon shooting,
+                            which may be any kind of BaseDeviate object.  If `rng` is None, one
+                            will be automatically created, using the time as a seed.
+                            [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
+        @returns PhotonArray.
+        """
+        from .photon_array import _get_photon_buffer
+        ud = galsim.UniformDeviate(rng)
+        n_photons = int(n_photons)
+        photons = _get_photon_buffer(photons, n_photons)
+        if n_photons == 0:
+            return photons
+        waves = self._chrom_obj.SED.sampleWavelength(n_photons, self._bandpass, rng=ud)
+        x, y, flux = _shoot_waves(self._chrom_obj, waves, ud, self._cache)
+        photons.x = x
+        photons.y = y
+        photons.flux = flux * (self._flux / n_photons)
+        photons.wavelength = waves
+        return photons
+
+
+def _check_phot_args(integrator, iimult=None):
+    """Raise an exception if arguments that only apply to integrating over wavelength were given
+    when drawing with method='phot', since they would otherwise be silently ignored.
+    """
+    if integrator != 'trapezoidal':
+        raise ValueError("integrator is not used for method='phot'")
+    if iimult is not None:
+        raise ValueError("iimult is not used for method='phot'")
+
+
+def _shoot_waves(obj, waves, ud, cache):
+    """Shoot photons at the given wavelengths from either a ChromaticObject or a GSObject.
+    Returns x, y, flux, where the fluxes have a mean of 1.
+    """
+    if not isinstance(obj, galsim.GSObject):
+        return obj._shoot_waves(waves, ud, cache)
+    n = len(waves)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    photons = obj.shoot(n, ud)
+    x = photons.x.copy()
+    y = photons.y.copy()
+    flux = photons.flux * (n / obj.flux if obj.flux != 0. else 0.)
+    if photons.isCorrelated():
+        # These photons will be combined with ones from other profiles at the same wavelengths,
+        # so they need to be in random order.
+        u = np.empty(n)
+        ud.generate(u)
+        perm = np.argsort(u)
+        x, y, flux = x[perm], y[perm], flux[perm]
+    return x, y, flux
+
+
+class _ShootCache(object):
+    """The monochromatic profiles needed to shoot photons from chromatic objects while drawing a
+    single image.  Profiles are made at fixed wavelengths spanning the bandpass, so the same ones
+    serve every batch of photons.
+    """
+    def __init__(self, bandpass):
+        self.blue_limit = bandpass.blue_limit
+        self.red_limit = bandpass.red_limit
+        self._profs = {}
+
+    def nodes(self, nwave):
+        """Return `nwave` wavelengths spanning the bandpass."""
+        if self.red_limit > self.blue_limit and nwave > 1:
+            return np.linspace(self.blue_limit, self.red_limit, nwave)
+        else:
+            return np.array([self.blue_limit])
+
+    def profile(self, obj, wave):
+        """Return obj.evaluateAtWavelength(wave), making it only the first time it is needed."""
+        key = (id(obj), wave)
+        if key not in self._profs:
+            # Keep obj too, so its id can't be reused by another object while the cache exists.
+            self._profs[key] = (obj, obj.evaluateAtWavelength(wave))
+        return self._profs[key][1]
+
+
+def _shoot_at_nodes(obj, waves, ud, cache, nwave, dilate=False):
+    """Shoot photons from a ChromaticObject by evaluating it at `nwave` wavelengths spanning the
+    bandpass, shooting each photon from the profile at the nearest one.  If `dilate` is True, then
+    the photon positions are also scaled by the ratio of the photon wavelength to the wavelength at
+    which its profile was evaluated.
+    """
+    n = len(waves)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    nodes = cache.nodes(nwave)
+    if len(nodes) > 1:
+        index = np.rint((waves - nodes[0]) / (nodes[1] - nodes[0])).astype(int)
+        index = np.clip(index, 0, len(nodes)-1)
+    else:
+        index = np.zeros(n, dtype=int)
+    x = np.empty(n)
+    y = np.empty(n)
+    flux = np.empty(n)
+    for i in np.unique(index):
+        use = index == i
+        prof = cache.profile(obj, nodes[i])
+        x[use], y[use], flux[use] = _shoot_waves(prof, waves[use], ud, cache)
+        if dilate:
+            scale = waves[use] / nodes[i]
+            x[use] *= scale
+            y[use] *= scale
+    return x, y, flux
+
+
+def _wave_func_values(func, waves, ngrid=100):
+    """Evaluate a function of wavelength, returning a scalar or array, at many wavelengths by
+    linearly interpolating between its values on a grid.  Returns an array of shape
+    (len(waves), size of func output).
+    """
+    wmin = np.min(waves)
+    wmax = np.max(waves)
+    grid = np.linspace(wmin, wmax, ngrid) if wmax > wmin else np.array([wmin])
+    vals = np.array([np.asarray(func(w), dtype=float).ravel() for w in grid])
+    if len(grid) == 1:
+        return np.tile(vals, (len(waves), 1))
+    out = np.empty((len(waves), vals.shape[1]))
+    for k in range(vals.shape[1]):
+        out[:,k] = np.interp(waves, grid, vals[:,k])
+    return out
+
+
+def _map_chunks(func, arg, items, nproc):
+    # Split items into nproc strided chunks, apply func((arg, chunk)) to each in a separate
+    # process, and return the concatenated results in the original order.
+    from multiprocessing import Pool
+    chunks = [ items[i::nproc] for i in range(nproc) ]
+    pool = Pool(nproc)
+    try:
+        results = pool.map(func, [ (arg, chunk) for chunk in chunks ])
+    finally:
+        pool.close()
+        pool.join()
+    # Undo the striding.
+    out = [None] * len(items)
+    for i, res in enumerate(results):
+        out[i::nproc] = res
+    return out
+
+def _evaluate_chunk(args):
+    obj, waves = args
+    return [ obj.evaluateAtWavelength(wave) for wave in waves ]
+
+def _draw_chunk(args):
+    (scale, im_size), objs = args
+    return [ obj.drawImage(scale=scale, nx=im_size, ny=im_size, method='no_pixel')
+             for obj in objs ]
+
 def _findWave(wave_list, wave):
     """
     Helper routine to search a sorted NumPy array of wavelengths (not necessarily evenly spaced) to
@@ -192,7 +192,7 @@ class Sum(galsim.GSObject):
         SBList = [obj._sbp for obj in self._obj_list]
         self._sbp = galsim._galsim.SBAdd(SBList, self._gsparams)
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -200,17 +200,20 @@ class Sum(galsim.GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
+        from .photon_array import _get_photon_buffer
         if n_photons == 0:
-            return galsim._galsim.PhotonArray(0)
+            return _get_photon_buffer(photons, 0)
         ud = galsim.UniformDeviate(rng)
 
         remainingAbsoluteFlux = self.positive_flux + self.negative_flux
         fluxPerPhoton = remainingAbsoluteFlux / n_photons
 
         # Initialize the output array
-        result = galsim._galsim.PhotonArray(n_photons)
+        result = _get_photon_buffer(photons, n_photons)
 
         remainingN = n_photons
         istart = 0  # The location in the result array where we assign the component arrays.
@@ -490,7 +493,7 @@ class Convolution(galsim.GSObject):
         SBList = [obj._sbp for obj in self._obj_list]
         self._sbp = galsim._galsim.SBConvolve(SBList, self._real_space, self._gsparams)
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -498,11 +501,13 @@ class Convolution(galsim.GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
         ud = galsim.UniformDeviate(rng)
 
-        photon_array = self._obj_list[0].shoot(n_photons, ud)
+        photon_array = self._obj_list[0].shoot(n_photons, ud, photons)
         # It may be necessary to shuffle when convolving because we do not have a
         # gaurantee that the convolvee's photons are uncorrelated, e.g., they might
         # both have their negative ones at the end.
@@ -749,7 +754,7 @@ class AutoConvolution(galsim.GSObject):
         self._sbp = galsim._galsim.SBAutoConvolve(self._orig_obj._sbp, self._real_space,
                                                   self._gsparams)
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -757,11 +762,13 @@ class AutoConvolution(galsim.GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
         ud = galsim.UniformDeviate(rng)
 
-        photon_array = self._orig_obj.shoot(n_photons, ud)
+        photon_array = self._orig_obj.shoot(n_photons, ud, photons)
         photon_array.convolve(self._orig_obj.shoot(n_photons, ud), ud)
         return photon_array
 
@@ -907,7 +914,7 @@ class AutoCorrelation(galsim.GSObject):
         self._sbp = galsim._galsim.SBAutoCorrelate(self._orig_obj._sbp,
                                                    self._real_space, self._gsparams)
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -915,11 +922,13 @@ class AutoCorrelation(galsim.GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
         ud = galsim.UniformDeviate(rng)
 
-        result = self._orig_obj.shoot(n_photons, ud)
+        result = self._orig_obj.shoot(n_photons, ud, photons)
         result2 = self._orig_obj.shoot(n_photons, ud)
 
         # Flip sign of (x, y) in one of the results
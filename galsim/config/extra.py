@@ -190,11 +190,6 @@ def WriteExtraOutputs(config, main_data, logger=None):
     else:
         ntries = 1
 
-    if 'dir' in output:
-        default_dir = galsim.config.ParseValue(output,'dir',config,str)[0]
-    else:
-        default_dir = None
-
     if 'noclobber' in output:
         noclobber = galsim.config.ParseValue(output,'noclobber',config,bool)[0]
     else:
@@ -204,20 +199,11 @@ def WriteExtraOutputs(config, main_data, logger=None):
         config['extra_last_file'] = {}
 
     for key in [ k for k in valid_extra_outputs.keys() if k in output ]:
-        field = output[key]
-        if 'file_name' in field:
-            galsim.config.SetDefaultExt(field, '.fits')
-            file_name = galsim.config.ParseValue(field,'file_name',config,str)[0]
-        else: # pragma: no cover
+        file_name = _GetExtraOutputFileName(key, config)
+        if file_name is None: # pragma: no cover
             # If no file_name, then probably writing to hdu
             continue
-        if 'dir' in field:
-            dir = galsim.config.ParseValue(field,'dir',config,str)[0]
-        else:
-            dir = default_dir
-
-        if dir is not None:
-            file_name = os.path.join(dir,file_name)
+        field = output[key]
 
         galsim.config.EnsureDir(file_name)
 
@@ -246,6 +232,26 @@ def WriteExtraOutputs(config, main_data, logger=None):
         logger.debug('file %d: Wrote %s to %r',config['file_num'],key,file_name)
 
 
+def _GetExtraOutputFileName(key, config):
+    # Return the full file name for the extra output with the given key, or None if it doesn't
+    # have a file_name (e.g. if it is written to an hdu of the main file).
+    output = config['output']
+    field = output[key]
+    if 'file_name' not in field:
+        return None
+    galsim.config.SetDefaultExt(field, '.fits')
+    file_name = galsim.config.ParseValue(field,'file_name',config,str)[0]
+    if 'dir' in field:
+        dir = galsim.config.ParseValue(field,'dir',config,str)[0]
+    elif 'dir' in output:
+        dir = galsim.config.ParseValue(output,'dir',config,str)[0]
+    else:
+        dir = None
+    if dir is not None:
+        file_name = os.path.join(dir,file_name)
+    return file_name
+
+
 def AddExtraOutputHDUs(config, main_data, logger=None):
     """Write the extra output objects to either HDUS or images as appropriate and add them
     to the existing data.
@@ -17,6 +17,7 @@
 #
 
 from past.builtins import basestring
+import os
 import galsim
 
 # The truth extra output type builds an OutputCatalog with truth information about each of the
@@ -25,6 +26,12 @@ import galsim
 # This means that the stamps can be built out of order by the multiprocessing and still show
 # up in the correct order in the output catalog.
 
+# For very large catalogs, you can set chunk_size in the truth field to write the catalog to its
+# file while the stamps are being built, rather than keeping all the rows in memory until the end.
+# The rows are then written (chunk_size at a time) as soon as all the rows before them are done.
+# This only applies when the truth catalog has its own file and the stamps are all built in the
+# same process (i.e. image.nproc = 1); otherwise chunk_size is ignored.
+
 # Note that the order of the column names in the output catalog is taken from
 # config['output']['truth']['columns'].keys().  So if config is a regular dict, the order
 # of the keys is semi-arbitrary.  However, if config is an OrderedDict, the keys come out
@@ -51,6 +58,14 @@ class TruthBuilder(ExtraOutputBuilder):
                            'truth catalog will be in arbitrary order.')
             self.warned = True
 
+        # If we can stream the rows to the file, the catalog is made when the first row is ready.
+        # Since all the stamps are built in this process when scratch is a regular dict, it's
+        # safe to keep this state in the builder.
+        self.streaming = ('chunk_size' in config and 'hdu' not in config and
+                          isinstance(scratch, dict))
+        self.stream_cat = None
+        self.next_obj_num = None
+
     # The function to call at the end of building each stamp
     def processStamp(self, obj_num, config, base, logger):
         cols = config['columns']
@@ -88,6 +103,43 @@ class TruthBuilder(ExtraOutputBuilder):
             logger.error("Expecting types = %s",repr(self.scratch['types']))
             raise RuntimeError("Type mismatch found when building truth catalog.")
         self.scratch[obj_num] = row
+        if self.streaming:
+            self._streamRows(config, base, logger)
+
+    def processSkippedStamp(self, obj_num, config, base, logger):
+        if self.streaming:
+            # Mark it as done, so the rows after it don't wait for it.
+            self.scratch[obj_num] = None
+            # The catalog can't be made until we know the column types from a built stamp.
+            if 'types' in self.scratch:
+                self._streamRows(config, base, logger)
+
+    def _streamRows(self, config, base, logger):
+        # Write any rows that are ready, in order of obj_num, to the output file.
+        if self.stream_cat is None:
+            file_name = galsim.config.extra._GetExtraOutputFileName(self._extra_output_key, base)
+            noclobber = ('noclobber' in base['output'] and
+                         galsim.config.ParseValue(base['output'],'noclobber',base,bool)[0])
+            if (file_name is None or os.path.splitext(file_name)[1] in ['.gz', '.bz2'] or
+                    (noclobber and os.path.isfile(file_name)) or
+                    base.get('extra_last_file',{}).get(self._extra_output_key) == file_name):
+                # Then just let WriteExtraOutputs handle it normally.
+                self.streaming = False
+                return
+            chunk_size = galsim.config.ParseValue(config,'chunk_size',base,int)[0]
+            galsim.config.EnsureDir(file_name)
+            self.stream_cat = galsim.OutputCatalog(names=config['columns'].keys(),
+                                                   types=self.scratch['types'])
+            self.stream_cat.openFile(file_name, chunk_size=chunk_size)
+            self.next_obj_num = base['start_obj_num']
+            if logger:
+                logger.debug('file %d: Writing truth catalog to %s in chunks of %d rows',
+                             base['file_num'],file_name,chunk_size)
+        while self.next_obj_num in self.scratch:
+            row = self.scratch.pop(self.next_obj_num)
+            self.next_obj_num += 1
+            if row is not None:
+                self.stream_cat.addRow(row)
 
     # The function to call at the end of building each file to finalize the truth catalog
     def finalize(self, config, base, main_data, logger):
@@ -96,19 +148,30 @@ class TruthBuilder(ExtraOutputBuilder):
         # Note: Provide a default here, because if all items were skipped it would otherwise
         # lead to a KeyError.
         types = self.scratch.pop('types', [float] * len(cols))
-        self.cat = galsim.OutputCatalog(names=cols.keys(), types=types)
+        if self.stream_cat is not None:
+            # Most of the rows have already been written to the file.  Add any that were still
+            # waiting for an earlier object that never came.  writeFile will finish the file.
+            self.cat = self.stream_cat
+        else:
+            self.cat = galsim.OutputCatalog(names=cols.keys(), types=types)
 
         # Add all the rows in order to the OutputCatalog
         # Note: types was popped above, so only the obj_num keys are left.
+        # The OutputCatalog stores the values much more compactly than the scratch lists, so pop
+        # each row as we go rather than keeping two copies of everything.
         obj_nums = sorted(self.scratch.keys())
         for obj_num in obj_nums:
-            row = self.scratch[obj_num]
-            self.cat.addRow(row)
+            row = self.scratch.pop(obj_num)
+            if row is not None:
+                self.cat.addRow(row)
         return self.cat
 
     # Write the catalog to a file
     def writeFile(self, file_name, config, base, logger):
-        self.cat.write(file_name)
+        if self.stream_cat is not None:
+            self.stream_cat.close()
+        else:
+            self.cat.write(file_name)
 
     # Create an HDU of the FITS binary table.
     def writeHdu(self, config, base, logger):
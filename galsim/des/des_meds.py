@@ -19,7 +19,8 @@
 
 This module defines the MultiExposureObject class for representing multiple exposure data for a
 single object.  The WriteMEDS function can be used to write a list of MultiExposureObject
-instances to a single MEDS file.
+instances to a single MEDS file, and the MEDSWriter class can be used to write them one at a time
+without keeping all of them in memory.
 
 Importing this module also adds these data structures to the config framework, so that MEDS file
 output can subsequently be simulated directly using a config file.
@@ -28,14 +29,12 @@ output can subsequently be simulated directly using a config file.
 import numpy as np
 import galsim
 import galsim.config
-import sys
 import os
 
 # these image stamp sizes are available in MEDS format
 BOX_SIZES = [32,48,64,96,128,192,256]
-# while creating the meds file, all the data is stored in memory, and then written to disc once all
-# the necessary images have been created.
-# You can control the amound of memory used to prevent jamming your system.
+# This is no longer used.  The MEDSWriter now writes the pixel data to disk as each object is added,
+# so the memory used no longer grows with the number of objects.  Kept for backwards compatibility.
 MAX_MEMORY = 1e9
 # Maximum number of exposures allowed per galaxy (incl. coadd)
 MAX_NCUTOUTS = 11
@@ -170,6 +169,9 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     """
     Writes a MEDS file from a list of MultiExposureObjects.
 
+    This is a convenience function that uses a MEDSWriter to write the objects.  If you have too
+    many objects to keep them all in memory at once, use a MEDSWriter directly.
+
     Arguments:
     ----------
     @param obj_list:     List of MultiExposureObjects
@@ -177,42 +179,124 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     @param clobber       Setting `clobber=True` when `file_name` is given will silently overwrite
                          existing files. (Default `clobber = True`.)
     """
+    writer = MEDSWriter(file_name, clobber=clobber)
+    try:
+        for obj in obj_list:
+            writer.addObject(obj)
+        writer.close()
+    except:
+        writer.abort()
+        raise
 
-    from galsim._pyfits import pyfits
 
-    # initialise the catalog
-    cat = {}
-    cat['id'] = []
-    cat['box_size'] = []
-    cat['ra'] = []
-    cat['dec'] = []
-    cat['ncutout'] = []
-    cat['start_row'] = []
-    cat['dudrow'] = []
-    cat['dudcol'] = []
-    cat['dvdrow'] = []
-    cat['dvdcol'] = []
-    cat['row0'] = []
-    cat['col0'] = []
-    cat['psf_box_size'] = []
-    cat['psf_start_row'] = []
-
-    # initialise the image vectors
-    vec = {}
-    vec['image'] = []
-    vec['seg'] = []
-    vec['weight'] = []
-    vec['psf'] = []
-
-    # initialise the image vector index
-    n_vec = 0
-    psf_n_vec = 0
+class MEDSWriter(object):
+    """
+    A class that writes a MEDS file one MultiExposureObject at a time.
 
-    # get number of objects
-    n_obj = len(obj_list)
+    The pixel data for each object are written to temporary files (one for each of the image,
+    weight, seg and psf vectors) as soon as the object is added, so only the small per-object
+    catalog is kept in memory.  close() then writes the MEDS file, copying the pixel data into the
+    cutout HDUs in blocks, and removes the temporary files.  If `file_name` ends in .gz or .bz2,
+    the finished file is then compressed in blocks using the same methods as galsim.fits (see
+    `galsim.fits.gzip_nthreads` for the gzip options).
+
+    Each vector is written with the type of its images, promoted if needed so all the images
+    fit, as np.concatenate would do.  Unsigned integers are stored with BZERO as pyfits does.
+
+        >>> writer = galsim.des.MEDSWriter(file_name)
+        >>> for i in range(nobj):
+        ...     obj = galsim.des.MultiExposureObject(images, weight=weights, psf=psfs, id=i)
+        ...     writer.addObject(obj)
+        >>> writer.close()
+
+    @param file_name:    Name of meds file to be written
+    @param clobber       Setting `clobber=True` will silently overwrite an existing file.
+                         (Default `clobber = True`.)
+    """
+    # The names of the image vectors and the names of the corresponding HDUs.
+    _vec_names = [ ('image', 'image_cutouts'), ('weight', 'weight_cutouts'),
+                   ('seg', 'seg_cutouts'), ('psf', 'psf') ]
+
+    # The size of the blocks to use when copying the pixel data into the output file.
+    _block_size = 2880 * 1024
+
+    def __init__(self, file_name, clobber=True):
+        if not clobber and os.path.isfile(file_name):
+            raise IOError('File %r already exists'%file_name)
+        self.file_name = file_name
+
+        # initialise the catalog
+        self.cat = {}
+        for key in ['id', 'box_size', 'ra', 'dec', 'ncutout', 'start_row', 'dudrow', 'dudcol',
+                    'dvdrow', 'dvdcol', 'row0', 'col0', 'psf_box_size', 'psf_start_row']:
+            self.cat[key] = []
+
+        # initialise the temporary files for the image vectors
+        self._files = {}
+        self._dtypes = {}
+        self._n_vec = {}
+        for name, _ in self._vec_names:
+            tmp_name = file_name + '.%s.%d.tmp'%(name, os.getpid())
+            self._files[name] = open(tmp_name, 'w+b')
+            self._dtypes[name] = None
+            self._n_vec[name] = 0
+
+    def _writeVec(self, name, array):
+        """Append the pixel values of an image to the temporary file for vector `name`.
+
+        The vector uses the type of the first image written to it.  If a later image needs a
+        wider type (e.g. float images after integer ones), the values already written are
+        converted to the promoted type, as np.concatenate would do.
+        """
+        dt = array.dtype.newbyteorder('=')
+        if self._dtypes[name] is None:
+            self._dtypes[name] = dt
+        elif np.promote_types(self._dtypes[name], dt) != self._dtypes[name]:
+            self._promoteVec(name, np.promote_types(self._dtypes[name], dt))
+        self._files[name].write(self._fitsArray(array, self._dtypes[name]).tobytes())
+        self._n_vec[name] += array.size
+
+    def _promoteVec(self, name, dt):
+        """Convert the values already written for vector `name` to the wider type `dt`.
+        """
+        old_dt = self._dtypes[name]
+        fits_dt, bzero = _fits_dtype(old_dt)
+        f = self._files[name]
+        f.seek(0)
+        new_name = f.name + '.new'
+        with open(new_name, 'wb') as fout:
+            while True:
+                block = f.read(self._block_size)
+                if not block: break
+                array = np.frombuffer(block, dtype=fits_dt)
+                if bzero is not None:
+                    array = array.view(old_dt.newbyteorder('>')) ^ old_dt.type(bzero)
+                fout.write(self._fitsArray(array, dt).tobytes())
+        f.close()
+        os.remove(f.name)
+        os.rename(new_name, f.name)
+        self._files[name] = open(f.name, 'r+b')
+        self._files[name].seek(0, os.SEEK_END)
+        self._dtypes[name] = dt
+
+    @staticmethod
+    def _fitsArray(array, dt):
+        """Convert an array to type `dt` and then to the big-endian form stored in the file.
+        """
+        fits_dt, bzero = _fits_dtype(dt)
+        array = array.astype(dt)
+        if bzero is not None:
+            # Subtracting 2**(nbits-1) is the same as flipping the top bit.
+            array = (array ^ dt.type(bzero)).view(fits_dt.newbyteorder('='))
+        return array.astype(fits_dt)
 
-    # loop over objects
-    for obj in obj_list:
+    def addObject(self, obj):
+        """Add a MultiExposureObject to the MEDS file.
+
+        @param obj      The MultiExposureObject to add.
+        """
+        if not self._files:
+            raise RuntimeError('Cannot add objects after the MEDS file has been closed.')
 
         # initialise the start indices for each image
         start_rows = np.ones(MAX_NCUTOUTS)*EMPTY_START_INDEX
@@ -228,6 +312,7 @@ def WriteMEDS(obj_list, file_name, clobber=True):
         n_cutout = obj.n_cutouts
 
         # append the catalog for this object
+        cat = self.cat
         cat['id'].append(obj.id)
         cat['box_size'].append(obj.box_size)
         # TODO: If the config defines a world position, get the right ra, dec here.
@@ -240,18 +325,15 @@ def WriteMEDS(obj_list, file_name, clobber=True):
         for i in range(n_cutout):
 
             # assign the start row to the end of image vector
-            start_rows[i] = n_vec
-            psf_start_rows[i] = psf_n_vec
-            # update n_vec to point to the end of image vector
-            n_vec += len(obj.images[i].array.flatten())
-            if obj.psf is not None:
-                psf_n_vec += len(obj.psf[i].array.flatten())
+            start_rows[i] = self._n_vec['image']
+            psf_start_rows[i] = self._n_vec['psf']
 
-            # append the image vectors
-            vec['image'].append(obj.images[i].array.flatten())
-            vec['seg'].append(obj.seg[i].array.flatten())
-            vec['weight'].append(obj.weight[i].array.flatten())
-            vec['psf'].append(obj.psf[i].array.flatten())
+            # write the image vectors
+            self._writeVec('image', obj.images[i].array.ravel())
+            self._writeVec('seg', obj.seg[i].array.ravel())
+            self._writeVec('weight', obj.weight[i].array.ravel())
+            if obj.psf is not None:
+                self._writeVec('psf', obj.psf[i].array.ravel())
 
             # append the Jacobian
             # col == x
@@ -263,12 +345,6 @@ def WriteMEDS(obj_list, file_name, clobber=True):
             col0[i]   = obj.wcs[i].origin.x
             row0[i]   = obj.wcs[i].origin.y
 
-            # check if we are running out of memory
-            if sys.getsizeof(vec) > MAX_MEMORY:
-                raise MemoryError(
-                    'Running out of memory > %1.0fGB '%MAX_MEMORY/1.e9 +
-                    '- you can increase the limit by changing MAX_MEMORY')
-
         # update the start rows fields in the catalog
         cat['start_row'].append(start_rows)
         cat['psf_start_row'].append(psf_start_rows)
@@ -281,14 +357,109 @@ def WriteMEDS(obj_list, file_name, clobber=True):
         cat['row0'].append(row0)
         cat['col0'].append(col0)
 
-    # concatenate list to one big vector
-    vec['image'] = np.concatenate(vec['image'])
-    vec['seg'] = np.concatenate(vec['seg'])
-    vec['weight'] = np.concatenate(vec['weight'])
-    vec['psf'] = np.concatenate(vec['psf'])
+    def close(self):
+        """Write the MEDS file and remove the temporary files.
+        """
+        if not self._files: return
+
+        # Compression is applied to the complete FITS file, so if the file name asks for it,
+        # write the uncompressed file first and compress it with the galsim.fits routines.
+        file_compress = galsim.fits._parse_compression('auto', self.file_name)[0]
+        if file_compress:
+            fits_name = self.file_name + '.%d.tmp'%os.getpid()
+        else:
+            fits_name = self.file_name
+        try:
+            self._writeFits(fits_name)
+            if file_compress:
+                galsim.fits._compress_file(fits_name, self.file_name, file_compress)
+        finally:
+            if file_compress and os.path.isfile(fits_name):
+                os.remove(fits_name)
+
+        for f in self._files.values():
+            f.close()
+            os.remove(f.name)
+        self._files = {}
+
+    def _writeFits(self, file_name):
+        """Write the (uncompressed) MEDS file.
+        """
+        from galsim._pyfits import pyfits
+        import io
+
+        # The table HDUs are small, so let pyfits write them into a buffer.
+        buf = io.BytesIO()
+        hdu_list = pyfits.HDUList([ pyfits.PrimaryHDU(), _meds_object_data(self.cat),
+                                    _meds_image_info(), _meds_metadata() ])
+        hdu_list.writeto(buf)
+
+        with open(file_name, 'wb') as fout:
+            fout.write(buf.getvalue())
+            # rest of HDUs are image vectors
+            for name, hdu_name in self._vec_names:
+                f = self._files[name]
+                if self._n_vec[name] == 0:
+                    fout.write(pyfits.ImageHDU(name=hdu_name).header.tostring().encode())
+                    continue
+                # Get the right header from a 1-element HDU of the same type, then fix the size.
+                fits_dt, bzero = _fits_dtype(self._dtypes[name])
+                hdu = pyfits.ImageHDU(np.zeros(1, dtype=fits_dt), name=hdu_name)
+                hdu.header['NAXIS1'] = self._n_vec[name]
+                if bzero is not None:
+                    hdu.header['BSCALE'] = 1
+                    hdu.header['BZERO'] = bzero
+                fout.write(hdu.header.tostring().encode())
+                f.seek(0)
+                nbytes = 0
+                while True:
+                    block = f.read(self._block_size)
+                    if not block: break
+                    fout.write(block)
+                    nbytes += len(block)
+                # FITS files are made of 2880-byte blocks.  Pad the data with zeros to fill
+                # the last one.
+                if nbytes % 2880 != 0:
+                    fout.write(b'\0' * (2880 - nbytes % 2880))
+
+    def abort(self):
+        """Stop writing the MEDS file without writing it, and remove the temporary files.
+
+        Call this if something goes wrong before close(), so the (possibly large) temporary
+        files aren't left next to the output file.
+        """
+        for f in self._files.values():
+            f.close()
+            if os.path.isfile(f.name):
+                os.remove(f.name)
+        self._files = {}
+
+    def __del__(self):
+        # Make sure the temporary files get removed, even if close() wasn't called.
+        if getattr(self, '_files', None):
+            self.abort()
+
 
-    # get the primary HDU
-    primary = pyfits.PrimaryHDU()
+def _fits_dtype(dt):
+    """Get the big-endian type used to store values of type `dt` in a FITS file, along with the
+    BZERO value needed for it (or None).
+
+    FITS doesn't have unsigned integers (other than 8 bit), so like pyfits, we store these as
+    signed integers with BZERO = 2**(nbits-1).
+    """
+    if dt.kind == 'u' and dt.itemsize > 1:
+        return np.dtype('>i%d'%dt.itemsize), 1 << (8*dt.itemsize-1)
+    else:
+        return dt.newbyteorder('>'), None
+
+
+def _meds_object_data(cat):
+    """Make the object_data HDU of a MEDS file from the catalog built by MEDSWriter.
+    """
+    from galsim._pyfits import pyfits
+
+    # get number of objects
+    n_obj = len(cat['id'])
 
     # second hdu is the object_data
     # cf. https://github.com/esheldon/meds/wiki/MEDS-Format
@@ -327,7 +498,6 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     cols.append( pyfits.Column(name='psf_start_row',  format='%dK' % MAX_NCUTOUTS,
                                array=np.array(cat['psf_start_row'])) )
 
-
     # Depending on the version of pyfits, one of these should work:
     try:
         object_data = pyfits.BinTableHDU.from_columns(cols)
@@ -335,6 +505,13 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     except AttributeError:  # pragma: no cover
         object_data = pyfits.new_table(pyfits.ColDefs(cols))
         object_data.update_ext_name('object_data')
+    return object_data
+
+
+def _meds_image_info():
+    """Make the image_info HDU of a MEDS file.
+    """
+    from galsim._pyfits import pyfits
 
     # third hdu is image_info
     cols = []
@@ -360,6 +537,13 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     except AttributeError:  # pragma: no cover
         image_info = pyfits.new_table(pyfits.ColDefs(cols))
         image_info.update_ext_name('image_info')
+    return image_info
+
+
+def _meds_metadata():
+    """Make the metadata HDU of a MEDS file.
+    """
+    from galsim._pyfits import pyfits
 
     # fourth hdu is metadata
     # default values?
@@ -392,25 +576,7 @@ def WriteMEDS(obj_list, file_name, clobber=True):
     except AttributeError:  # pragma: no cover
         metadata = pyfits.new_table(pyfits.ColDefs(cols))
         metadata.update_ext_name('metadata')
-
-    # rest of HDUs are image vectors
-    image_cutouts   = pyfits.ImageHDU( vec['image'] , name='image_cutouts'  )
-    weight_cutouts  = pyfits.ImageHDU( vec['weight'], name='weight_cutouts' )
-    seg_cutouts     = pyfits.ImageHDU( vec['seg']   , name='seg_cutouts'    )
-    psf_cutouts     = pyfits.ImageHDU( vec['psf']   , name='psf'            )
-
-    # write all
-    hdu_list = pyfits.HDUList([
-        primary,
-        object_data,
-        image_info,
-        metadata,
-        image_cutouts,
-        weight_cutouts,
-        seg_cutouts,
-        psf_cutouts
-    ])
-    galsim.fits.writeFile(file_name, hdu_list)
+    return metadata
 
 
 # Make the class that will
@@ -418,7 +584,11 @@ class MEDSBuilder(galsim.config.OutputBuilder):
 
     def buildImages(self, config, base, file_num, image_num, obj_num, ignore, logger):
         """
-        Build a meds file as specified in config.
+        Build the objects for a meds file as specified in config.
+
+        The objects are added to a MEDSWriter as they are built, rather than being kept in
+        memory until the end.  The optional chunk_size parameter in the output field sets how
+        many objects to build at a time.  [default: 1000]
 
         @param config           The configuration dict for the output field.
         @param base             The base configuration dict.
@@ -429,53 +599,87 @@ class MEDSBuilder(galsim.config.OutputBuilder):
                                 ignore here.
         @param logger           If given, a logger object to log progress.
 
-        @returns obj_list
+        @returns a list with the MEDSWriter
         """
-        import time
-        t1 = time.time()
-
         if 'image' in base and 'type' in base['image']:
             image_type = base['image']['type']
             if image_type != 'Single':
                 raise AttibuteError("MEDS files are not compatible with image type %s."%image_type)
 
         req = { 'nobjects' : int , 'nstamps_per_object' : int }
+        opt = { 'chunk_size' : int }
         ignore += [ 'file_name', 'dir', 'nfiles' ]
-        params = galsim.config.GetAllParams(config,base,ignore=ignore,req=req)[0]
+        params = galsim.config.GetAllParams(config,base,ignore=ignore,req=req,opt=opt)[0]
 
         nobjects = params['nobjects']
         nstamps_per_object = params['nstamps_per_object']
-        ntot = nobjects * nstamps_per_object
-
-        main_images = galsim.config.BuildImages(ntot, base, image_num=image_num,  obj_num=obj_num,
-                                                logger=logger)
-
-        weight_images = galsim.config.GetFinalExtraOutput('weight', base, logger)
-        if 'badpix' in config:
-            badpix_images = galsim.config.GetFinalExtraOutput('badpix', base, logger)
-        else:
-            badpix_images = None
-        psf_images = galsim.config.GetFinalExtraOutput('psf', base, logger)
-
-        obj_list = []
-        for i in range(nobjects):
-            k1 = i*nstamps_per_object
-            k2 = (i+1)*nstamps_per_object
-            if badpix_images is not None:
-                bpk = badpix_images[k1:k2]
-            else:
-                bpk = None
-            obj = MultiExposureObject(images = main_images[k1:k2],
-                                      weight = weight_images[k1:k2],
-                                      badpix = bpk,
-                                      psf = psf_images[k1:k2],
-                                      id = obj_num + i)
-            obj_list.append(obj)
-
-        return obj_list
+        chunk_size = params.get('chunk_size', 1000)
+
+        # Build the objects chunk_size at a time and add each chunk to the MEDS file before
+        # starting on the next one, so only one chunk of images is in memory at a time.
+        writer = MEDSWriter(self.getFilename(config, base, logger))
+        try:
+            nobj = base['nobj']
+            for i1 in range(0, nobjects, chunk_size):
+                i2 = min(i1 + chunk_size, nobjects)
+                k1 = i1*nstamps_per_object
+                k2 = i2*nstamps_per_object
+                main_images = galsim.config.BuildImages(k2-k1, base, image_num=image_num+k1,
+                                                        obj_num=obj_num+sum(nobj[:k1]),
+                                                        logger=logger)
+
+                weight_images = self._getExtraImages('weight', config, base, main_images,
+                                                     k1, k2, logger)
+                if 'badpix' in config:
+                    badpix_images = self._getExtraImages('badpix', config, base, main_images,
+                                                         k1, k2, logger)
+                else:
+                    badpix_images = None
+                psf_images = self._getExtraImages('psf', config, base, main_images,
+                                                  k1, k2, logger)
+
+                for i in range(i1, i2):
+                    j1 = (i-i1)*nstamps_per_object
+                    j2 = (i-i1+1)*nstamps_per_object
+                    if badpix_images is not None:
+                        bpk = badpix_images[j1:j2]
+                    else:
+                        bpk = None
+                    obj = MultiExposureObject(images = main_images[j1:j2],
+                                              weight = weight_images[j1:j2],
+                                              badpix = bpk,
+                                              psf = psf_images[j1:j2],
+                                              id = obj_num + i)
+                    writer.addObject(obj)
+                logger.debug('file %d: Added objects %d..%d to the MEDS file',
+                             file_num,obj_num+i1,obj_num+i2-1)
+        except:
+            # Don't leave the temporary files behind.
+            writer.abort()
+            raise
+
+        return [ writer ]
+
+    def _getExtraImages(self, key, config, base, main_images, k1, k2, logger):
+        # Get the images k1..k2-1 of this file for the given extra output.
+        # The output is finalized again after each chunk, so its finalize sees all the images
+        # built so far, and the last time it is called, all the images in the file.
+        builder = base['extra_builder'][key]
+        builder.final_data = None
+        final_data = galsim.config.GetFinalExtraOutput(key, base, main_images, logger)
+        images = [ final_data[k] for k in range(k1, k2) ]
+        # If the extra output was only turned on for the MEDS file (cf. getNImages), nothing
+        # else will use these images, so remove them from the builder to free the memory.
+        field = config[key]
+        if 'file_name' not in field and 'hdu' not in field:
+            for k in range(k1, k2):
+                builder.data[k] = None
+            builder.scratch.clear()
+        return images
 
     def writeFile(self, data, file_name, config, base, logger):
-        WriteMEDS(data, file_name)
+        # The objects have all been added to the MEDSWriter by buildImages.  This finishes the file.
+        data[0].close()
 
     def getNImages(self, config, base, file_num):
         # This gets called before starting work on the file, so we can use this opportunity
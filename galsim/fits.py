@@ -29,6 +29,20 @@ import galsim
 import numpy as np
 
 
+# Options for writing gzipped files.  gzip compression is done in-process by splitting the file
+# into blocks of gzip_block_size bytes, which are compressed in parallel using gzip_nthreads
+# threads (None means to use the number of cpus) and written as consecutive gzip members.
+# (This is a valid gzip file, which gunzip and python's gzip module read normally.)
+# If background_gzip is True, the compression and writing happen in a background thread, so the
+# caller can get on with making the next file.  Call waitForWrites() to make sure everything has
+# been written.  If the threaded compression fails in the background, the file is written with
+# python's gzip module instead (and later files use the usual fallback methods); only if that
+# fails too is the error raised by the next write or by waitForWrites().
+gzip_nthreads = None
+gzip_block_size = 4 * 1024**2
+gzip_level = 6
+background_gzip = False
+
 ##############################################################################################
 #
 # We start off with some helper functions for some common operations that will be used in
@@ -181,6 +195,10 @@ class _ReadFile:
             import os
             file = os.path.join(dir,file)
 
+        # If we are writing something in the background, it might be this file.
+        if _write_file._thread is not None:
+            _write_file.wait()
+
         if not file_compress:
             if pyfits_version < '3.1': # pragma: no cover
                 # Sometimes early versions of pyfits do weird things with the final hdu when
@@ -226,10 +244,152 @@ class _ReadFile:
             raise ValueError("Unknown file_compression")
 _read_file = _ReadFile()
 
+def _gzip_member(block):
+    # Compress a block of data into a complete gzip member.  zlib releases the GIL while it
+    # works, so several of these can run at once in different threads.
+    import zlib
+    z = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return z.compress(block) + z.flush()
+
+def _gzip_nthreads(nblocks):
+    # The number of threads to use for compressing nblocks blocks.
+    nthreads = gzip_nthreads
+    if nthreads is None or nthreads <= 0:
+        from multiprocessing import cpu_count
+        nthreads = cpu_count()
+    return max(min(nthreads, nblocks), 1)
+
+def _write_gzip_data(data, file):
+    # Write the bytes in data to file as a gzip file, compressing blocks in parallel.
+    # Each member is written as soon as it (and all the ones before it) are done, so only a few
+    # compressed blocks are held in memory at a time.  If data is a memoryview, the blocks are
+    # views into it, not copies.
+    n = gzip_block_size
+    blocks = [ data[i:i+n] for i in range(0, len(data), n) ] or [ data ]
+    nthreads = _gzip_nthreads(len(blocks))
+    with open(file, 'wb') as fout:
+        if nthreads > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(nthreads)
+            try:
+                for member in pool.imap(_gzip_member, blocks):
+                    fout.write(member)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for block in blocks:
+                fout.write(_gzip_member(block))
+
+def _buffer_data(buf):
+    # Return the contents of an io.BytesIO buffer without copying them if possible.
+    try:
+        return buf.getbuffer()
+    except AttributeError:  # pragma: no cover  (Python 2 doesn't have getbuffer.)
+        return buf.getvalue()
+
+def _write_gzip_in_mem(data, file):
+    # There is a compresslevel option (for both gzip and bz2), but we just use the default.
+    import gzip
+    with gzip.open(file, 'wb') as fout:
+        fout.write(data)
+
+def _write_gzip_file(src, file):
+    # Compress the existing file src into file in the same way as _write_gzip_data.  Only
+    # nthreads blocks are read from src at a time, so the file doesn't need to fit in memory.
+    n = gzip_block_size
+    nthreads = _gzip_nthreads((os.path.getsize(src) + n - 1) // n)
+    pool = None
+    if nthreads > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(nthreads)
+    try:
+        with open(src, 'rb') as fin:
+            with open(file, 'wb') as fout:
+                while True:
+                    blocks = [ fin.read(n) for i in range(nthreads) ]
+                    blocks = [ block for block in blocks if block ]
+                    if not blocks: break
+                    if pool is not None:
+                        members = pool.map(_gzip_member, blocks)
+                    else:
+                        members = [ _gzip_member(block) for block in blocks ]
+                    for member in members:
+                        fout.write(member)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+def _compress_file(src, file, file_compress):
+    # Compress the existing (uncompressed) FITS file src into file.  This is for code that writes
+    # its own FITS file in pieces rather than through a pyfits hdu_list, which _write_file needs.
+    # gzip uses the threaded compression.  If that fails, and for bzip2, the file is copied in
+    # blocks through python's gzip or bz2 module.  Either way, src is never all in memory.
+    import shutil
+    if file_compress == 'gzip':
+        try:
+            return _write_gzip_file(src, file)
+        except KeyboardInterrupt:
+            raise
+        except Exception:  # pragma: no cover
+            import gzip
+            fout = gzip.open(file, 'wb')
+    elif file_compress == 'bzip2':
+        import bz2
+        fout = bz2.BZ2File(file, 'wb')
+    else:
+        raise ValueError("Unknown file_compression")
+    with open(src, 'rb') as fin:
+        with fout:
+            shutil.copyfileobj(fin, fout, gzip_block_size)
+
 # Do the same trick for _write_file(file,hdu_list,clobber,file_compress,pyfits_compress):
 class _WriteFile:
 
     # There are several methods available for each of gzip and bzip2.  Each is its own function.
+    def gzip_threads(self, hdu_list, file):
+        import io
+        buf = io.BytesIO()
+        hdu_list.writeto(buf)
+        data = _buffer_data(buf)
+        if background_gzip:
+            # The data are all in buf now, so the caller is free to change the images.
+            self.wait()
+            import threading
+            self._thread = threading.Thread(target=self._background_write, args=(data, file))
+            self._thread.start()
+        else:
+            _write_gzip_data(data, file)
+
+    def _background_write(self, data, file):
+        # The hdu_list may have changed by now, so the fallback methods that write it again
+        # can't be used here.  Use python's gzip module on the data we have instead, and tell
+        # wait() to move on to the next method for later files.
+        try:
+            _write_gzip_data(data, file)
+        except Exception:  # pragma: no cover
+            self._threads_failed = True
+            try:
+                _write_gzip_in_mem(data, file)
+            except Exception as e:
+                self._error = e
+
+    def wait(self):
+        # Wait for any background write to finish.  If it failed, raise the error here.
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._threads_failed:  # pragma: no cover
+            self._threads_failed = False
+            if self.gz == self.gzip_threads:
+                self.gz_index += 1
+                self.gz = self.gz_methods[self.gz_index]
+        if self._error is not None:  # pragma: no cover
+            e = self._error
+            self._error = None
+            raise e
+
     def gzip_call2(self, hdu_list, file):  # pragma: no cover
         root, ext = os.path.splitext(file)
         import subprocess
@@ -257,17 +417,12 @@ class _WriteFile:
             assert p.returncode == 0
 
     def gzip_in_mem(self, hdu_list, file):  # pragma: no cover
-        import gzip
         import io
         # The compression routines work better if we first write to an internal buffer
         # and then output that to a file.
         buf = io.BytesIO()
         hdu_list.writeto(buf)
-        data = buf.getvalue()
-        # There is a compresslevel option (for both gzip and bz2), but we just use the
-        # default.
-        with gzip.open(file, 'wb') as fout:
-            fout.write(data)
+        _write_gzip_in_mem(_buffer_data(buf), file)
 
     def gzip_tmp(self, hdu_list, file):  # pragma: no cover
         import gzip
@@ -315,9 +470,8 @@ class _WriteFile:
         import io
         buf = io.BytesIO()
         hdu_list.writeto(buf)
-        data = buf.getvalue()
         with bz2.BZ2File(file, 'wb') as fout:
-            fout.write(data)
+            fout.write(_buffer_data(buf))
 
     def bz2_tmp(self, hdu_list, file):  # pragma: no cover
         import bz2
@@ -343,12 +497,19 @@ class _WriteFile:
         # almost as good.  (Sometimes it is faster than the call2 option, but when it is slower it
         # can be much slower.)  And finally, if this fails, which I think may happen for very old
         # versions of pyfits, *_tmp is the fallback option.
+        # For gzip, we now first try our own in-process compression, which uses multiple threads
+        # and can run in the background.  It should always work, but the others are still
+        # available as fallbacks.
         self.gz_index = 0
         self.bz2_index = 0
-        self.gz_methods = [self.gzip_call, self.gzip_call2, self.gzip_in_mem, self.gzip_tmp]
+        self.gz_methods = [self.gzip_threads, self.gzip_call, self.gzip_call2, self.gzip_in_mem,
+                           self.gzip_tmp]
         self.bz2_methods = [self.bzip2_call, self.bzip2_call2,  self.bz2_in_mem, self.bz2_tmp]
         self.gz = self.gz_methods[0]
         self.bz2 = self.bz2_methods[0]
+        self._thread = None
+        self._error = None
+        self._threads_failed = False
 
     def __call__(self, file, dir, hdu_list, clobber, file_compress, pyfits_compress):
         import os
@@ -356,6 +517,10 @@ class _WriteFile:
         if dir:
             file = os.path.join(dir,file)
 
+        # Don't let a background write race with writing the same file again.
+        if self._thread is not None:
+            self.wait()
+
         if os.path.isfile(file):
             if clobber:
                 os.remove(file)
@@ -414,6 +579,18 @@ class _WriteFile:
                 pyfits.hdu.compressed.COMPRESSION_ENABLED = True
 _write_file = _WriteFile()
 
+def waitForWrites():
+    """Wait until any gzipped files being written in the background are finished.
+
+    This is only relevant if `galsim.fits.background_gzip` has been set to True, in which case
+    the compression and writing of gzipped files happen in a background thread.  If one of these
+    writes failed, the exception is raised here.
+    """
+    _write_file.wait()
+
+import atexit
+atexit.register(waitForWrites)
+
 def _add_hdu(hdu_list, data, pyfits_compress):
     from galsim._pyfits import pyfits, pyfits_version
     if pyfits_compress:
@@ -756,6 +933,10 @@ def writeFile(file_name, hdu_list, dir=None, clobber=True, compression='auto'):
                         directly are not available at this point.  If you want to use one of them,
                         it must be applied when writing each hdu.
                         [default: 'auto']
+
+    gzip compression is done with multiple threads, and optionally in the background.  See the
+    module variables `gzip_nthreads`, `gzip_block_size`, `gzip_level` and `background_gzip` and the
+    function waitForWrites() for how to control this.
     """
     file_compress, pyfits_compress = _parse_compression(compression,file_name)
     if pyfits_compress and compression != 'auto':
@@ -776,7 +957,7 @@ def writeFile(file_name, hdu_list, dir=None, clobber=True, compression='auto'):
 ##############################################################################################
 
 
-def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
+def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto', bounds=None):
     """Construct an Image from a FITS file or pyfits HDUList.
 
     The normal usage for this function is to read a fits file and return the image contained
@@ -784,6 +965,16 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
     an HDUList, in which case it will select the indicated hdu (with the `hdu` parameter)
     from that.
 
+    If you only need part of a large image (e.g. to cut out postage stamps), use the `bounds`
+    parameter.  For uncompressed files, only the pixels within `bounds` are then read from disk
+    (through a memory map if pyfits supports it), so this is much faster and uses much less memory
+    than reading the whole image and taking a subImage.  The header and WCS are still read in full.
+    The returned image has the same data type as when reading the whole image, including for
+    integer data stored with BZERO and BSCALE.
+
+    If you want many stamps from the same file, it is most efficient to open it once with
+    `pyfits.open` and pass the HDUList to this function each time.
+
     Not all FITS pixel types are supported (only those with C++ Image template instantiations:
     `short`, `int`, `float`, and `double`).  If the FITS header has GS_* keywords, these will be
     used to initialize the bounding box and WCS.  If not, the bounding box will have `(xmin,ymin)`
@@ -818,6 +1009,9 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
                                    '*.bz2' => 'bzip2'
                                    otherwise None
                         [default: 'auto']
+    @param bounds       If given, a BoundsI giving the portion of the image to read.  It must be
+                        fully contained in the image.  [default: None, which means to read the
+                        whole image]
 
     @returns the image as an Image instance.
     """
@@ -828,6 +1022,8 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
         raise TypeError("Cannot provide both file_name and hdu_list to read()")
     if not (file_name or hdu_list is not None):
         raise TypeError("Must provide either file_name or hdu_list to read()")
+    if bounds is not None and not isinstance(bounds, galsim.BoundsI):
+        raise TypeError("bounds must be a galsim.BoundsI instance")
 
     if file_name:
         hdu_list, fin = _read_file(file_name, dir, file_compress)
@@ -836,14 +1032,17 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
         hdu = _get_hdu(hdu_list, hdu, pyfits_compress)
 
         wcs, origin = galsim.wcs.readFromFitsHeader(hdu.header)
-        dt = hdu.data.dtype.type
-        if dt in galsim.Image.valid_dtypes:
-            data = hdu.data
+        if bounds is not None:
+            data = _read_section(hdu, bounds, origin)
+            origin = galsim.PositionI(bounds.xmin, bounds.ymin)
         else:
+            data = hdu.data
+        dt = data.dtype.type
+        if dt not in galsim.Image.valid_dtypes:
             import warnings
             warnings.warn("No C++ Image template instantiation for data type %s" % dt)
             warnings.warn("   Using numpy.float64 instead.")
-            data = hdu.data.astype(np.float64)
+            data = data.astype(np.float64)
 
         image = galsim.Image(array=data)
         image.setOrigin(origin)
@@ -856,7 +1055,56 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
 
     return image
 
-def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
+def _read_section(hdu, bounds, origin):
+    # Read the part of the data in hdu within the given bounds.  The image starts at origin.
+    # For a data cube, this reads that part of every image in the cube.
+    from galsim._pyfits import pyfits
+    nx = hdu.header['NAXIS1']
+    ny = hdu.header['NAXIS2']
+    full_bounds = galsim.BoundsI(origin.x, origin.x+nx-1, origin.y, origin.y+ny-1)
+    if not full_bounds.includes(bounds):
+        raise ValueError("bounds %s are not within the image bounds %s"%(bounds, full_bounds))
+    i1 = bounds.ymin - origin.y
+    i2 = bounds.ymax - origin.y + 1
+    j1 = bounds.xmin - origin.x
+    j2 = bounds.xmax - origin.x + 1
+    index = (slice(None),) * (hdu.header['NAXIS']-2) + (slice(i1,i2), slice(j1,j2))
+    if isinstance(hdu, pyfits.CompImageHDU) or not hasattr(hdu, 'section'):
+        # No way to avoid decompressing everything.  Copy so we don't hold onto the full array.
+        return hdu.data[index].copy()
+    else:
+        # This only reads the rows we need, and it applies any BSCALE, BZERO scaling.
+        # However, it may return the scaled values as floats when hdu.data would have kept an
+        # integer type (e.g. uint16 stored with BZERO=32768), so convert to the same type.
+        data = hdu.section[index]
+        dt = _data_dtype(hdu)
+        if data.dtype != dt:
+            data = data.astype(dt)
+        return data
+
+def _data_dtype(hdu):
+    # The dtype pyfits uses for hdu.data, taking into account any BSCALE, BZERO scaling, worked out
+    # from the header so we don't have to read the data.
+    header = hdu.header
+    bitpix = header['BITPIX']
+    bscale = header.get('BSCALE', 1)
+    bzero = header.get('BZERO', 0)
+    raw_types = { 8: np.uint8, 16: np.int16, 32: np.int32, 64: np.int64,
+                  -32: np.float32, -64: np.float64 }
+    if bitpix < 0 or (bscale == 1 and bzero == 0):
+        return np.dtype(raw_types[bitpix])
+    # Unsigned integers (and signed bytes) are stored as the other kind with an offset of BZERO.
+    # pyfits returns these with the original type unless it was opened with uint=False.
+    if bscale == 1 and getattr(hdu, '_uint', True):
+        if bitpix == 8 and bzero == -128:
+            return np.dtype(np.int8)
+        uint_types = { 16: np.uint16, 32: np.uint32, 64: np.uint64 }
+        if bitpix in uint_types and bzero == 2**(bitpix-1):
+            return np.dtype(uint_types[bitpix])
+    # Otherwise the data are scaled to floats.
+    return np.dtype(np.float64 if bitpix > 16 else np.float32)
+
+def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto', bounds=None):
     """Construct a list of Images from a FITS file or pyfits HDUList.
 
     The normal usage for this function is to read a fits file and return a list of all the images
@@ -893,6 +1141,10 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
                                    otherwise None
                         [default: 'auto']
 
+    @param bounds       If given, a BoundsI giving the portion of each image to read.  It must be
+                        fully contained in all of the images.  See `read` for details.
+                        [default: None, which means to read the whole images]
+
     @returns a Python list of Images
     """
     from galsim._pyfits import pyfits
@@ -920,7 +1172,8 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
             if len(hdu_list) < 1:
                 raise IOError('Expecting at least one HDU in galsim.readMulti')
         for hdu in range(first,len(hdu_list)):
-            image_list.append(read(hdu_list=hdu_list, hdu=hdu, compression=pyfits_compress))
+            image_list.append(read(hdu_list=hdu_list, hdu=hdu, compression=pyfits_compress,
+                                   bounds=bounds))
 
     finally:
         # If we opened a file, don't forget to close it.
@@ -929,7 +1182,8 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
 
     return image_list
 
-def readCube(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto'):
+def readCube(file_name=None, dir=None, hdu_list=None, hdu=None, compression='auto',
+             bounds=None):
     """Construct a Python list of Images from a FITS data cube.
 
     Not all FITS pixel types are supported (only those with C++ Image template instantiations are:
@@ -967,6 +1221,10 @@ def readCube(file_name=None, dir=None, hdu_list=None, hdu=None, compression='aut
                                    otherwise None
                         [default: 'auto']
 
+    @param bounds       If given, a BoundsI giving the portion of each image in the cube to read.
+                        It must be fully contained in the images.  See `read` for details.
+                        [default: None, which means to read the whole images]
+
     @returns a Python list of Images.
     """
 
@@ -976,6 +1234,8 @@ def readCube(file_name=None, dir=None, hdu_list=None, hdu=None, compression='aut
         raise TypeError("Cannot provide both file_name and hdu_list to read()")
     if not (file_name or hdu_list is not None):
         raise TypeError("Must provide either file_name or hdu_list to read()")
+    if bounds is not None and not isinstance(bounds, galsim.BoundsI):
+        raise TypeError("bounds must be a galsim.BoundsI instance")
 
     if file_name:
         hdu_list, fin = _read_file(file_name, dir, file_compress)
@@ -984,14 +1244,17 @@ def readCube(file_name=None, dir=None, hdu_list=None, hdu=None, compression='aut
 
     try:
         wcs, origin = galsim.wcs.readFromFitsHeader(hdu.header)
-        dt = hdu.data.dtype.type
-        if dt in galsim.Image.valid_dtypes:
-            data = hdu.data
+        if bounds is not None:
+            data = _read_section(hdu, bounds, origin)
+            origin = galsim.PositionI(bounds.xmin, bounds.ymin)
         else:
+            data = hdu.data
+        dt = data.dtype.type
+        if dt not in galsim.Image.valid_dtypes:
             import warnings
             warnings.warn("No C++ Image template instantiation for data type %s" % dt)
             warnings.warn("   Using numpy.float64 instead.")
-            data = hdu.data.astype(np.float64)
+            data = data.astype(np.float64)
 
         nimages = data.shape[0]
         image_list = []
@@ -1960,6 +1960,7 @@ class GSObject(object):
                             [default: ()]
         @param maxN         Sets the maximum number of photons that will be added to the image
                             at a time.  (Memory requirements are proportional to this number.)
+                            The same PhotonArray buffer is reused for each batch of photons.
                             [default: None, which means no limit]
         @param orig_center  The position of the image center in the original image coordinates.
                             [default: (0,0)]
@@ -2005,15 +2006,23 @@ class GSObject(object):
 
         if not add_to_image: image.setZero()
 
+        # If shooting in several batches, reuse the same PhotonArray (and temporary image if
+        # needed) for each one rather than allocating new ones every time.
+        reuse = Ntot > maxN
+        buffer = None
+        im1 = None
+
         # Nleft is the number of photons remaining to shoot.
         Nleft = Ntot
         photons = None  # Just in case Nleft is already 0.
         while Nleft > 0:
             # Shoot at most maxN at a time
             thisN = min(maxN, Nleft)
+            if reuse and (buffer is None or buffer.size() != thisN):
+                buffer = galsim.PhotonArray(thisN)
 
             try:
-                photons = self.shoot(thisN, ud)
+                photons = self.shoot(thisN, ud, photons=buffer)
             except RuntimeError:  # pragma: no cover
                 # Give some extra explanation as a warning, then raise the original exception
                 # so the traceback shows as much detail as possible.
@@ -2036,7 +2045,10 @@ class GSObject(object):
                 added_flux += sensor.accumulate(photons, image, orig_center)
             else:
                 # Need a temporary
-                im1 = galsim.ImageD(bounds=image.bounds)
+                if im1 is None:
+                    im1 = galsim.ImageD(bounds=image.bounds)
+                else:
+                    im1.setZero()
                 added_flux += sensor.accumulate(photons, im1, orig_center)
                 image.array[:,:] += im1.array.astype(image.dtype, copy=False)
 
@@ -2045,7 +2057,7 @@ class GSObject(object):
         return added_flux, photons
 
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -2053,10 +2065,18 @@ class GSObject(object):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  Any angle or wavelength
+                            arrays already allocated in it are left untouched.  [default: None]
         @returns PhotonArray.
         """
         ud = galsim.UniformDeviate(rng)
-        return self._sbp.shoot(int(n_photons), ud)
+        if photons is None:
+            return self._sbp.shoot(int(n_photons), ud)
+        from .photon_array import _get_photon_buffer
+        photons = _get_photon_buffer(photons, int(n_photons))
+        self._sbp.shoot(photons, ud)
+        return photons
 
     def drawKImage(self, image=None, nx=None, ny=None, bounds=None, scale=None,
                    add_to_image=False, recenter=True, setup_only=False,
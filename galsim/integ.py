@@ -138,6 +138,49 @@ def trapzRule(f, xs):
     return result
 
 
+def midptWeights(xs):
+    """The weights used by midptRule for each of the evaluation points.
+
+    midptRule(f, xs) is equivalent to sum(w*f(x) for w,x in zip(midptWeights(xs), xs)).
+
+    @param xs  Locations at which to evaluate f.
+
+    @returns  An array of weights for each location.
+    """
+    if len(xs) < 2:
+        raise ValueError("Not enough points for midptRule integration")
+    xs = np.asarray(xs, dtype=float)
+    weights = np.empty(len(xs))
+    weights[0] = xs[1]-xs[0]
+    weights[1:-1] = 0.5*(xs[2:]-xs[:-2])
+    weights[-1] = xs[-1]-xs[-2]
+    return weights
+
+
+def trapzWeights(xs):
+    """The weights used by trapzRule for each of the evaluation points.
+
+    trapzRule(f, xs) is equivalent to sum(w*f(x) for w,x in zip(trapzWeights(xs), xs)).
+
+    @param xs  Locations at which to evaluate f.
+
+    @returns  An array of weights for each location.
+    """
+    if len(xs) < 2:
+        raise ValueError("Not enough points for trapzRule integration")
+    xs = np.asarray(xs, dtype=float)
+    weights = np.empty(len(xs))
+    weights[0] = 0.5*(xs[1]-xs[0])
+    weights[1:-1] = 0.5*(xs[2:]-xs[:-2])
+    weights[-1] = 0.5*(xs[-1]-xs[-2])
+    return weights
+
+
+# The rules for which we know the weights, so the integrand can be accumulated one wavelength at a
+# time rather than letting the rule combine the images.
+_rule_weights = { midptRule : midptWeights, trapzRule : trapzWeights }
+
+
 class ImageIntegrator(object):
     def __init__(self):
         raise NotImplementedError("Must instantiate subclass of ImageIntegrator")
@@ -147,6 +190,11 @@ class ImageIntegrator(object):
     # 2) an function attribute `.rule` which takes a integrand function as its first
     #    argument, and a list of evaluation wavelengths as its second argument, and returns
     #    an approximation to the integral.  (E.g., the function midptRule above)
+    #
+    # For the rules midptRule and trapzRule, the weighted monochromatic images are accumulated
+    # into a single output image as they are drawn, so only two images are ever held in memory,
+    # regardless of the number of wavelengths.  Other rules are given the integrand function and
+    # are responsible for combining the images.
 
     def __call__(self, evaluateAtWavelength, bandpass, image, drawImageKwargs, doK=False):
         """
@@ -164,13 +212,36 @@ class ImageIntegrator(object):
         self.last_n_eval = len(waves)
         drawImageKwargs.pop('add_to_image', None) # Make sure add_to_image isn't in kwargs
 
-        def integrand(w):
-            prof = evaluateAtWavelength(w) * bandpass(w)
-            if not doK:
-                return prof.drawImage(image=image.copy(), **drawImageKwargs)
-            else:
-                return prof.drawKImage(image=image.copy(), **drawImageKwargs)
-        return self.rule(integrand, waves)
+        weights_func = _rule_weights.get(self.rule, None)
+        if weights_func is None:
+            def integrand(w):
+                prof = evaluateAtWavelength(w) * bandpass(w)
+                if not doK:
+                    return prof.drawImage(image=image.copy(), **drawImageKwargs)
+                else:
+                    return prof.drawKImage(image=image.copy(), **drawImageKwargs)
+            return self.rule(integrand, waves)
+
+        weights = weights_func(waves)
+        return _accumulate(evaluateAtWavelength, bandpass, image, drawImageKwargs, doK,
+                           waves, weights)
+
+
+def _accumulate(evaluateAtWavelength, bandpass, image, drawImageKwargs, doK, waves, weights):
+    # Draw the monochromatic profile at each wavelength into a single scratch image, and add it
+    # with the given weight into the result.
+    result = image.copy()
+    result.setZero()
+    scratch = image.copy()
+    for w, weight in zip(waves, weights):
+        prof = evaluateAtWavelength(w) * bandpass(w)
+        if not doK:
+            prof.drawImage(image=scratch, **drawImageKwargs)
+        else:
+            prof.drawKImage(image=scratch, **drawImageKwargs)
+        scratch *= weight
+        result += scratch
+    return result
 
 
 class SampleIntegrator(ImageIntegrator):
@@ -246,3 +317,116 @@ class ContinuousIntegrator(ImageIntegrator):
             return [bandpass.blue_limit + h * i for i in range(self.N+1)]
         else:
             return [bandpass.blue_limit + h * (i+0.5) for i in range(self.N)]
+
+
+class AdaptiveIntegrator(ImageIntegrator):
+    """Create a chromatic surface brightness profile integrator, which will integrate over
+    wavelength using a Bandpass as a weight function, choosing the wavelengths at which to draw
+    the monochromatic images adaptively.
+
+    This integrator starts with `N_init` equally spaced wavelengths between bandpass.blue_limit
+    and bandpass.red_limit (inclusive).  Each interval between neighboring wavelengths is then
+    checked by evaluating the integrand at its midpoint, and is split in two if the integrand there
+    differs from the linear interpolation between the ends of the interval by more than the
+    tolerance allows.  The full images are only drawn at the final set of wavelengths, so for
+    smooth SEDs and PSFs, many fewer monochromatic images are drawn than with SampleIntegrator or
+    ContinuousIntegrator.
+
+    The integrand is not drawn while deciding where to refine.  Instead the monochromatic profile is
+    made at each candidate wavelength and measured with a proxy: its Fourier amplitudes (times the
+    bandpass throughput) at a handful of k values between 0 and the maximum k value represented in
+    the image.  Only these amplitudes are kept, and the profiles at the final wavelengths are made
+    again one at a time as they are drawn, so the memory used does not grow with the number of
+    wavelengths.  This pays off when drawing the profile costs more than making it.  An interval
+    is split if the error in the contribution of that interval to the integral of any of these
+    amplitudes exceeds `rel_tol` times the total integral of the flux (k=0), scaled by the
+    fraction of the bandpass covered by the interval.
+
+    The final images are combined using the trapezoidal rule.  The number of monochromatic images
+    drawn is recorded as the attribute `last_n_eval` of the integrator, and as `_last_n_eval` of
+    the ChromaticObject being drawn.  The number of wavelengths at which the proxy was evaluated is
+    recorded as `last_n_proxy`.
+
+    @param rel_tol      The relative tolerance of the integral.  [default: 1.e-4]
+    @param N_init       Number of equally spaced wavelengths with which to start. [default: 9]
+    @param max_n_eval   The maximum number of wavelengths at which to draw the monochromatic
+                        images.  Refinement stops when this is reached.  [default: 250]
+    """
+    def __init__(self, rel_tol=1.e-4, N_init=9, max_n_eval=250):
+        if N_init < 2:
+            raise ValueError("AdaptiveIntegrator requires N_init >= 2")
+        if max_n_eval < N_init:
+            raise ValueError("AdaptiveIntegrator requires max_n_eval >= N_init")
+        self.rule = trapzRule
+        self.rel_tol = rel_tol
+        self.N_init = N_init
+        self.max_n_eval = max_n_eval
+
+    def __call__(self, evaluateAtWavelength, bandpass, image, drawImageKwargs, doK=False):
+        """
+        @param evaluateAtWavelength Function that returns a monochromatic surface brightness
+                                    profile as a function of wavelength.
+        @param bandpass             Bandpass object representing the filter being imaged through.
+        @param image                Image used to set size and scale of output
+        @param drawImageKwargs      dict with other kwargs to send to drawImage function.
+        @param doK                  Integrate up results of drawKImage instead of results of
+                                    drawImage.  [default: False]
+
+        @returns the result of integral as an Image
+        """
+        drawImageKwargs.pop('add_to_image', None) # Make sure add_to_image isn't in kwargs
+
+        # The largest k value represented in the image.
+        if doK:
+            kmax = image.scale * min(image.array.shape) / 2.
+        else:
+            kmax = np.pi / image.wcs.minLinearScale(image_pos=image.true_center)
+        kpos = [_galsim.PositionD(0., 0.)]
+        for f in [0.125, 0.25, 0.5, 1.0]:
+            kpos.extend([_galsim.PositionD(f*kmax, 0.), _galsim.PositionD(0., f*kmax)])
+
+        # Only keep the proxy values.  The profiles can be large (e.g. an InterpolatedImage at each
+        # wavelength), so they are remade for drawing rather than kept.
+        proxy = {}
+        def evaluate(w):
+            prof = evaluateAtWavelength(w) * bandpass(w)
+            proxy[w] = np.array([prof._kValue(k) for k in kpos])
+
+        waves = self.calculateWaves(bandpass)
+        for w in waves:
+            evaluate(w)
+        width = waves[-1] - waves[0]
+
+        # The intervals that still need to be checked.
+        todo = list(zip(waves[:-1], waves[1:]))
+        nodes = set(waves)
+        n_proxy = len(waves)
+        while todo and len(nodes) < self.max_n_eval:
+            ws = sorted(nodes)
+            total = abs(trapzRule(lambda w: proxy[w][0], ws))
+            next_todo = []
+            for a, b in todo:
+                if len(nodes) >= self.max_n_eval:
+                    break
+                m = 0.5*(a+b)
+                evaluate(m)
+                n_proxy += 1
+                err = 0.5*(b-a) * np.max(np.abs(proxy[m] - 0.5*(proxy[a]+proxy[b])))
+                if err > self.rel_tol * total * (b-a) / width:
+                    nodes.add(m)
+                    next_todo.extend([(a, m), (m, b)])
+                else:
+                    # The midpoint isn't needed.
+                    del proxy[m]
+            todo = next_todo
+
+        waves = sorted(nodes)
+        self.last_n_eval = len(waves)
+        self.last_n_proxy = n_proxy
+        weights = trapzWeights(waves)
+        return _accumulate(evaluateAtWavelength, bandpass, image, drawImageKwargs, doK,
+                           waves, weights)
+
+    def calculateWaves(self, bandpass):
+        """Return the initial wavelengths, before any refinement."""
+        return list(np.linspace(bandpass.blue_limit, bandpass.red_limit, self.N_init))
@@ -75,6 +75,98 @@ import galsim
 from galsim import GSObject
 
 
+def _read_only(*arrays):
+    for a in arrays:
+        a.setflags(write=False)
+    return arrays if len(arrays) > 1 else arrays[0]
+
+# The pupil plane coordinate arrays only depend on npix and the pupil plane size (or the ratio of
+# the size to the diameter for rho), so share them between Apertures.  They are made read-only to
+# prevent accidentally modifying the cached versions.
+def __pupil_uv(npix, pupil_plane_size):
+    u = np.fft.fftshift(np.fft.fftfreq(npix, 1./pupil_plane_size))
+    return _read_only(*np.meshgrid(u, u))
+_pupil_uv = galsim.utilities.LRU_Cache(__pupil_uv, maxsize=16)
+
+def __pupil_rsqr(npix, pupil_plane_size):
+    u, v = _pupil_uv(npix, pupil_plane_size)
+    return _read_only(u**2 + v**2)
+_pupil_rsqr = galsim.utilities.LRU_Cache(__pupil_rsqr, maxsize=16)
+
+def __pupil_rho(npix, d):
+    u = np.fft.fftshift(np.fft.fftfreq(npix, d))
+    u, v = np.meshgrid(u, u)
+    return _read_only(u + 1j * v)
+_pupil_rho = galsim.utilities.LRU_Cache(__pupil_rho, maxsize=16)
+
+
+class _PupilPlaneKey(object):
+    """Key for _pupil_plane_cache.  Only `key` is used for hashing and comparison.  `compute` is a
+    function returning (npix, pupil_plane_scale, pupil_plane_size, illuminated), which is called on
+    a cache miss.
+    """
+    def __init__(self, key, compute):
+        self.key = key
+        self.compute = compute
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+def _pupil_image_key(pupil_plane_im):
+    """Return a hashable description of the contents of a pupil plane image, array or file name.
+    """
+    if isinstance(pupil_plane_im, basestring):
+        import os
+        st = os.stat(pupil_plane_im)
+        return ('file', os.path.abspath(pupil_plane_im), st.st_mtime, st.st_size)
+    import hashlib
+    if isinstance(pupil_plane_im, galsim.Image):
+        scale = pupil_plane_im.scale
+        arr = pupil_plane_im.array
+    else:
+        scale = None
+        arr = np.asarray(pupil_plane_im)
+    digest = hashlib.sha1(np.ascontiguousarray(arr).tobytes()).hexdigest()
+    return ('array', arr.shape, str(arr.dtype), scale, digest)
+
+
+def __pupil_plane(key):
+    import os
+    # Don't keep the inputs to the calculation alive in the cache.
+    compute, key.compute = key.compute, None
+    file_name = None
+    if Aperture.cache_dir is not None:
+        import hashlib
+        digest = hashlib.sha1(repr(key.key).encode('utf-8')).hexdigest()
+        file_name = os.path.join(Aperture.cache_dir, 'aperture_%s.npz'%digest)
+        if os.path.isfile(file_name):
+            data = np.load(file_name)
+            try:
+                result = (int(data['npix']), float(data['pupil_plane_scale']),
+                          float(data['pupil_plane_size']), data['illuminated'])
+            finally:
+                data.close()
+            _read_only(result[3])
+            return result
+    result = compute()
+    _read_only(result[3])
+    if file_name is not None:
+        # Write to a temporary name first, so other processes never see a partial file.
+        tmp_name = file_name + '.%d.tmp.npz'%os.getpid()
+        np.savez(tmp_name, npix=result[0], pupil_plane_scale=result[1],
+                 pupil_plane_size=result[2], illuminated=result[3])
+        os.rename(tmp_name, file_name)
+    return result
+_pupil_plane_cache = galsim.utilities.LRU_Cache(__pupil_plane, maxsize=100)
+
+
 class Aperture(object):
     """ Class representing a telescope aperture embedded in a larger pupil plane array -- for use
     with the PhaseScreenPSF class to create PSFs via Fourier or geometric optics.
@@ -200,7 +292,18 @@ class Aperture(object):
                                adjusting the pupil size.  [default: None]
     @param gsparams            An optional GSParams argument.  See the docstring for GSParams for
                                details. [default: None]
+
+    Caching
+    -------
+
+    The illuminated pupil plane arrays, as well as the `u`, `v`, `rsqr`, and `rho` coordinate
+    arrays, are cached and shared (read-only) between Apertures with the same geometry, so making
+    many identical Apertures (e.g., when drawing many OpticalPSFs) is cheap.  If the class
+    attribute `Aperture.cache_dir` is set to the name of a directory, then the illuminated pupil
+    plane arrays are also stored there, so they can be reused by later processes.
     """
+    cache_dir = None
+
     def __init__(self, diam, lam=None, circular_pupil=True, obscuration=0.0,
                  nstruts=0, strut_thick=0.05, strut_angle=0.0*galsim.degrees,
                  oversampling=1.0, pad_factor=1.0, screen_list=None,
@@ -327,33 +430,61 @@ class Aperture(object):
         self._strut_thick = strut_thick
         self._strut_angle = strut_angle
 
+        if nstruts > 0 and not isinstance(strut_angle, galsim.Angle):
+            raise TypeError("Input kwarg strut_angle must be a galsim.Angle instance.")
+        strut_angle_rad = strut_angle.rad if nstruts > 0 else 0.
+        key = ('generate', self.npix, self.pupil_plane_size, self.diam, circular_pupil,
+               obscuration, nstruts, strut_thick, strut_angle_rad)
+        compute = lambda: (self.npix, self.pupil_plane_scale, self.pupil_plane_size,
+                           self._make_illuminated(circular_pupil, obscuration, nstruts,
+                                                  strut_thick, strut_angle_rad))
+        self._illuminated = _pupil_plane_cache(_PupilPlaneKey(key, compute))[3]
+
+    def _make_illuminated(self, circular_pupil, obscuration, nstruts, strut_thick, strut_angle_rad):
+        """Compute the illuminated array for a geometric pupil.  Use _generate_pupil_plane, which
+        caches the result, rather than calling this directly.
+        """
         radius = 0.5*self.diam
         if circular_pupil:
-            self._illuminated = (self.rsqr < radius**2)
+            illuminated = (self.rsqr < radius**2)
             if obscuration > 0.:
-                self._illuminated *= self.rsqr >= (radius*obscuration)**2
+                illuminated *= self.rsqr >= (radius*obscuration)**2
         else:
-            self._illuminated = (np.abs(self.u) < radius) & (np.abs(self.v) < radius)
+            illuminated = (np.abs(self.u) < radius) & (np.abs(self.v) < radius)
             if obscuration > 0.:
-                self._illuminated *= ((np.abs(self.u) >= radius*obscuration) *
-                                      (np.abs(self.v) >= radius*obscuration))
+                illuminated *= ((np.abs(self.u) >= radius*obscuration) *
+                                (np.abs(self.v) >= radius*obscuration))
 
         if nstruts > 0:
-            if not isinstance(strut_angle, galsim.Angle):
-                raise TypeError("Input kwarg strut_angle must be a galsim.Angle instance.")
             # Add the initial rotation if requested, converting to radians.
             rot_u, rot_v = self.u, self.v
-            if strut_angle.rad != 0.:
-                rot_u, rot_v = galsim.utilities.rotate_xy(rot_u, rot_v, -strut_angle)
+            if strut_angle_rad != 0.:
+                rot_u, rot_v = galsim.utilities.rotate_xy(rot_u, rot_v,
+                                                          -strut_angle_rad*galsim.radians)
             rotang = 360. * galsim.degrees / nstruts
             # Then loop through struts setting to zero the regions which lie under the strut
             for istrut in range(nstruts):
                 rot_u, rot_v = galsim.utilities.rotate_xy(rot_u, rot_v, -rotang)
-                self._illuminated *= ((np.abs(rot_u) >= radius * strut_thick) + (rot_v < 0.0))
+                illuminated *= ((np.abs(rot_u) >= radius * strut_thick) + (rot_v < 0.0))
+        return illuminated
 
     def _load_pupil_plane(self, pupil_plane_im, pupil_angle, pupil_plane_scale, good_pupil_scale,
                           good_pupil_size):
         """ Create an array of illuminated pixels with appropriate size and scale from an input
+        image of the pupil, using the cached result if this pupil has been loaded before.
+        """
+        key = ('load', _pupil_image_key(pupil_plane_im), pupil_angle.rad, pupil_plane_scale,
+               good_pupil_scale, good_pupil_size, self.diam)
+        def compute():
+            self._read_pupil_plane(pupil_plane_im, pupil_angle, pupil_plane_scale,
+                                   good_pupil_scale, good_pupil_size)
+            return (self.npix, self.pupil_plane_scale, self.pupil_plane_size, self._illuminated)
+        (self.npix, self.pupil_plane_scale, self.pupil_plane_size,
+         self._illuminated) = _pupil_plane_cache(_PupilPlaneKey(key, compute))
+
+    def _read_pupil_plane(self, pupil_plane_im, pupil_angle, pupil_plane_scale, good_pupil_scale,
+                          good_pupil_size):
+        """ Create an array of illuminated pixels with appropriate size and scale from an input
         image of the pupil.  The basic strategy is:
 
         1.  Read in array.
@@ -522,39 +653,44 @@ class Aperture(object):
         (x, y) => x + 1j * y.
         """
         if not hasattr(self, '_rho') or self._rho is None:
-            u = np.fft.fftshift(np.fft.fftfreq(self.npix, self.diam/self.pupil_plane_size/2.0))
-            u, v = np.meshgrid(u, u)
-            self._rho = u + 1j * v
+            self._rho = _pupil_rho(self.npix, self.diam/self.pupil_plane_size/2.0)
         return self._rho
 
     @property
     def u(self):
         """Pupil horizontal coordinate array in meters."""
         if not hasattr(self, '_u'):
-            u = np.fft.fftshift(np.fft.fftfreq(self.npix, 1./self.pupil_plane_size))
-            self._u, self._v = np.meshgrid(u, u)
+            self._u, self._v = _pupil_uv(self.npix, self.pupil_plane_size)
         return self._u
 
     @property
     def v(self):
         """Pupil vertical coordinate array in meters."""
         if not hasattr(self, '_v'):
-            u = np.fft.fftshift(np.fft.fftfreq(self.npix, 1./self.pupil_plane_size))
-            self._u, self._v = np.meshgrid(u, u)
+            self._u, self._v = _pupil_uv(self.npix, self.pupil_plane_size)
         return self._v
 
+    def _illuminated_uv(self):
+        # The pupil coordinates of just the illuminated pixels.  These are read-only, so phase
+        # screens can recognize repeated requests for the same coordinates.
+        if not hasattr(self, '_u_illum'):
+            u = self.u[self.illuminated]
+            v = self.v[self.illuminated]
+            self._u_illum, self._v_illum = _read_only(u, v)
+        return self._u_illum, self._v_illum
+
     @property
     def rsqr(self):
         """Pupil radius squared array in meters squared."""
         if not hasattr(self, '_rsqr'):
-            self._rsqr = self.u**2 + self.v**2
+            self._rsqr = _pupil_rsqr(self.npix, self.pupil_plane_size)
         return self._rsqr
 
     def __getstate__(self):
         # Let unpickled object reconstruct cached values on-the-fly instead of including them in the
         # pickle.
         d = self.__dict__
-        for k in ['_rho', '_u', '_v', '_rsqr']:
+        for k in ['_rho', '_u', '_v', '_rsqr', '_u_illum', '_v_illum']:
             d.pop(k, None)
         return d
 
@@ -630,6 +766,17 @@ class PhaseScreenList(object):
     wavefront()        Compute the cumulative wavefront due to all screens.
     wavefront_gradient()   Compute the cumulative wavefront gradient due to all screens.
 
+    When many PSFs sharing the same aperture and wavelength (e.g., PSFs at many field positions)
+    are created from the same PhaseScreenList, their (delayed) calculations are batched together:
+    the wavefronts for all field angles in a batch are evaluated at once, and the Fourier transforms
+    for the batch may be distributed over several threads.  Two attributes control this process,
+    and may be changed at any time before the PSFs are drawn:
+
+        nthreads     Number of threads over which to distribute the Fourier transforms of a batch.
+                     Each thread holds one complex pupil-plane array at a time.  [default: 1]
+        batch_size   Maximum number of PSFs whose wavefronts are evaluated together.  Larger values
+                     use proportionally more memory for the wavefronts.  [default: 8]
+
     @param layers  Sequence of phase screens.
     """
     def __init__(self, *layers):
@@ -653,6 +800,8 @@ class PhaseScreenList(object):
         self._update_attrs()
         self._pending = []  # Pending PSFs to calculate upon first drawImage.
         self._update_time_heap = []  # Heap to store each PSF's next time-of-update.
+        self.nthreads = 1
+        self.batch_size = 8
 
     def __len__(self):
         return len(self._layers)
@@ -737,11 +886,11 @@ class PhaseScreenList(object):
         """Calculate previously delayed PSFs."""
         if not self._pending:
             return
-            # See if we have any dynamic screens.  If not, then we can immediately compute each PSF
-            # in a simple loop.
+        # See if we have any dynamic screens.  If not, then we can immediately compute all the PSFs
+        # in a single batch.
         if not self.dynamic:
+            self._stepMany(self._pending)
             for psf in self._pending:
-                psf._step()
                 psf._finalize()
             self._pending = []
             self._update_time_heap = []
@@ -751,21 +900,71 @@ class PhaseScreenList(object):
         # careful to always stop at multiples of each PSF's time_step attribute to update that PSF.
         # Use a heap to track the next time to stop at.
         while(self._update_time_heap):
-            # Get and seek to next time that has a PSF update.
+            # Get and seek to next time that has a PSF update.  Collect all the PSFs that need
+            # updating at this same time, so they can be stepped together.
             t, i = heappop(self._update_time_heap)
+            indices = [i]
+            while self._update_time_heap and self._update_time_heap[0][0] == t:
+                indices.append(heappop(self._update_time_heap)[1])
             self._seek(t)
-            # Update that PSF
-            psf = self._pending[i]
-            psf._step()
-            # If that PSF's next possible update time doesn't extend past its exptime, then
-            # push it back on the heap.
-            t += psf.time_step
-            if t < psf.t0 + psf.exptime:
-                heappush(self._update_time_heap, (t, i))
-            else:
-                psf._finalize()
+            # Update those PSFs
+            self._stepMany([self._pending[i] for i in indices])
+            for i in indices:
+                # If a PSF's next possible update time doesn't extend past its exptime, then
+                # push it back on the heap.
+                psf = self._pending[i]
+                tnext = t + psf.time_step
+                if tnext < psf.t0 + psf.exptime:
+                    heappush(self._update_time_heap, (tnext, i))
+                else:
+                    psf._finalize()
         self._pending = []
 
+    def _stepMany(self, psfs):
+        """Step a number of PSFs at the current time, batching those with a common aperture and
+        wavelength.
+        """
+        groups = {}
+        for psf in psfs:
+            groups.setdefault((psf.aper, psf.lam), []).append(psf)
+        for group in groups.values():
+            if len(group) == 1:
+                group[0]._step()
+            else:
+                for k in range(0, len(group), self.batch_size):
+                    self._stepBatch(group[k:k+self.batch_size])
+
+    def _stepBatch(self, psfs):
+        """Compute the current instantaneous PSFs for a list of PSFs sharing the same aperture and
+        wavelength, and add each to its developing integrated PSF.
+        """
+        aper = psfs[0].aper
+        lam = psfs[0].lam
+        illuminated = aper.illuminated
+        u, v = aper._illuminated_uv()
+        wf = self._wavefront_many(u, v, None, [psf.theta for psf in psfs])
+
+        # Use the same calculation for each PSF as PhaseScreenPSF._step, so the results don't
+        # depend on whether or not the PSFs were batched.
+        def _step_one(k):
+            expwf_grid = np.zeros_like(illuminated, dtype=np.complex128)
+            expwf_grid[illuminated] = np.exp((2j*np.pi/lam) * wf[k])
+            ftexpwf = galsim.fft.fft2(expwf_grid, shift_in=True, shift_out=True)
+            psfs[k].img += np.abs(ftexpwf)**2
+
+        nthreads = min(self.nthreads, len(psfs))
+        if nthreads > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(nthreads)
+            try:
+                pool.map(_step_one, range(len(psfs)))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for k in range(len(psfs)):
+                _step_one(k)
+
     def wavefront(self, u, v, t, theta=(0.0*galsim.arcmin, 0.0*galsim.arcmin)):
         """ Compute cumulative wavefront due to all phase screens in PhaseScreenList.
 
@@ -815,6 +1014,17 @@ class PhaseScreenList(object):
         else:
             return self._layers[0]._wavefront(u, v, t, theta)
 
+    def _wavefront_many(self, u, v, t, thetas):
+        # Wavefronts for a sequence of field angles.  Returns an array with shape
+        # (len(thetas),) + u.shape.
+        wf = np.zeros((len(thetas),) + u.shape, dtype=float)
+        for layer in self:
+            if hasattr(layer, '_wavefront_many'):
+                wf += layer._wavefront_many(u, v, t, thetas)
+            else:
+                wf += np.array([layer._wavefront(u, v, t, theta) for theta in thetas])
+        return wf
+
     def _wavefront_gradient(self, u, v, t, theta):
         if len(self._layers) > 1:
             return np.sum([layer._wavefront_gradient(u, v, t, theta) for layer in self], axis=0)
@@ -1192,8 +1402,7 @@ class PhaseScreenPSF(GSObject):
 
     def _step(self):
         """Compute the current instantaneous PSF and add it to the developing integrated PSF."""
-        u = self.aper.u[self.aper.illuminated]
-        v = self.aper.v[self.aper.illuminated]
+        u, v = self.aper._illuminated_uv()
         wf = self._screen_list._wavefront(u, v, None, self.theta)
         expwf = np.exp((2j*np.pi/self.lam) * wf)
         expwf_grid = np.zeros_like(self.aper.illuminated, dtype=np.complex128)
@@ -1248,7 +1457,7 @@ class PhaseScreenPSF(GSObject):
                                            gsparams=self._gsparams)
         self._sbp = self.ii._sbp
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -1256,11 +1465,14 @@ class PhaseScreenPSF(GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
+        from .photon_array import _get_photon_buffer
         if not self._geometric_shooting:
             self._prepareDraw()
-            return self.ii.shoot(n_photons, rng)
+            return self.ii.shoot(n_photons, rng, photons)
 
         ud = galsim.UniformDeviate(rng)
 
@@ -1277,11 +1489,16 @@ class PhaseScreenPSF(GSObject):
         u = u[pick]
         v = v[pick]
 
-        x, y = self._screen_list._wavefront_gradient(u, v, t, self.theta)
+        if self._screen_list.reversible:
+            x, y = self._screen_list._wavefront_gradient(u, v, t, self.theta)
+        else:
+            # Boiling screens need to be advanced through the exposure.  Each layer does this by
+            # sorting the photons by time and evaluating each boiling update's photons together.
+            x, y = self._screen_list.wavefront_gradient(u, v, t, self.theta)
         x *= 1e-9 * 206265  # convert wavefront gradient from nm/m to arcsec.
         y *= 1e-9 * 206265
 
-        photon_array = galsim._galsim.PhotonArray(n_photons)
+        photon_array = _get_photon_buffer(photons, n_photons)
         photon_array.x = x
         photon_array.y = y
         photon_array.flux = self._flux/n_photons
@@ -1512,7 +1729,7 @@ class OpticalPSF(GSObject):
                  nstruts=0, strut_thick=0.05, strut_angle=0.*galsim.degrees,
                  pupil_plane_im=None, pupil_plane_scale=None, pupil_plane_size=None,
                  pupil_angle=0.*galsim.degrees, scale_unit=galsim.arcsec, gsparams=None,
-                 _force_maxk=None, _force_stepk=None,
+                 _force_maxk=None, _force_stepk=None, _wavefront_screen=None,
                  suppress_warning=False, geometric_shooting=False, max_size=None):
         if max_size is not None: # pragma: no cover
             from .deprecated import depr
@@ -1553,7 +1770,8 @@ class OpticalPSF(GSObject):
         optics_screen = galsim.OpticalScreen(
                 diam=diam, defocus=defocus, astig1=astig1, astig2=astig2, coma1=coma1, coma2=coma2,
                 trefoil1=trefoil1, trefoil2=trefoil2, spher=spher, aberrations=aberrations,
-                obscuration=obscuration, annular_zernike=annular_zernike, lam_0=lam)
+                obscuration=obscuration, annular_zernike=annular_zernike, lam_0=lam,
+                _wavefront_screen=_wavefront_screen)
         self._screens = galsim.PhaseScreenList(optics_screen)
 
         # Make the aperture.
@@ -1676,7 +1894,7 @@ class OpticalPSF(GSObject):
         self._psf._prepareDraw()
         self._sbp = self._psf._sbp
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -1684,6 +1902,8 @@ class OpticalPSF(GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
-        return self._psf.shoot(n_photons, rng)
+        return self._psf.shoot(n_photons, rng, photons)
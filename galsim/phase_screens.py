@@ -18,6 +18,8 @@
 
 from builtins import range, zip
 
+import uuid
+import weakref
 import numpy as np
 import galsim
 
@@ -62,6 +64,30 @@ class AtmosphericScreen(object):
                          that `alpha` is set to something other than 1.0.  [default: None]
     @param rng           Random number generator as a galsim.BaseDeviate().  If None, then use the
                          clock time or system entropy to seed a new generator.  [default: None]
+    @param mp_context    If provided, a multiprocessing context (e.g., the multiprocessing module
+                         itself, or the result of multiprocessing.get_context()) used to allocate
+                         the screen in shared memory.  Copies of the screen made by pickling (e.g.,
+                         to send to worker processes) will then reference the same memory instead
+                         of each holding a private copy.  Only frozen-flow screens (`alpha` == 1.0)
+                         may be shared.  See `initWorker` for use with process pools.
+                         [default: None]
+    @param dtype         The numpy data type in which to store the screen, either np.float64 or
+                         np.float32.  Using np.float32 halves the memory needed for the screen
+                         (and for any precomputed boiling screens), at the cost of reduced
+                         precision in the interpolated wavefronts.  [default: np.float64]
+    @param fft_tile      If provided, generate each random screen with a tiled FFT that transforms
+                         at most `fft_tile` rows or columns at a time, and keeps the intermediate
+                         Fourier transform in a temporary memory-mapped file rather than in memory.
+                         This allows screens much larger than the available memory for the FFT to
+                         be generated.  The screens are the same as without tiling, up to rounding
+                         errors.  [default: None]
+
+    For boiling screens (`alpha` != 1.0), moving the screen forward in time requires generating a
+    new random screen for each `time_step`, and moving backward in time requires starting over from
+    t=0.  If a screen needs to be sampled at many different times (e.g., when photon shooting with
+    the geometric approximation), it may be much faster to first precompute the sequence of screens
+    with the `precompute` method, after which any time within the precomputed range can be accessed
+    directly.
 
     Relevant SPIE paper:
     "Remembrance of phases past: An autoregressive method for generating realistic atmospheres in
@@ -73,13 +99,20 @@ class AtmosphericScreen(object):
     September 2014
     """
     def __init__(self, screen_size, screen_scale=None, altitude=0.0, r0_500=0.2, L0=25.0,
-                 vx=0.0, vy=0.0, alpha=1.0, time_step=None, rng=None):
+                 vx=0.0, vy=0.0, alpha=1.0, time_step=None, rng=None, mp_context=None,
+                 dtype=np.float64, fft_tile=None):
 
         if (alpha != 1.0 and time_step is None):
             raise ValueError("No time_step provided when alpha != 1.0")
         if (alpha == 1.0 and time_step is not None):
             raise ValueError("Setting AtmosphericScreen time_step prohibited when alpha == 1.0.  "
                              "Did you mean to set time_step in makePSF or PhaseScreenPSF?")
+        if (alpha != 1.0 and mp_context is not None):
+            raise ValueError("Only frozen-flow screens (alpha == 1.0) may use shared memory.")
+        if np.dtype(dtype) not in (np.float64, np.float32):
+            raise ValueError("AtmosphericScreen dtype must be np.float64 or np.float32.")
+        if fft_tile is not None and fft_tile < 1:
+            raise ValueError("fft_tile must be at least 1")
         if screen_scale is None:
             # We copy Jee+Tyson(2011) and (arbitrarily) set the screen scale equal to r0 by default.
             screen_scale = r0_500
@@ -95,7 +128,10 @@ class AtmosphericScreen(object):
         self.vx = vx
         self.vy = vy
         self.alpha = alpha
+        self.dtype = np.dtype(dtype).type
+        self.fft_tile = fft_tile
         self._time = 0.0
+        self._timeline = None
 
         if rng is None:
             rng = galsim.BaseDeviate()
@@ -104,20 +140,54 @@ class AtmosphericScreen(object):
         self.dynamic = True
         self.reversible = self.alpha == 1.0
 
+        self._shared_key = None
+        if mp_context is not None:
+            # Use a unique key rather than id(self), which may be reused after this screen is
+            # deleted, and remove the shared memory from _GSScreenShare when it is.
+            self._shared_key = "AtmosphericScreen-%s"%uuid.uuid4().hex
+            typecode = 'f' if self.dtype == np.float32 else 'd'
+            _GSScreenShare[self._shared_key] = mp_context.RawArray(typecode, (self.npix+1)**2)
+            _releaseOnDelete(self, self._shared_key)
+
         self._init_psi()
         self._reset()
-        # Free some RAM for frozen-flow screen.
+        # Free some RAM for frozen-flow screen.  (The lookup table keeps a reference to _screen.)
         if self.reversible:
-            del self._psi, self._screen
+            self.__dict__.pop('_psi', None)
+            del self._screen
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        if self._shared_key is not None:
+            # The screen is in shared memory, which is found again in __setstate__.
+            del d['_tab2d']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        if self._shared_key is not None:
+            self._tab2d = galsim.table._PeriodicLookupTable2D(self._xs, self._ys,
+                                                              self._sharedScreen())
+
+    def _sharedScreen(self):
+        """Return the shared memory for this screen as a numpy array."""
+        try:
+            raw = _GSScreenShare[self._shared_key]
+        except KeyError:
+            raise RuntimeError("Shared memory for this AtmosphericScreen was not found.  When "
+                               "using a process pool, use galsim.phase_screens.initWorker as the "
+                               "pool initializer.")
+        return np.frombuffer(raw, dtype=self.dtype).reshape(self.npix+1, self.npix+1)
 
     def __str__(self):
         return "galsim.AtmosphericScreen(altitude=%s)" % self.altitude
 
     def __repr__(self):
         return ("galsim.AtmosphericScreen(%r, %r, altitude=%r, r0_500=%r, L0=%r, " +
-                "vx=%r, vy=%r, alpha=%r, time_step=%r, rng=%r)") % (
+                "vx=%r, vy=%r, alpha=%r, time_step=%r, rng=%r, dtype=%s, fft_tile=%r)") % (
                         self.screen_size, self.screen_scale, self.altitude, self.r0_500, self.L0,
-                        self.vx, self.vy, self.alpha, self.time_step, self._orig_rng)
+                        self.vx, self.vy, self.alpha, self.time_step, self._orig_rng,
+                        self.dtype.__name__, self.fft_tile)
 
     # While AtmosphericScreen does have mutable internal state, it's still possible to treat the
     # object as immutable under the python data model.  The requirements for hashability are that
@@ -138,6 +208,8 @@ class AtmosphericScreen(object):
                 self.vy == other.vy and
                 self.alpha == other.alpha and
                 self.time_step == other.time_step and
+                self.dtype == other.dtype and
+                self.fft_tile == other.fft_tile and
                 self._orig_rng == other._orig_rng)
 
     def __hash__(self):
@@ -145,7 +217,7 @@ class AtmosphericScreen(object):
             self._hash = hash((
                     "galsim.AtmosphericScreen", self.screen_size, self.screen_scale, self.altitude,
                     self.r0_500, self.L0, self.vx, self.vy, self.alpha, self.time_step,
-                    repr(self._orig_rng.serialize())))
+                    self.dtype.__name__, self.fft_tile, repr(self._orig_rng.serialize())))
         return self._hash
 
     def __ne__(self, other): return not self == other
@@ -160,58 +232,201 @@ class AtmosphericScreen(object):
     def _init_psi(self):
         """Assemble 2D von Karman sqrt power spectrum.
         """
+        if self.fft_tile is not None:
+            # The tiled FFT computes the columns of psi it needs as it goes.
+            return
         fx = np.fft.fftfreq(self.npix, self.screen_scale)
-        fx, fy = np.meshgrid(fx, fx)
+        self._psi = self._psi_block(fx[:,np.newaxis], fx)
 
+    def _psi_block(self, fy, fx):
+        """Return the sqrt power spectrum at the frequencies fy (rows) and fx (columns), which
+        are broadcast against each other.  The element for the frequency (0,0) is set to 0.
+        """
         L0_inv = 1./self.L0 if self.L0 is not None else 0.0
         old_settings = np.seterr(all='ignore')
-        self._psi = (1./self.screen_size*self._kolmogorov_constant*(self.r0_500**(-5.0/6.0)) *
-                     (fx*fx + fy*fy + L0_inv*L0_inv)**(-11.0/12.0) *
-                     self.npix * np.sqrt(np.sqrt(2.0)))
+        psi = (1./self.screen_size*self._kolmogorov_constant*(self.r0_500**(-5.0/6.0)) *
+               (fx*fx + fy*fy + L0_inv*L0_inv)**(-11.0/12.0) *
+               self.npix * np.sqrt(np.sqrt(2.0)))
         np.seterr(**old_settings)
-        self._psi *= 500.0  # Multiply by 500 here so we can divide by arbitrary lam later.
-        self._psi[0, 0] = 0.0
-
-    def _random_screen(self):
-        """Generate a random phase screen with power spectrum given by self._psi**2"""
+        psi *= 500.0  # Multiply by 500 here so we can divide by arbitrary lam later.
+        psi[(fy == 0.) & (fx == 0.)] = 0.0
+        return psi
+
+    def _random_screen(self, out, alpha=0.0):
+        """Set out to alpha*out + sqrt(1-alpha**2) times a new random phase screen with power
+        spectrum given by psi**2.  With the default alpha=0, this just fills out with the new
+        screen.
+        """
         gd = galsim.GaussianDeviate(self.rng)
-        noise = galsim.utilities.rand_arr(self._psi.shape, gd)
-        return galsim.fft.ifft2(galsim.fft.fft2(noise)*self._psi).real
+        if self.fft_tile is None:
+            noise = galsim.utilities.rand_arr(self._psi.shape, gd)
+            # Multiply in place to avoid another full-size complex temporary.
+            ft = galsim.fft.fft2(noise)
+            del noise
+            ft *= self._psi
+            blocks = [(0, self.npix, galsim.fft.ifft2(ft).real)]
+            del ft
+        else:
+            blocks = self._tiled_random_screen(gd)
+        for r0, r1, screen in blocks:
+            if alpha == 0.0:
+                out[r0:r1] = screen
+            else:
+                out[r0:r1] *= alpha
+                out[r0:r1] += np.sqrt(1.-alpha**2) * screen
+
+    def _tiled_random_screen(self, gd):
+        """Generate a random phase screen with a tiled FFT, yielding it in blocks of rows as
+        (first_row, last_row+1, rows).
+
+        The 2D FFT is done as 1D FFTs along the rows and then along the columns, each over at most
+        fft_tile rows or columns at a time.  Since the noise is real, only the non-negative x
+        frequencies are kept, so the intermediate transform is npix by npix/2+1 complex values,
+        which is stored in a temporary memory-mapped file.
+        """
+        import tempfile
+        n = self.npix
+        nk = n//2 + 1
+        tile = self.fft_tile
+        with tempfile.TemporaryFile() as tmp:
+            ft = np.memmap(tmp, dtype=np.complex128, mode='w+', shape=(n, nk))
+            # The noise is drawn row by row, so drawing it in blocks of rows gives the same values
+            # as drawing the whole array at once.
+            for r0 in range(0, n, tile):
+                r1 = min(r0+tile, n)
+                ft[r0:r1] = np.fft.rfft(galsim.utilities.rand_arr((r1-r0, n), gd), axis=1)
+            f = np.fft.fftfreq(n, self.screen_scale)
+            for c0 in range(0, nk, tile):
+                c1 = min(c0+tile, nk)
+                cols = np.fft.fft(ft[:,c0:c1], axis=0)
+                # psi only depends on fx**2, so the frequency of the last column, -1/2 in
+                # fftfreq's convention, gives the right values.
+                cols *= self._psi_block(f[:,np.newaxis], f[c0:c1])
+                ft[:,c0:c1] = np.fft.ifft(cols, axis=0)
+                del cols
+            for r0 in range(0, n, tile):
+                r1 = min(r0+tile, n)
+                yield r0, r1, np.fft.irfft(ft[r0:r1], n, axis=1)
+            del ft
+
+    def _update_tab2d(self):
+        """Fill in the repeated last row and column of self._screen needed for periodic
+        interpolation, and make the lookup table, which shares self._screen's memory.
+        """
+        self._screen[-1,:] = self._screen[0,:]
+        self._screen[:,-1] = self._screen[:,0]
+        self._tab2d = galsim.table._PeriodicLookupTable2D(self._xs, self._ys, self._screen)
 
     def _seek(self, t):
         """Set layer's internal clock to time t."""
         if t == self._time:
             return
         if not self.reversible:
+            if t < self._time and t < 0.0:
+                raise ValueError("Can't rewind irreversible screen to t < 0.0")
+            if self._timeline is not None:
+                # Precomputed screens can be looked up directly.
+                self._seekTimeline(int(t // self.time_step))
+                self._time = float(t)
+                return
             # Can't reverse, so reset and move forward.
             if t < self._time:
-                if t < 0.0:
-                    raise ValueError("Can't rewind irreversible screen to t < 0.0")
                 self._reset()
             # Find number of boiling updates we need to perform.
             previous_update_number = int(self._time // self.time_step)
             final_update_number = int(t // self.time_step)
             n_updates = final_update_number - previous_update_number
             if n_updates > 0:
+                screen = self._screen[:-1,:-1]
                 for _ in range(n_updates):
-                    self._screen *= self.alpha
-                    self._screen += np.sqrt(1.-self.alpha**2) * self._random_screen()
-                self._tab2d = galsim.LookupTable2D(self._xs, self._ys, self._screen,
-                                                   edge_mode='wrap')
+                    self._random_screen(screen, self.alpha)
+                self._update_tab2d()
         self._time = float(t)
 
     def _reset(self):
         """Reset phase screen back to time=0."""
-        self.rng = self._orig_rng.duplicate()
         self._time = 0.0
+        if self._timeline is not None:
+            self._seekTimeline(0)
+            return
+        self.rng = self._orig_rng.duplicate()
 
         # Only need to reset/create tab2d if not frozen or doesn't already exist
         if not self.reversible or not hasattr(self, '_tab2d'):
-            self._screen = self._random_screen()
-            self._xs = np.linspace(-0.5*self.screen_size, 0.5*self.screen_size, self.npix,
-                                   endpoint=False)
+            # The screen and coordinates include an extra repeated row and column so the lookup
+            # table can wrap around without making a padded copy of the screen.
+            xs = np.linspace(-0.5*self.screen_size, 0.5*self.screen_size, self.npix,
+                             endpoint=False)
+            self._xs = np.append(xs, xs[-1]+(xs[1]-xs[0]))
             self._ys = self._xs
-            self._tab2d = galsim.LookupTable2D(self._xs, self._ys, self._screen, edge_mode='wrap')
+            if self._shared_key is not None:
+                self._screen = self._sharedScreen()
+            elif not hasattr(self, '_screen'):
+                self._screen = np.empty((self.npix+1, self.npix+1), dtype=self.dtype)
+            self._random_screen(self._screen[:-1,:-1])
+            self._update_tab2d()
+
+    def precompute(self, t, buffer_size=None, file_name=None):
+        """Precompute the sequence of boiling screens up to time `t`.
+
+        Afterwards, seeking to any time whose screen is stored is done by a lookup instead of by
+        regenerating the intervening screens.  The stored screens are kept in a ring buffer of
+        `buffer_size` screens.  Seeking past the end of the buffer generates new screens (replacing
+        the oldest ones), and seeking to a time whose screen has been replaced restarts the sequence
+        from t=0.  The screens are identical to those generated without precomputing.
+
+        This has no effect for frozen-flow screens (`alpha` == 1.0), which can already be sampled
+        at any time.
+
+        @param t            Time in seconds through which to precompute screens.
+        @param buffer_size  Number of screens to keep.  [default: None, which means enough to hold
+                            every screen up to time `t`]
+        @param file_name    If provided, store the screens in a memory-mapped file of this name
+                            instead of in memory.  [default: None]
+        """
+        if self.reversible:
+            return
+        if t < 0.0:
+            raise ValueError("Can't precompute irreversible screen to t < 0.0")
+        nscreen = int(t // self.time_step) + 1
+        if buffer_size is None:
+            buffer_size = nscreen
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        shape = (buffer_size, self.npix, self.npix)
+        if file_name is None:
+            self._timeline = np.empty(shape, dtype=self.dtype)
+        else:
+            self._timeline = np.memmap(file_name, dtype=self.dtype, mode='w+', shape=shape)
+        self._timeline_start = 0  # First update number stored in the buffer.
+        self._timeline_end = 0  # One past the last update number stored in the buffer.
+        self._timeline_current = None  # Update number of the current _tab2d.
+        self._seekTimeline(min(nscreen, buffer_size) - 1)
+        self._seekTimeline(int(self._time // self.time_step))
+
+    def _seekTimeline(self, n):
+        """Set the screen to that of update number n, using or extending the precomputed timeline.
+        """
+        timeline = self._timeline
+        size = len(timeline)
+        if n < self._timeline_start or self._timeline_end == 0:
+            # Either nothing has been generated yet, or this screen has dropped out of the ring
+            # buffer.  Start over from the beginning.
+            self.rng = self._orig_rng.duplicate()
+            self._random_screen(timeline[0])
+            self._timeline_start = 0
+            self._timeline_end = 1
+            self._timeline_current = None
+        while self._timeline_end <= n:
+            screen = timeline[self._timeline_end % size]
+            screen[:] = timeline[(self._timeline_end-1) % size]
+            self._random_screen(screen, self.alpha)
+            self._timeline_end += 1
+            self._timeline_start = max(self._timeline_start, self._timeline_end - size)
+        if n != self._timeline_current:
+            self._screen[:-1,:-1] = timeline[n % size]
+            self._update_tab2d()
+            self._timeline_current = n
 
     # Note -- use **kwargs here so that AtmosphericScreen.stepk and OpticalScreen.stepk
     # can use the same signature, even though they depend on different parameters.
@@ -265,16 +480,30 @@ class AtmosphericScreen(object):
         if self.reversible:
             return self._wavefront(u, v, t, theta)
         else:
-            out = np.empty_like(u, dtype=float)
-            tmin = np.min(t)
-            tmax = np.max(t)
-            tt = (tmin // self.time_step) * self.time_step
-            while tt <= tmax:
-                self._seek(tt)
-                here = ((tt <= t) & (t < tt+self.time_step))
-                out[here] = self._wavefront(u[here], v[here], t[here], theta)
-                tt += self.time_step
-            return out
+            out = np.empty(u.size, dtype=float)
+            for order, sl, u_s, v_s, t_s in self._time_slices(u, v, t):
+                out[order[sl]] = self._wavefront(u_s[sl], v_s[sl], t_s[sl], theta)
+            return out.reshape(u.shape)
+
+    def _time_slices(self, u, v, t):
+        """Sort u, v, t by time and yield the contiguous slices of the sorted arrays that share a
+        boiling update.  The screen is advanced to the time of each slice before it is yielded.
+
+        Yields tuples (order, slice, u_sorted, v_sorted, t_sorted), where `order` is the sorting
+        index into the flattened input arrays.
+        """
+        t = t.ravel()
+        step = t // self.time_step
+        order = np.argsort(step, kind='mergesort')
+        u_s = u.ravel()[order]
+        v_s = v.ravel()[order]
+        t_s = t[order]
+        step = step[order]
+        edges = np.concatenate(([0], np.flatnonzero(np.diff(step)) + 1, [len(step)]))
+        for start, end in zip(edges[:-1], edges[1:]):
+            # Seek to an actual time in the slice, so the update number is exactly right.
+            self._seek(t_s[start])
+            yield order, slice(start, end), u_s, v_s, t_s
 
     def _wavefront(self, u, v, t, theta):
         # Same as wavefront(), but no argument checking and no boiling updates.
@@ -284,6 +513,19 @@ class AtmosphericScreen(object):
         v = v - t*self.vy + 1000*self.altitude*theta[1].tan()
         return self._tab2d(u, v)
 
+    def _wavefront_many(self, u, v, t, thetas):
+        # Same as _wavefront(), but for a sequence of field angles.  The result has shape
+        # (len(thetas),) + u.shape.  All the field angles are evaluated in a single call to the
+        # LookupTable2D.
+        if t is None:
+            t = self._time
+        shape = (len(thetas),) + (1,)*u.ndim
+        du = np.array([1000*self.altitude*th[0].tan() for th in thetas]).reshape(shape)
+        dv = np.array([1000*self.altitude*th[1].tan() for th in thetas]).reshape(shape)
+        uu = (u - t*self.vx) + du
+        vv = (v - t*self.vy) + dv
+        return self._tab2d(uu, vv)
+
     def wavefront_gradient(self, u, v, t, theta=(0.0*galsim.arcmin, 0.0*galsim.arcmin)):
         """ Compute gradient of wavefront due to atmospheric phase screen.
 
@@ -317,17 +559,12 @@ class AtmosphericScreen(object):
         if self.reversible:
             return self._wavefront_gradient(u, v, t, theta)
         else:
-            dwdu = np.empty_like(u, dtype=np.float64)
-            dwdv = np.empty_like(u, dtype=np.float64)
-            tmin = np.min(t)
-            tmax = np.max(t)
-            tt = (tmin // self.time_step) * self.time_step
-            while tt <= tmax:
-                self._seek(tt)
-                here = ((tt <= t) & (t < tt+self.time_step))
-                dwdu[here], dwdv[here] = self._wavefront_gradient(u[here], v[here], t[here], theta)
-                tt += self.time_step
-            return dwdu, dwdv
+            dwdu = np.empty(u.size, dtype=np.float64)
+            dwdv = np.empty(u.size, dtype=np.float64)
+            for order, sl, u_s, v_s, t_s in self._time_slices(u, v, t):
+                dwdu[order[sl]], dwdv[order[sl]] = self._wavefront_gradient(
+                        u_s[sl], v_s[sl], t_s[sl], theta)
+            return dwdu.reshape(u.shape), dwdv.reshape(u.shape)
 
     def _wavefront_gradient(self, u, v, t, theta):
         # Same as wavefront(), but no argument checking and no boiling updates.
@@ -336,6 +573,51 @@ class AtmosphericScreen(object):
         return self._tab2d.gradient(u, v)
 
 
+# Shared memory for AtmosphericScreens created with an mp_context, keyed by the screens'
+# _shared_key attributes.
+_GSScreenShare = {}
+
+# Python 2 doesn't have weakref.finalize, so keep weak references with callbacks instead.  The
+# references need to stay alive for their callbacks to run.
+_GSScreenRefs = set()
+
+def _releaseOnDelete(screen, key):
+    """Remove the shared memory stored under key from _GSScreenShare when screen is deleted.
+
+    Any arrays already made from the shared memory (e.g., the screen's lookup table, or copies of
+    the screen made by pickling) keep it alive for as long as they need it.
+    """
+    if hasattr(weakref, 'finalize'):
+        weakref.finalize(screen, _GSScreenShare.pop, key, None)
+    else:
+        def callback(ref):
+            _GSScreenShare.pop(key, None)
+            _GSScreenRefs.discard(ref)
+        _GSScreenRefs.add(weakref.ref(screen, callback))
+
+
+def initWorker(share):
+    """Initialize a worker process to use AtmosphericScreens stored in shared memory.
+
+    Worker processes started by forking automatically inherit the shared memory of any screens
+    created before the workers were started.  For other start methods (e.g., 'spawn'), use this
+    function as the initializer of the process pool:
+
+        >>> ctx = multiprocessing.get_context('spawn')
+        >>> atm = galsim.Atmosphere(..., mp_context=ctx)
+        >>> pool = ctx.Pool(initializer=galsim.phase_screens.initWorker,
+        ...                 initargs=galsim.phase_screens.initWorkerArgs())
+
+    @param share    The dict returned as the single element of initWorkerArgs().
+    """
+    _GSScreenShare.update(share)
+
+
+def initWorkerArgs():
+    """Return the arguments to pass to initWorker when initializing a process pool."""
+    return (_GSScreenShare,)
+
+
 def Atmosphere(screen_size, rng=None, **kwargs):
     """Create an atmosphere as a list of turbulent phase screens at different altitudes.  The
     atmosphere model can then be used to simulate atmospheric PSFs.
@@ -449,6 +731,8 @@ def Atmosphere(screen_size, rng=None, **kwargs):
                          that `alpha` is set to something other than 1.0.  [default: None]
     @param rng           Random number generator as a galsim.BaseDeviate().  If None, then use the
                          clock time or system entropy to seed a new generator.  [default: None]
+    @param mp_context    If provided, allocate the (frozen-flow) screens in shared memory using
+                         this multiprocessing context.  See `AtmosphericScreen`.  [default: None]
     """
     # Fill in screen_size here, since there isn't a default in AtmosphericScreen
     kwargs['screen_size'] = galsim.utilities.listify(screen_size)
@@ -715,7 +999,7 @@ class OpticalScreen(object):
     """
     def __init__(self, diam, tip=0.0, tilt=0.0, defocus=0.0, astig1=0.0, astig2=0.0, coma1=0.0,
                  coma2=0.0, trefoil1=0.0, trefoil2=0.0, spher=0.0, aberrations=None,
-                 annular_zernike=False, obscuration=0.0, lam_0=500.0):
+                 annular_zernike=False, obscuration=0.0, lam_0=500.0, _wavefront_screen=None):
         self.diam = diam
         if aberrations is None:
             aberrations = np.zeros(12)
@@ -763,9 +1047,19 @@ class OpticalScreen(object):
         # Convert from unit disk coefficients to full aperture (diam != 2) coefficients.
         self._coef_array /= (self.diam/2)**np.sum(np.mgrid[0:2*shape[0]:2, 0:shape[1]], axis=0)
 
+        # If another OpticalScreen with the same wavefront (in nm) is supplied, then delegate the
+        # wavefront evaluation to it, so its memoized wavefront can be shared.
+        self._wavefront_screen = _wavefront_screen
+        self._last_wf = None
+
         self.dynamic = False
         self.reversible = True
 
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d['_last_wf'] = None
+        return d
+
     @property
     def coef_array(self):
         from .deprecated import depr
@@ -837,14 +1131,34 @@ class OpticalScreen(object):
         v = np.array(v, dtype=float)
         if u.shape != v.shape:
             raise ValueError("u.shape not equal to v.shape")
-        return self._wavefront(u, v, t, theta)
+        # Copy, since _wavefront may return its (read-only) memoized result.
+        return np.array(self._wavefront(u, v, t, theta))
 
     def _wavefront(self, u, v, t, theta):
         # Same as wavefront(), but no argument checking.
         # Note, this phase screen is actually independent of time and theta.
+        if self._wavefront_screen is not None:
+            return self._wavefront_screen._wavefront(u, v, t, theta)
+        # Reuse the previous result if the coordinates are the same as last time, which is the
+        # usual case when making PSFs at many wavelengths with the same aperture.  Comparing the
+        # coordinates is much faster than evaluating the Zernike polynomials.
+        last = self._last_wf
+        if last is not None and np.array_equal(last[0], u) and np.array_equal(last[1], v):
+            return last[2]
         r = u + 1j*v
         rsqr = np.abs(r)**2
-        return galsim.utilities.horner2d(rsqr, r, self._coef_array, dtype=complex).real * self.lam_0
+        wf = galsim.utilities.horner2d(rsqr, r, self._coef_array, dtype=complex).real * self.lam_0
+        # Keep copies of the coordinates, so later changes to u and v can't make us reuse a wrong
+        # result.  And make the result read-only, since it may be returned again.
+        wf.flags.writeable = False
+        self._last_wf = (np.array(u), np.array(v), wf)
+        return wf
+
+    def _wavefront_many(self, u, v, t, thetas):
+        # Same as _wavefront(), but for a sequence of field angles.  Since this screen doesn't
+        # depend on theta, just return the single wavefront, which will broadcast correctly against
+        # the shape (len(thetas),) + u.shape.
+        return self._wavefront(u, v, t, None)
 
     def wavefront_gradient(self, u, v, t=None, theta=None):
         """ Compute gradient of wavefront due to atmospheric phase screen.
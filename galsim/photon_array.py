@@ -268,6 +268,18 @@ def PhotonArray_addTo(self, image):
         return orig_addTo(self, image.view())
 PhotonArray.addTo = PhotonArray_addTo
 
+def _get_photon_buffer(photons, n_photons):
+    """Return `photons` ready to be filled with `n_photons` photons, or a new PhotonArray of that
+    size if `photons` is None.
+    """
+    if photons is None:
+        return PhotonArray(n_photons)
+    if photons.size() != n_photons:
+        raise ValueError("The provided PhotonArray has size %d, but n_photons = %d"%(
+                         photons.size(), n_photons))
+    photons.setCorrelated(False)
+    return photons
+
 class WavelengthSampler(object):
     """This class is a sensor operation that uses sed.sampleWavelength to set the wavelengths
     array of a PhotonArray.
@@ -397,6 +397,106 @@ class RealGalaxy(GSObject):
 
 
 
+class _LoadedFiles(object):
+    """An LRU cache of the open pyfits HDULists used by a RealGalaxyCatalog.
+
+    The cache is bounded both by the number of open files and by the total size of those files,
+    which is a good proxy for the memory used once their data have been read.  When either limit
+    is exceeded, the least recently used files are closed and dropped.  A limit of None means no
+    limit.
+
+    A file that is being read (marked with `use` and not yet given back with `release`) is not
+    closed when it is evicted, but only once it is released.  The cache is not thread safe
+    itself, so all of these calls should be made with a lock held.
+
+    The attributes `hits`, `misses`, and `evictions` record how effective the cache is, and
+    `nbytes` is the current total size of the cached files.
+
+    @param max_files    The maximum number of files to keep open.
+    @param max_bytes    The maximum total size in bytes of the files to keep open.
+    """
+    def __init__(self, max_files=None, max_bytes=None):
+        from collections import OrderedDict
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._files = OrderedDict()
+        self._sizes = {}
+        self._users = {}     # id(f) -> number of reads in progress
+        self._closing = {}   # id(f) -> f for evicted files that are still being read
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self): return len(self._files)
+    def __contains__(self, file_name): return file_name in self._files
+    def keys(self): return list(self._files.keys())
+    def values(self): return list(self._files.values())
+
+    def __getitem__(self, file_name):
+        f = self._files.pop(file_name)
+        self._files[file_name] = f   # Move it to the most recently used position.
+        self.hits += 1
+        return f
+
+    def __setitem__(self, file_name, f):
+        if file_name in self._files:
+            self._remove(file_name)
+        self.misses += 1
+        self._files[file_name] = f
+        self._sizes[file_name] = os.path.getsize(file_name)
+        self.nbytes += self._sizes[file_name]
+        self.evict()
+
+    def _remove(self, file_name):
+        del self._files[file_name]
+        self.nbytes -= self._sizes.pop(file_name)
+
+    def use(self, f):
+        """Mark a file as being read, so it won't be closed until it is released.
+        """
+        self._users[id(f)] = self._users.get(id(f), 0) + 1
+
+    def release(self, f):
+        """Mark a read of a file as finished.  If the file was evicted in the meantime and this
+        was the last read in progress, it is closed now.
+        """
+        self._users[id(f)] -= 1
+        if self._users[id(f)] == 0:
+            del self._users[id(f)]
+            if id(f) in self._closing:
+                self._closing.pop(id(f)).close()
+
+    def evict(self):
+        """Close and drop the least recently used files until the cache is within its limits.
+
+        The most recently added file is always kept, even if it is larger than `max_bytes`.
+        """
+        while len(self._files) > 1 and (
+                (self.max_files is not None and len(self._files) > self.max_files) or
+                (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            file_name = next(iter(self._files))
+            f = self._files[file_name]
+            self._remove(file_name)
+            self.evictions += 1
+            if id(f) in self._users:
+                self._closing[id(f)] = f
+            else:
+                f.close()
+
+    def clear(self):
+        """Close all the files and empty the cache.  The statistics are not reset.
+        """
+        for f in self._files.values():
+            f.close()
+        for f in self._closing.values():
+            f.close()
+        self._files.clear()
+        self._sizes.clear()
+        self._closing.clear()
+        self.nbytes = 0
+
+
 class RealGalaxyCatalog(object):
     """Class containing a catalog with information about real galaxy training data.
 
@@ -468,11 +568,36 @@ class RealGalaxyCatalog(object):
                       approximately the same total I/O time (assuming you eventually use most of
                       the image files referenced in the catalog), but it is spread over the
                       various calls to getGalImage() and getPSFImage().  [default: False]
+    @param shared_preload  The name of a binary file in which to store the pixel data of all the
+                      galaxy and PSF images.  If the file does not exist (or is older than the
+                      catalog or image files), it is built from the image files, which takes about
+                      as long as `preload=True`.  Then it is memory mapped read-only, and
+                      getGalImage() and getPSFImage() return views into it without any I/O or
+                      copying.  The images are stored with the data type of the image files if
+                      that is float32 or float64 (and as float64 otherwise), so these views may
+                      be ImageF rather than ImageD.  Since the memory map is backed by the
+                      operating system's page cache, all processes using the same file share a
+                      single copy of the data.  This is the best option when many processes use
+                      the same catalog.
+                      [default: None]
+    @param max_open_files  When not preloading, the maximum number of image files to keep open at
+                      once.  Files that have not been used recently are closed when this limit
+                      is reached and reopened if they are needed again.  None means no limit.
+                      [default: 100]
+    @param max_loaded_bytes  When not preloading, the maximum total size in bytes of the image
+                      files to keep open at once.  This keeps the memory used by long runs over
+                      large catalogs from growing without bound.  None means no limit.
+                      [default: 2 GB]
     @param logger     An optional logger object to log progress. [default: None]
+
+    The open image files are kept in the attribute `loaded_files`, whose attributes `hits`,
+    `misses`, and `evictions` count how often a file was already open, how often one had to be
+    opened, and how often one was closed to stay within the above limits.
     """
     _req_params = {}
     _opt_params = { 'file_name' : str, 'sample' : str, 'dir' : str,
-                    'preload' : bool }
+                    'preload' : bool, 'shared_preload' : str,
+                    'max_open_files' : int, 'max_loaded_bytes' : int }
     _single_params = []
     _takes_rng = False
 
@@ -480,7 +605,8 @@ class RealGalaxyCatalog(object):
     # the config structure.  It indicates that all we care about is the nobjects parameter.
     # So skip any other calculations that might normally be necessary on construction.
     def __init__(self, file_name=None, sample=None, image_dir=None, dir=None, preload=False,
-                 noise_dir=None, logger=None, _nobjects_only=False):
+                 noise_dir=None, logger=None, shared_preload=None, max_open_files=100,
+                 max_loaded_bytes=2*1024**3, _nobjects_only=False):
         if sample is not None and file_name is not None:
             raise ValueError("Cannot specify both the sample and file_name!")
 
@@ -537,7 +663,7 @@ class RealGalaxyCatalog(object):
             self.stamp_flux = self.cat.field('stamp_flux')
 
         self.saved_noise_im = {}
-        self.loaded_files = {}
+        self.loaded_files = _LoadedFiles(max_open_files, max_loaded_bytes)
         self.logger = logger
 
         # The pyfits commands aren't thread safe.  So we need to make sure the methods that
@@ -552,6 +678,11 @@ class RealGalaxyCatalog(object):
         if preload: self.preload()
         self._preload = preload
 
+        self.shared_preload = shared_preload
+        self._shared_data = None
+        if shared_preload is not None:
+            self._setupSharedPreload()
+
         # eventually I think we'll want information about the training dataset,
         # i.e. (dataset, ID within dataset)
         # also note: will be adding bits of information, like noise properties and galaxy fit params
@@ -565,9 +696,8 @@ class RealGalaxyCatalog(object):
         # Make sure to check if loaded_files exists, since the constructor could abort
         # before it gets to the place where loaded_files is built.
         if hasattr(self, 'loaded_files'):
-            for f in self.loaded_files.values():
-                f.close()
-        self.loaded_files = {}
+            self.loaded_files.clear()
+        self._shared_data = None
 
     def getNObjects(self) : return self.nobjects
     def __len__(self): return self.nobjects
@@ -594,6 +724,9 @@ class RealGalaxyCatalog(object):
         from galsim._pyfits import pyfits
         if self.logger:
             self.logger.debug('RealGalaxyCatalog: start preload')
+        # The point of preloading is to keep everything in memory, so remove the limits.
+        self.loaded_files.max_files = None
+        self.loaded_files.max_bytes = None
         for file_name in np.concatenate((self.gal_file_name , self.psf_file_name)):
             # numpy sometimes add a space at the end of the string that is not present in
             # the original file.  Stupid.  But this next line removes it.
@@ -613,27 +746,112 @@ class RealGalaxyCatalog(object):
                 for hdu in f:
                     hdu.data
 
+    def _setupSharedPreload(self):
+        # Build (if necessary) and load the index of the shared preload file.
+        index_file = self.shared_preload + '.index.npz'
+        all_files = [self.file_name] + list(set(self.gal_file_name + self.psf_file_name))
+        mtime = max(os.path.getmtime(f) for f in all_files)
+        index = None
+        if os.path.isfile(self.shared_preload) and os.path.isfile(index_file):
+            try:
+                with np.load(index_file) as npz:
+                    index = dict(npz)
+            except (IOError, OSError, ValueError):  # pragma: no cover
+                index = None
+            else:
+                if ('gal_dtype' not in index or float(index['mtime']) != mtime or
+                        len(index['gal_offset']) != self.nobjects or
+                        os.path.getsize(self.shared_preload) != int(index['nbytes'])):
+                    index = None
+        if index is None:
+            index = self._buildSharedPreload(index_file, mtime)
+        elif self.logger:
+            self.logger.debug('RealGalaxyCatalog: using shared preload file %s',
+                              self.shared_preload)
+        self._gal_offset = index['gal_offset']
+        self._gal_shape = index['gal_shape']
+        self._psf_offset = index['psf_offset']
+        self._psf_shape = index['psf_shape']
+        self._gal_dtype = index['gal_dtype']
+        self._psf_dtype = index['psf_dtype']
+
+    def _buildSharedPreload(self, index_file, mtime):
+        # Copy the pixel data of all the galaxy and PSF images into a single binary file.
+        # Each stamp keeps its own data type if that is float32 or float64 (otherwise it is
+        # converted to float64), in native byte order, starting at a multiple of 8 bytes.
+        from galsim._pyfits import pyfits
+        if self.logger:
+            self.logger.debug('RealGalaxyCatalog: building shared preload file %s',
+                              self.shared_preload)
+        stamps = {}  # (file_name, hdu) -> (offset, ny, nx, dtype).  Stamps may be used repeatedly.
+        offset = 0
+        # Write to temporary names first, so other processes never see a partial file.
+        tmp_name = self.shared_preload + '.%d.tmp'%os.getpid()
+        with open(tmp_name, 'wb') as fout:
+            for file_names, hdus in [(self.gal_file_name, self.gal_hdu),
+                                     (self.psf_file_name, self.psf_hdu)]:
+                for file_name in sorted(set(file_names)):
+                    with pyfits.open(file_name, memmap=False) as fits:
+                        for f, h in zip(file_names, hdus):
+                            if f != file_name or (f, h) in stamps: continue
+                            data = fits[h].data
+                            dt = np.float32 if data.dtype.type == np.float32 else np.float64
+                            array = np.ascontiguousarray(data, dtype=np.dtype(dt).newbyteorder('='))
+                            fout.write(array.tobytes())
+                            stamps[(f, h)] = (offset, array.shape[0], array.shape[1],
+                                              array.dtype.str)
+                            offset += array.nbytes
+                            pad = -offset % 8
+                            fout.write(b'\0' * pad)
+                            offset += pad
+        index = {}
+        for name, file_names, hdus in [('gal', self.gal_file_name, self.gal_hdu),
+                                       ('psf', self.psf_file_name, self.psf_hdu)]:
+            s = [ stamps[(f, h)] for f, h in zip(file_names, hdus) ]
+            index[name + '_offset'] = np.array([ t[0] for t in s ], dtype=np.int64)
+            index[name + '_shape'] = np.array([ t[1:3] for t in s ], dtype=np.int64)
+            index[name + '_dtype'] = np.array([ t[3] for t in s ])
+        index['mtime'] = mtime
+        index['nbytes'] = offset
+        tmp_index = index_file + '.%d.tmp.npz'%os.getpid()
+        np.savez(tmp_index, **index)
+        os.rename(tmp_name, self.shared_preload)
+        os.rename(tmp_index, index_file)
+        return index
+
+    def _getSharedImage(self, offsets, shapes, dtypes, i):
+        # Return a read-only view of stamp i in the shared preload file.
+        if self._shared_data is None:
+            self._shared_data = np.memmap(self.shared_preload, dtype=np.uint8, mode='r')
+        ny, nx = shapes[i]
+        dt = np.dtype(str(dtypes[i]))
+        start = offsets[i]
+        return self._shared_data[start:start+ny*nx*dt.itemsize].view(dt).reshape(ny, nx)
+
     def _getFile(self, file_name):
+        # Get the open file, and mark it as in use, so it isn't closed if another thread evicts
+        # it from the cache before we are done reading it.  Call _releaseFile when done.
         from galsim._pyfits import pyfits
+        # Since looking up a file also reorders the LRU cache, always do it with the lock held.
+        self.loaded_lock.acquire()
         if file_name in self.loaded_files:
             if self.logger:
                 self.logger.debug('RealGalaxyCatalog: File %s is already open',file_name)
             f = self.loaded_files[file_name]
         else:
-            self.loaded_lock.acquire()
-            # Check again in case two processes both hit the else at the same time.
-            if file_name in self.loaded_files: # pragma: no cover
-                if self.logger:
-                    self.logger.debug('RealGalaxyCatalog: File %s is already open',file_name)
-                f = self.loaded_files[file_name]
-            else:
-                if self.logger:
-                    self.logger.debug('RealGalaxyCatalog: open file %s',file_name)
-                f = pyfits.open(file_name,memmap=False)
-                self.loaded_files[file_name] = f
-            self.loaded_lock.release()
+            if self.logger:
+                self.logger.debug('RealGalaxyCatalog: open file %s',file_name)
+            f = pyfits.open(file_name,memmap=False)
+            self.loaded_files[file_name] = f
+        self.loaded_files.use(f)
+        self.loaded_lock.release()
         return f
 
+    def _releaseFile(self, f):
+        self.loaded_lock.acquire()
+        self.loaded_files.release(f)
+        self.loaded_lock.release()
+
     def getBandpass(self):
         """Returns a Bandpass object for the catalog.
         """
@@ -654,12 +872,18 @@ class RealGalaxyCatalog(object):
             raise IndexError(
                 'index %d given to getGalImage is out of range (0..%d)'
                 % (i,len(self.gal_file_name)-1))
+        if self.shared_preload is not None:
+            array = self._getSharedImage(self._gal_offset, self._gal_shape, self._gal_dtype, i)
+            return galsim.Image(array, scale=self.pixel_scale[i])
         f = self._getFile(self.gal_file_name[i])
         # For some reason the more elegant `with gal_lock:` syntax isn't working for me.
         # It gives an EOFError.  But doing an explicit acquire and release seems to work fine.
         self.gal_lock.acquire()
-        array = f[self.gal_hdu[i]].data
-        self.gal_lock.release()
+        try:
+            array = f[self.gal_hdu[i]].data
+        finally:
+            self.gal_lock.release()
+            self._releaseFile(f)
         im = galsim.Image(np.ascontiguousarray(array.astype(np.float64)),
                           scale=self.pixel_scale[i])
         return im
@@ -673,10 +897,16 @@ class RealGalaxyCatalog(object):
             raise IndexError(
                 'index %d given to getPSFImage is out of range (0..%d)'
                 % (i,len(self.psf_file_name)-1))
+        if self.shared_preload is not None:
+            array = self._getSharedImage(self._psf_offset, self._psf_shape, self._psf_dtype, i)
+            return galsim.Image(array, scale=self.pixel_scale[i])
         f = self._getFile(self.psf_file_name[i])
         self.psf_lock.acquire()
-        array = f[self.psf_hdu[i]].data
-        self.psf_lock.release()
+        try:
+            array = f[self.psf_hdu[i]].data
+        finally:
+            self.psf_lock.release()
+            self._releaseFile(f)
         return galsim.Image(np.ascontiguousarray(array.astype(np.float64)),
                             scale=self.pixel_scale[i])
 
@@ -757,8 +987,10 @@ class RealGalaxyCatalog(object):
 
     def __getstate__(self):
         d = self.__dict__.copy()
-        d['loaded_files'] = {}
+        d['loaded_files'] = _LoadedFiles(self.loaded_files.max_files, self.loaded_files.max_bytes)
         d['saved_noise_im'] = {}
+        # Each process makes its own memory map of the shared preload file.
+        d['_shared_data'] = None
         del d['gal_lock']
         del d['psf_lock']
         del d['loaded_lock']
@@ -143,6 +143,14 @@ class COSMOSCatalog(object):
                             [default: 0, meaning no limit]
     @param max_flux         Exclude galaxies whose fitted flux is larger than this value.
                             [default: 0, meaning no limit]
+    @param cache_dir        A directory in which to cache the parametric catalog and the indices of
+                            the galaxies that pass the above selection criteria, as binary files.
+                            The first construction with a given set of catalog files and selection
+                            criteria writes them.  Later ones (e.g. in other processes or later
+                            runs) memory map the parametric catalog and skip the selection, which
+                            makes construction much faster.  The cache is keyed on the modification
+                            times of the input files, so it is rebuilt if any of them changes.
+                            [default: None, which means not to use a cache]
 
     Attributes
     ----------
@@ -155,15 +163,15 @@ class COSMOSCatalog(object):
     _opt_params = { 'file_name' : str, 'sample' : str, 'dir' : str,
                     'preload' : bool, 'use_real' : bool,
                     'exclusion_level' : str, 'min_hlr' : float, 'max_hlr' : float,
-                    'min_flux' : float, 'max_flux' : float
+                    'min_flux' : float, 'max_flux' : float, 'cache_dir' : str
                   }
     _single_params = []
     _takes_rng = False
 
     def __init__(self, file_name=None, sample=None, image_dir=None, dir=None, preload=False,
                  noise_dir=None, use_real=True, exclusion_level='marginal', min_hlr=0, max_hlr=0.,
-                 min_flux=0., max_flux=0., _nobjects_only=False, exclude_bad=None,
-                 exclude_fail=None):
+                 min_flux=0., max_flux=0., cache_dir=None, _nobjects_only=False,
+                 exclude_bad=None, exclude_fail=None):
         if sample is not None and file_name is not None:
             raise ValueError("Cannot specify both the sample and file_name!")
 
@@ -187,6 +195,11 @@ class COSMOSCatalog(object):
         from galsim._pyfits import pyfits
         self.use_real = use_real
 
+        # The Bandpass and SEDs for chromatic parametric galaxies.  We'll set these up if and when
+        # we need them, and then share them among all the galaxies we make.
+        self._bandpass = None
+        self._sed = None
+
         if exclusion_level not in ['none', 'bad_stamp', 'bad_fits', 'marginal']:
             raise ValueError("Invalid value of exclusion_level: %s"%exclusion_level)
 
@@ -194,6 +207,25 @@ class COSMOSCatalog(object):
         full_file_name, full_image_dir, _, self.use_sample = \
             galsim.real._parse_files_dirs(file_name, image_dir, dir, noise_dir, sample)
 
+        if cache_dir is not None:
+            # The cut on the stamp flux below is only made if we build the real catalog, so that
+            # needs to be part of the key as well as the selection criteria.
+            selection = (exclusion_level, float(min_hlr), float(max_hlr), float(min_flux),
+                         float(max_flux), self.use_sample, self.use_real and not _nobjects_only)
+            cache_files = self._getCacheFiles(cache_dir, full_file_name, selection)
+            if all([os.path.isfile(f) for f in cache_files]):
+                if self.use_real and not _nobjects_only:
+                    self.real_cat = galsim.RealGalaxyCatalog(
+                        file_name, sample=sample, image_dir=image_dir, dir=dir, preload=preload,
+                        noise_dir=noise_dir)
+                self.param_cat = np.load(cache_files[0], mmap_mode='r')
+                self._checkParamCat()
+                if exclusion_level in ['marginal', 'bad_stamp']:
+                    self._readSelectionCat(full_file_name)
+                self.orig_index = np.load(cache_files[1])
+                self.nobjects = len(self.orig_index)
+                return
+
         if self.use_real and not _nobjects_only:
             # First, do the easy thing: real galaxies.  We make the galsim.RealGalaxyCatalog()
             # constructor do most of the work.  But note that we don't actually need to
@@ -223,17 +255,7 @@ class COSMOSCatalog(object):
                 with pyfits.open(param_file_name) as fits:
                     self.param_cat = fits[1].data
 
-        # Check for the old-style parameter catalog
-        if 'fit_dvc_btt' not in self.param_cat.dtype.names:  # pragma: no cover
-            # This will fail if they try to make a parametric galaxy.
-            # Don't raise an exception here, since they might not care about that.
-            # But give them some guidance about the error they will get if they
-            # do try to make a parametric galaxy.
-            import warnings
-            warnings.warn(
-                'You seem to have an old version of the COSMOS parameter file. '+
-                'Please run `galsim_download_cosmos -s %s` '%self.use_sample+
-                'to re-download the COSMOS catalog.')
+        self._checkParamCat()
 
         # NB. The pyfits FITS_Rec class has a bug where it makes a copy of the full
         # record array in each record (e.g. in getParametricRecord) and then doesn't
@@ -252,35 +274,19 @@ class COSMOSCatalog(object):
         if exclusion_level in ['marginal', 'bad_stamp']:
             # First, read in what we need to impose selection criteria, if the appropriate
             # exclusion_level was chosen.
-            k = full_file_name.find('.fits')
-            try:
-                # This should work if the user passed in (or we defaulted to) the real galaxy
-                # catalog name:
-                selection_file_name = full_file_name[:k] + '_selection' + full_file_name[k:]
-                try:
-                    with pyfits.open(selection_file_name) as fits:
-                        self.selection_cat = fits[1].data
-                except IOError:
-                    # There's one more option: full_file_name might be the parametric fit file, so
-                    # we have to strip off the _fits.fits (instead of just the .fits)
-                    selection_file_name = full_file_name[:k-5] + '_selection' + full_file_name[k:]
-                    with pyfits.open(selection_file_name) as fits:
-                        self.selection_cat = fits[1].data
-
-
-                # At this point we've read in the catalog one way or another (otherwise we would
-                # have gotten tossed out of this part of the code to throw an IOError).  So, we can
-                # proceed to select galaxies in a way that excludes suspect postage stamps (e.g.,
-                # with deblending issues), suspect parametric model fits, or both of the above plus
-                # marginal ones.  These two options for 'exclusion_level' involve placing cuts on
-                # the S/N of the object detection in the original postage stamp, and on issues with
-                # masking that can indicate deblending or detection failures.  These cuts were used
-                # in GREAT3.  In the case of the masking cut, in some cases there are messed up ones
-                # that have a 0 for self.selection_cat['peak_image_pixel_count'].  To make sure we
-                # don't divide by zero (generating a RuntimeWarning), and still eliminate those, we
-                # will first set that column to 1.e-5.  We choose a sample-dependent mask ratio cut,
-                # since this depends on the peak object flux, which will differ for the two samples
-                # (and we can't really cut on this for arbitrary user-defined samples).
+            self._readSelectionCat(full_file_name)
+
+            # If we couldn't find the selection catalog, we can't make any of these cuts (or
+            # any later ones that depend on the selection catalog).  Otherwise, we can proceed to
+            # select galaxies in a way that excludes suspect postage stamps (e.g., with deblending
+            # issues), suspect parametric model fits, or both of the above plus marginal ones.
+            # These two options for 'exclusion_level' involve placing cuts on the S/N of the
+            # object detection in the original postage stamp, and on issues with masking that can
+            # indicate deblending or detection failures.  These cuts were used in GREAT3.  We
+            # choose a sample-dependent mask ratio cut, since this depends on the peak object
+            # flux, which will differ for the two samples (and we can't really cut on this for
+            # arbitrary user-defined samples).
+            if self.selection_cat is not None:
                 if self.use_sample == "23.5":
                     cut_ratio = 0.2
                     sn_limit = 20.0
@@ -288,22 +294,10 @@ class COSMOSCatalog(object):
                     cut_ratio = 0.8
                     sn_limit = 12.0
                 div_val = self.selection_cat['peak_image_pixel_count']
-                div_val[div_val == 0.] = 1.e-5
                 mask &= ( (self.selection_cat['sn_ellip_gauss'] >= sn_limit) &
                           ((self.selection_cat['min_mask_dist_pixels'] > 11.0) |
                            (self.selection_cat['average_mask_adjacent_pixel_count'] / \
                                div_val < cut_ratio)) )
-            except IOError:
-                # We can't make any of the above cuts (or any later ones that depend on the
-                # selection catalog) because we couldn't find the selection catalog.  Bummer.  Warn
-                # the user, and move on.
-                self.selection_cat = None
-                import warnings
-                warnings.warn(
-                    'File with GalSim selection criteria not found! '+
-                    'Not all of the requested exclusions will be performed. '+
-                    'Run the program `galsim_download_cosmos -s %s` '%self.use_sample+
-                    'to get the necessary selection file.')
 
             # Finally, impose a cut that the total flux in the postage stamp should be positive,
             # which excludes a tiny number of galaxies (of order 10 in each sample) with some sky
@@ -404,6 +398,105 @@ class COSMOSCatalog(object):
         self.orig_index = self.orig_index[mask]
         self.nobjects = len(self.orig_index)
 
+        if cache_dir is not None:
+            self._writeCacheFiles(cache_files)
+
+    def _checkParamCat(self):
+        """Warn if the parametric catalog is an old-style one without the fit_dvc_btt column.
+        """
+        if 'fit_dvc_btt' not in self.param_cat.dtype.names:  # pragma: no cover
+            # This will fail if they try to make a parametric galaxy.
+            # Don't raise an exception here, since they might not care about that.
+            # But give them some guidance about the error they will get if they
+            # do try to make a parametric galaxy.
+            import warnings
+            warnings.warn(
+                'You seem to have an old version of the COSMOS parameter file. '+
+                'Please run `galsim_download_cosmos -s %s` '%self.use_sample+
+                'to re-download the COSMOS catalog.')
+
+    def _readSelectionCat(self, full_file_name):
+        """Read the catalog with the GalSim selection criteria into self.selection_cat.
+
+        If it isn't found, self.selection_cat is set to None and a warning is emitted.
+        """
+        from galsim._pyfits import pyfits
+        k = full_file_name.find('.fits')
+        try:
+            # This should work if the user passed in (or we defaulted to) the real galaxy
+            # catalog name:
+            selection_file_name = full_file_name[:k] + '_selection' + full_file_name[k:]
+            try:
+                with pyfits.open(selection_file_name) as fits:
+                    self.selection_cat = fits[1].data
+            except IOError:
+                # There's one more option: full_file_name might be the parametric fit file, so
+                # we have to strip off the _fits.fits (instead of just the .fits)
+                selection_file_name = full_file_name[:k-5] + '_selection' + full_file_name[k:]
+                with pyfits.open(selection_file_name) as fits:
+                    self.selection_cat = fits[1].data
+        except IOError:
+            # Bummer.  Warn the user, and move on.
+            self.selection_cat = None
+            import warnings
+            warnings.warn(
+                'File with GalSim selection criteria not found! '+
+                'Not all of the requested exclusions will be performed. '+
+                'Run the program `galsim_download_cosmos -s %s` '%self.use_sample+
+                'to get the necessary selection file.')
+            return
+
+        # In some cases there are messed up ones that have a 0 for
+        # self.selection_cat['peak_image_pixel_count'].  To make sure we don't divide by zero
+        # (generating a RuntimeWarning) in the masking cut, and still eliminate those, we first set
+        # that column to 1.e-5.
+        div_val = self.selection_cat['peak_image_pixel_count']
+        div_val[div_val == 0.] = 1.e-5
+
+    @staticmethod
+    def _getCacheFiles(cache_dir, file_name, selection):
+        """Get the names of the cache files for the parametric catalog and the selected indices.
+
+        The parametric catalog only depends on the input files, but the indices also depend on
+        the selection criteria.
+        """
+        import hashlib
+        # We don't know yet which of the possible input files will be used, so include the
+        # modification times and sizes of all of them that exist.
+        k = file_name.find('.fits')
+        names = [ file_name,
+                  file_name[:k] + '_fits' + file_name[k:],
+                  file_name[:k] + '_selection' + file_name[k:],
+                  file_name[:k-5] + '_selection' + file_name[k:] ]
+        key = [ galsim.__version__ ]
+        for name in names:
+            if os.path.isfile(name):
+                key.append((os.path.abspath(name), os.path.getmtime(name), os.path.getsize(name)))
+        param_key = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        key.append(selection)
+        index_key = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return (os.path.join(cache_dir, 'cosmos_param_%s.npy'%param_key),
+                os.path.join(cache_dir, 'cosmos_index_%s.npy'%index_key))
+
+    def _writeCacheFiles(self, cache_files):
+        """Write the parametric catalog and the selected indices to the cache files.
+        """
+        cache_dir = os.path.dirname(cache_files[0])
+        if cache_dir and not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:  # pragma: no cover
+                # Another process may have just made it.
+                if not os.path.isdir(cache_dir): raise
+        for name, array in zip(cache_files, [self.param_cat, self.orig_index]):
+            if os.path.isfile(name): continue
+            # Write to a temporary file and then rename it, so other processes never see a
+            # partially written file.
+            tmp_name = name + '.%d.tmp'%os.getpid()
+            with open(tmp_name, 'wb') as fout:
+                np.save(fout, array)
+            os.rename(tmp_name, name)
+
     # We need this method because the config apparatus will use this via a Proxy, and they cannot
     # access attributes directly -- just call methods.  So this is how we get nobjects there.
     def getNObjects(self) : return self.nobjects
@@ -501,10 +594,6 @@ class COSMOSCatalog(object):
         if gal_type not in ['real', 'parametric']:
             raise ValueError("Invalid galaxy type %r"%gal_type)
 
-        # We'll set these up if and when we need them.
-        self._bandpass = None
-        self._sed = None
-
         # Make rng if we will need it.
         if index is None or gal_type == 'real':
             if rng is None:
@@ -664,15 +753,109 @@ class COSMOSCatalog(object):
                                             'CWW_Sbc_ext_more.sed'),
                                wave_type='Ang', flux_type='flambda')]
 
+        if 'hlr' not in self.param_cat.dtype.names:  # pragma: no cover
+            # Old versions of the catalog need the full calculation for each galaxy.
+            return [ self._buildParametric(self.getParametricRecord(index), sersic_prec, gsparams,
+                                           chromatic, self._bandpass, self._sed)
+                     for index in indices ]
+
+        if len(indices) == 0:
+            return []
+
+        # Compute all the parameters for the whole batch at once with NumPy array operations.
+        # Then the only thing left to do for each galaxy is to build the GSObjects.
+        records = self.param_cat[self.orig_index[np.array(indices, dtype=int)]]
+        p = self._getParametricArrays(records, sersic_prec)
+
+        if chromatic:
+            # Rather than having SED.withMagnitude integrate the SED through the bandpass for
+            # every galaxy, do the same calculation only once for each SED and redshift.
+            z = p['z']
+            sed_index = np.where(p['gal_n'] < 1.5, 1, np.where(p['gal_n'] < 3.0, 2, 0))
+            sed_cache = {}
+            def sed_with_mag(k, i, mag):
+                key = (k, z[i])
+                if key not in sed_cache:
+                    sed_z = self._sed[k].atRedshift(z[i])
+                    sed_cache[key] = (sed_z, sed_z.calculateMagnitude(self._bandpass))
+                sed_z, current_mag = sed_cache[key]
+                return sed_z * 10**(-0.4*(mag - current_mag))
+
         gal_list = []
-        for index in indices:
-            record = self.getParametricRecord(index)
-            gal = self._buildParametric(record, sersic_prec, gsparams,
-                                        chromatic, self._bandpass, self._sed)
+        for i in range(len(records)):
+            if p['use_bulgefit'][i]:
+                if chromatic:
+                    bulge = galsim.DeVaucouleurs(half_light_radius=p['bulge_hlr'][i],
+                                                 gsparams=gsparams)
+                    bulge *= sed_with_mag(0, i, p['mag'][i]-2.5*math.log10(p['bfrac'][i]))
+                    disk = galsim.Exponential(half_light_radius=p['disk_hlr'][i],
+                                              gsparams=gsparams)
+                    disk *= sed_with_mag(1, i, p['mag'][i]-2.5*math.log10((1.-p['bfrac'][i])))
+                else:
+                    bulge = galsim.DeVaucouleurs(flux=p['bulge_flux'][i],
+                                                 half_light_radius=p['bulge_hlr'][i],
+                                                 gsparams=gsparams)
+                    disk = galsim.Exponential(flux=p['disk_flux'][i],
+                                              half_light_radius=p['disk_hlr'][i],
+                                              gsparams=gsparams)
+                if p['bulge_q'][i] < 1.:
+                    bulge = bulge.shear(q=p['bulge_q'][i], beta=p['bulge_beta'][i]*galsim.radians)
+                if p['disk_q'][i] < 1.:
+                    disk = disk.shear(q=p['disk_q'][i], beta=p['disk_beta'][i]*galsim.radians)
+                gal = bulge + disk
+            else:
+                if chromatic:
+                    gal = galsim.Sersic(p['gal_n'][i], flux=1., half_light_radius=p['gal_hlr'][i],
+                                        gsparams=gsparams)
+                    gal *= sed_with_mag(sed_index[i], i, p['mag'][i])
+                else:
+                    gal = galsim.Sersic(p['gal_n'][i], flux=p['gal_flux'][i],
+                                        half_light_radius=p['gal_hlr'][i], gsparams=gsparams)
+                if p['gal_q'][i] < 1.:
+                    gal = gal.shear(q=p['gal_q'][i], beta=p['gal_beta'][i]*galsim.radians)
             gal_list.append(gal)
 
         return gal_list
 
+    @staticmethod
+    def _getParametricArrays(records, sersic_prec):
+        """Compute the parameters of the parametric models for an array of catalog records.
+
+        This does the same calculations as _buildParametric (for catalogs with precomputed fluxes
+        and radii), but for many galaxies at once.
+
+        @returns a dict of NumPy arrays with the parameters of each galaxy.
+        """
+        use_bulgefit = records['use_bulgefit'].astype(bool)
+        if np.any(~use_bulgefit & ~records['viable_sersic'].astype(bool)):
+            raise RuntimeError("Cannot make parametric model for this galaxy!")
+
+        bparams = records['bulgefit']
+        sparams = records['sersicfit']
+        p = { 'use_bulgefit' : use_bulgefit,
+              'bulge_q' : bparams[:,11], 'bulge_beta' : bparams[:,15],
+              'disk_q' : bparams[:,3], 'disk_beta' : bparams[:,7],
+              'bulge_hlr' : records['hlr'][:,1], 'bulge_flux' : records['flux'][:,1],
+              'disk_hlr' : records['hlr'][:,2], 'disk_flux' : records['flux'][:,2],
+              'gal_q' : sparams[:,3], 'gal_beta' : sparams[:,7],
+              'gal_hlr' : records['hlr'][:,0], 'gal_flux' : records['flux'][:,0],
+              'mag' : records['mag_auto'], 'z' : records['zphot'] }
+
+        # Make sure the bulge-to-total flux ratio is not nonsense for the 2-component fits.
+        # (The comparisons are False for nan, so those fail too.)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bfrac = p['bulge_flux'] / (p['bulge_flux'] + p['disk_flux'])
+            if np.any(use_bulgefit & ~((bfrac >= 0) & (bfrac <= 1))):
+                raise RuntimeError("Cannot make parametric model for this galaxy")
+        p['bfrac'] = bfrac
+
+        # Clip and round the Sersic indices the same way as _buildParametric does.
+        gal_n = np.clip(sparams[:,2].astype(float), 0.3, 6.0)
+        if sersic_prec > 0.:
+            gal_n = np.floor(gal_n/sersic_prec + 0.5) * sersic_prec
+        p['gal_n'] = gal_n
+        return p
+
     @staticmethod
     def _round_sersic(n, sersic_prec):
         return float(int(n/sersic_prec + 0.5)) * sersic_prec
@@ -632,6 +632,9 @@ class SED(object):
                           (0, infinity), which implies that the SED needs to be evaluable over
                           this entire range.
 
+        See galsim.sed.calculateFluxes() for calculating the fluxes of many SEDs through many
+        bandpasses and at many redshifts at once.
+
         @returns the flux through the bandpass.
         """
         if self.dimensionless:
@@ -830,40 +833,52 @@ class SED(object):
                          time as a seed. [default: None]
         @param npoints   Number of points DistDeviate should use for its internal interpolation
                          tables. [default: 256]
+
+        The inverse CDF tables are kept in a cache that is shared by all SEDs.  SEDs that differ
+        only in their normalization (e.g. from withFlux()) use the same table.  Without a bandpass,
+        SEDs that also differ in their redshift share a single rest-frame table, which is just
+        shifted to the right redshift.
         """
         if int(nphotons) != nphotons:
             raise TypeError("'nphotons' must be integer type")
         nphotons=int(nphotons)
 
-        if bandpass is None:
-            sed = self
-        else:
-            sed = self * bandpass
-
-        # Speed up the integration by skipping the overhead of __call__
-        sed._make_fast_spec()
-        a = 1/(1.0 + sed.redshift)
-        fn = lambda x: sed._fast_spec(a*x)
-
-        # Create a lookup dict for storing the deviate (save construction time)
-        if not hasattr(self,'deviate'):
-            self.deviate = dict()
-
-        key = (bandpass,npoints)
-        try:
-            dev = self.deviate[key]
-        except KeyError:
-            dev = galsim.DistDeviate(function=fn,x_min=sed.blue_limit,x_max=sed.red_limit,
-                                     npoints=npoints)
-            self.deviate[key] = dev
-
-        # Reset the deviate explicitly
-        if rng is not None: dev.reset(rng)
+        # Without a bandpass, the table is in the rest frame, so it doesn't depend on redshift.
+        redshift = None if bandpass is None else self.redshift
+        table = _wavelength_table_cache(_SEDContent(self), redshift, bandpass, npoints)
 
+        ud = galsim.UniformDeviate(rng)
         ret = np.empty(nphotons)
-        dev.generate(ret)
+        ud.generate(ret)
+        ret = table(ret)
+        if bandpass is None:
+            ret *= 1.0 + self.redshift
         return ret
 
+    def _get_sample_key(self):
+        # A hashable description of the shape of the spectrum in the rest frame, without regard
+        # to its normalization.  Used for the sampleWavelength cache.
+        if not hasattr(self, '_sample_key'):
+            if isinstance(self._spec, galsim.LookupTable):
+                # The range is set by the table, so no need to include the limits.
+                f = np.array(self._spec.getVals(), dtype=float)
+                fmax = np.max(np.abs(f))
+                if fmax > 0.:
+                    f /= fmax
+                # Use float32 so roundoff errors from rescaling don't matter.
+                spec_key = ('table', tuple(self._spec.getArgs()), tuple(f.astype(np.float32)),
+                            self._spec.interpolant, self._spec.x_log, self._spec.f_log)
+            else:
+                if isinstance(self._orig_spec, basestring):
+                    spec_key = self._orig_spec
+                else:
+                    spec_key = self._spec
+                zfactor = 1.0 + self.redshift
+                limits = np.array([self.blue_limit, self.red_limit]) / zfactor
+                spec_key = (spec_key, tuple(limits.astype(np.float32)))
+            self._sample_key = (spec_key, self.wave_type, self.flux_type, self.spectral)
+        return self._sample_key
+
     def __eq__(self, other):
         return (isinstance(other, SED) and
                 self._orig_spec == other._orig_spec and
@@ -908,9 +923,160 @@ class SED(object):
             del d['_spec']
         if '_fast_spec' in d:
             del d['_fast_spec']
+        d.pop('_sample_key', None)
         return d
 
     def __setstate__(self, d):
         self.__dict__ = d
         if '_spec' not in d:
             self._initialize_spec()
+
+
+class _SEDContent(object):
+    # A stand-in for an SED as a key in _wavelength_table_cache.  It compares equal to any other
+    # _SEDContent with the same rest-frame spectral shape (cf. SED._get_sample_key), but holds onto
+    # the actual SED, so the table can be built from it.
+    def __init__(self, sed):
+        self.sed = sed
+        self.key = sed._get_sample_key()
+
+    def __eq__(self, other):
+        return isinstance(other, _SEDContent) and self.key == other.key
+
+    def __ne__(self, other): return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+def _make_wavelength_table(content, redshift, bandpass, npoints):
+    # Build the inverse CDF table (cumulative probability -> wavelength) for sampleWavelength.
+    # If bandpass is None, this is in the rest frame.  Otherwise, it is in the observed frame of
+    # content.sed, which has the given redshift.
+    sed = content.sed
+    if bandpass is None:
+        sed._make_fast_spec()
+        # _fast_spec takes rest-frame wavelengths.
+        fn = sed._fast_spec
+        x_min = sed.blue_limit / (1.0 + sed.redshift)
+        x_max = sed.red_limit / (1.0 + sed.redshift)
+    else:
+        sed = sed * bandpass
+        # Speed up the integration by skipping the overhead of __call__
+        sed._make_fast_spec()
+        a = 1/(1.0 + sed.redshift)
+        fn = lambda x: sed._fast_spec(a*x)
+        x_min = sed.blue_limit
+        x_max = sed.red_limit
+    dev = galsim.DistDeviate(function=fn, x_min=x_min, x_max=x_max, npoints=npoints)
+    return dev._inverseprobabilitytable
+
+_wavelength_table_cache = galsim.utilities.LRU_Cache(_make_wavelength_table, maxsize=100)
+
+
+def calculateFluxes(seds, bandpasses, redshifts=None, wave_step=None):
+    """Calculate the fluxes (photons/cm^2/s) of many SEDs through many bandpasses at once.
+
+    This is equivalent to calling `sed.atRedshift(z).calculateFlux(bandpass)` for every
+    combination of SED, redshift and bandpass, but it is much faster when there are many of them.
+    For each bandpass, the SEDs are all resampled onto a single grid of observed wavelengths,
+    which includes the tabulated wavelengths of the bandpass plus a uniform grid with spacing
+    `wave_step`.  Then the integrals over this grid for all redshifts are done with a single
+    vectorized trapezoidal rule.
+
+    Because of the resampling, the results are not identical to calculateFlux(), which uses the
+    union of the SED and bandpass wavelengths.  The default `wave_step` is the finest median
+    spacing of the tabulated SED wavelengths (in the observed frame at the lowest redshift), which
+    is normally accurate to much better than 0.1%.  Use a smaller value if more precision is
+    required.
+
+        >>> seds = [ galsim.SED(name, 'nm', 'flambda') for name in template_names ]
+        >>> bands = [ galsim.Bandpass('LSST_%s.dat'%f, 'nm') for f in 'ugrizy' ]
+        >>> z = np.linspace(0, 3, 301)
+        >>> fluxes = galsim.sed.calculateFluxes(seds, bands, z)   # shape (nsed, 301, 6)
+
+    @param seds         A list of (spectral) SED objects.
+    @param bandpasses   A list of Bandpass objects.
+    @param redshifts    An optional array of redshifts at which to evaluate each SED.  These
+                        replace the SEDs' own redshifts, as in SED.atRedshift(). [default: None,
+                        which means to use the SEDs as they are]
+    @param wave_step    The spacing in nm of the uniform part of the wavelength grid.
+                        [default: None, which means to choose a value as described above]
+
+    @returns a NumPy array of fluxes with shape (len(seds), len(redshifts), len(bandpasses)), or
+             (len(seds), len(bandpasses)) if `redshifts` is None.
+    """
+    seds = list(seds)
+    bandpasses = list(bandpasses)
+    for sed in seds:
+        if sed.dimensionless:
+            raise TypeError("Cannot calculate flux of dimensionless SED.")
+
+    if redshifts is None:
+        zs = np.array([[sed.redshift] for sed in seds], dtype=float)
+    else:
+        zs = np.array(redshifts, dtype=float).ravel()
+        if np.any(zs <= -1):
+            raise ValueError("Invalid redshift {0}".format(np.min(zs)))
+        zs = np.tile(zs, (len(seds), 1))
+    nz = zs.shape[1]
+
+    if wave_step is None:
+        steps = [ np.median(np.diff(sed.wave_list)) / (1.+sed.redshift) * (1.+np.min(z))
+                  for sed, z in zip(seds, zs) if len(sed.wave_list) > 1 ]
+        if len(steps) > 0:
+            wave_step = np.min(steps)
+
+    fluxes = np.empty((len(seds), nz, len(bandpasses)), dtype=float)
+    slop = 1e-6 # nm
+    for j, bp in enumerate(bandpasses):
+        step = wave_step
+        if step is None:
+            step = (bp.red_limit - bp.blue_limit) / 1000.
+        n = int(np.ceil((bp.red_limit - bp.blue_limit) / step)) + 1
+        x = np.union1d(bp.wave_list, np.linspace(bp.blue_limit, bp.red_limit, n))
+        bx = bp(x)
+        for i, sed in enumerate(seds):
+            # The rest-frame limits of the SED.
+            rest_blue = sed.blue_limit / (1.+sed.redshift)
+            rest_red = sed.red_limit / (1.+sed.redshift)
+            if (np.any(rest_blue * (1.+zs[i]) > bp.blue_limit + slop) or
+                    np.any(rest_red * (1.+zs[i]) < bp.red_limit - slop)):
+                raise ValueError("SED undefined within Bandpass")
+            sed._make_fast_spec()
+            # _fast_spec takes rest-frame wavelengths.
+            rest_x = x[np.newaxis,:] / (1.+zs[i][:,np.newaxis])
+            # Clip roundoff errors at the edges into the allowed range.
+            rest_x = np.clip(rest_x, rest_blue, rest_red)
+            fx = np.empty(rest_x.size, dtype=float)
+            fx[:] = sed._fast_spec(rest_x.ravel())
+            fluxes[i,:,j] = np.trapz(fx.reshape(rest_x.shape) * bx, x, axis=1)
+
+    if redshifts is None:
+        fluxes = fluxes[:,0,:]
+    return fluxes
+
+
+def calculateMagnitudes(seds, bandpasses, redshifts=None, wave_step=None):
+    """Calculate the magnitudes of many SEDs through many bandpasses at once.
+
+    This is the magnitude version of calculateFluxes().  See that function for details.  The
+    bandpasses must all have zeropoints.
+
+    @param seds         A list of (spectral) SED objects.
+    @param bandpasses   A list of Bandpass objects, each with an assigned zeropoint.
+    @param redshifts    An optional array of redshifts at which to evaluate each SED.
+                        [default: None, which means to use the SEDs as they are]
+    @param wave_step    The spacing in nm of the uniform part of the wavelength grid.
+                        [default: None]
+
+    @returns a NumPy array of magnitudes with shape (len(seds), len(redshifts), len(bandpasses)),
+             or (len(seds), len(bandpasses)) if `redshifts` is None.
+    """
+    bandpasses = list(bandpasses)
+    if any(bp.zeropoint is None for bp in bandpasses):
+        raise RuntimeError("Cannot do this calculation for a bandpass without an assigned"
+                           " zeropoint")
+    fluxes = calculateFluxes(seds, bandpasses, redshifts, wave_step)
+    zeropoints = np.array([ bp.zeropoint for bp in bandpasses ], dtype=float)
+    return -2.5 * np.log10(fluxes) + zeropoints
@@ -387,6 +387,12 @@ class LookupTable2D(object):
       - 'floor'
       - 'ceil'
       - 'nearest'
+      - 'spline'
+
+    The 'spline' interpolant is a bicubic Hermite spline, using derivatives at the grid points
+    estimated by finite differences.  It is continuous and has a continuous gradient, which is
+    calculated analytically by the `gradient` method.  This is typically much more accurate than
+    linear interpolation on the same grid, so a coarser grid may be used for the same accuracy.
 
         >>> tab2d = galsim.LookupTable2D(x, y, z, interpolant='floor')
         >>> tab2d(2.2, 3.7)
@@ -441,8 +447,8 @@ class LookupTable2D(object):
     @param x              Strictly increasing array of `x` positions at which to create table.
     @param y              Strictly increasing array of `y` positions at which to create table.
     @param f              Nx by Ny input array of function values.
-    @param interpolant    Interpolant to use.  One of 'floor', 'ceil', 'nearest', or 'linear'.
-                          [default: 'linear']
+    @param interpolant    Interpolant to use.  One of 'floor', 'ceil', 'nearest', 'linear', or
+                          'spline'.  [default: 'linear']
     @param edge_mode      Keyword controlling how extrapolation beyond the input range is handled.
                           See above for details.  [default: 'raise']
     @param constant       A constant to return when extrapolating beyond the input range and
@@ -451,11 +457,15 @@ class LookupTable2D(object):
     def __init__(self, x, y, f, interpolant='linear', edge_mode='raise', constant=0):
         if edge_mode not in ['raise', 'wrap', 'constant']:
             raise ValueError("Unknown edge_mode: {:0}".format(edge_mode))
+        if interpolant not in ['linear', 'floor', 'ceil', 'nearest', 'spline']:
+            raise ValueError("Unknown interpolant: {:0}".format(interpolant))
         self.edge_mode = edge_mode
 
         self.x = np.ascontiguousarray(x, dtype=float)
         self.y = np.ascontiguousarray(y, dtype=float)
-        self.f = np.ascontiguousarray(f, dtype=float)
+        # The C++ table references self.f rather than copying it, so make our own copy to keep
+        # later changes to the input array from changing the table.
+        self.f = np.array(f, dtype=float, order='C')
 
         dx = np.diff(self.x)
         dy = np.diff(self.y)
@@ -485,7 +495,8 @@ class LookupTable2D(object):
                 raise ValueError("Cannot use edge_mode='wrap' unless either x and y are equally "
                                  "spaced or first/last row/column of f are identical.")
 
-        self.table = _galsim._LookupTable2D(self.x, self.y, self.f, self.interpolant)
+        self.table = _makeTable2D(self.x, self.y, self.f, self.interpolant, self.edge_mode,
+                                  self.constant)
 
     def _inbounds(self, x, y):
         """Return whether or not *all* coords specified by x and y are in bounds of the original
@@ -493,103 +504,23 @@ class LookupTable2D(object):
         return (np.min(x) >= self.x[0] and np.max(x) <= self.x[-1] and
                 np.min(y) >= self.y[0] and np.max(y) <= self.y[-1])
 
-    def _wrap_args(self, x, y):
-        """Wrap points back into the fundamental period."""
-        return ((x-self.x[0]) % self.xperiod + self.x[0],
-                (y-self.y[0]) % self.yperiod + self.y[0])
-
-    def _call_raise(self, x, y):
-        if not self._inbounds(x, y):
+    def __call__(self, x, y):
+        # The wrap and constant edge modes are handled by the C++ layer, so the only thing to
+        # check here is whether we need to raise an exception.
+        if self.edge_mode == 'raise' and not self._inbounds(x, y):
             raise ValueError("Extrapolating beyond input range.")
 
         from numbers import Real
         if isinstance(x, Real):
             return self.table(x, y)
         else:
-            x = np.array(x, dtype=float)
-            y = np.array(y, dtype=float)
-            shape = x.shape
-            x = x.ravel()
-            y = y.ravel()
-            f = np.empty_like(x, dtype=float)
-            self.table.interpMany(x, y, f)
-            f = f.reshape(shape)
-            return f
-
-    def _call_wrap(self, x, y):
-        x, y = self._wrap_args(x, y)
-        return self._call_raise(x, y)
-
-    def _call_constant(self, x, y):
-        from numbers import Real
-        if isinstance(x, Real):
-            if self._inbounds(x, y):
-                return self.table(x, y)
-            else:
-                return self.constant
-        else:
-            x = np.array(x, dtype=float)
-            y = np.array(y, dtype=float)
-            shape = x.shape
-            x = x.ravel()
-            y = y.ravel()
-            f = np.empty_like(x)
-            f.fill(self.constant)
-            good = ((x >= self.x[0]) & (x <= self.x[-1]) &
-                    (y >= self.y[0]) & (y <= self.y[-1]))
-            tmp = np.empty((sum(good),), dtype=float)
-            self.table.interpMany(x[good], y[good], tmp)
-            f[good] = tmp
-            f = f.reshape(shape)
+            # These don't make copies if x and y are already contiguous float arrays.
+            x = np.ascontiguousarray(x, dtype=float)
+            y = np.ascontiguousarray(y, dtype=float)
+            f = np.empty(x.shape, dtype=self.f.dtype)
+            self.table.interpMany(x.ravel(), y.ravel(), f.ravel())
             return f
 
-    def __call__(self, x, y):
-        if self.edge_mode == 'raise':
-            return self._call_raise(x, y)
-        elif self.edge_mode == 'wrap':
-            return self._call_wrap(x, y)
-        else: # constant
-            return self._call_constant(x, y)
-
-    def _gradient_raise(self, x, y):
-        if not self._inbounds(x, y):
-            raise ValueError("Extrapolating beyond input range.")
-
-        try:
-            xx = float(x)
-            yy = float(y)
-            return self.table.gradient(xx, yy)
-        except TypeError:
-            dfdx = np.empty_like(x)
-            dfdy = np.empty_like(x)
-            self.table.gradientMany(x.ravel(), y.ravel(), dfdx.ravel(), dfdy.ravel())
-            return dfdx, dfdy
-
-    def _gradient_wrap(self, x, y):
-        x, y = self._wrap_args(x, y)
-        return self._gradient_raise(x, y)
-
-    def _gradient_constant(self, x, y):
-        from numbers import Real
-        if isinstance(x, Real):
-            if self._inbounds(x, y):
-                return self.table.gradient(x, y)
-            else:
-                return 0.0, 0.0
-        else:
-            dfdx = np.empty_like(x)
-            dfdy = np.empty_like(y)
-            dfdx.fill(0.0)
-            dfdy.fill(0.0)
-            good = ((x >= self.x[0]) & (x <= self.x[-1]) &
-                    (y >= self.y[0]) & (y <= self.y[-1]))
-            tmp1 = np.empty((np.sum(good),), dtype=x.dtype)
-            tmp2 = np.empty((np.sum(good),), dtype=x.dtype)
-            self.table.gradientMany(x[good], y[good], tmp1, tmp2)
-            dfdx[good] = tmp1
-            dfdy[good] = tmp2
-            return dfdx, dfdy
-
     def gradient(self, x, y):
         """Calculate the gradient of the function at an arbitrary point or points.
 
@@ -601,12 +532,19 @@ class LookupTable2D(object):
         @returns A tuple of (dfdx, dfdy) where dfdx, dfdy are single values (if x,y were single
         values) or numpy arrays.
         """
-        if self.edge_mode == 'raise':
-            return self._gradient_raise(x, y)
-        elif self.edge_mode == 'wrap':
-            return self._gradient_wrap(x, y)
-        else: # constant
-            return self._gradient_constant(x, y)
+        if self.edge_mode == 'raise' and not self._inbounds(x, y):
+            raise ValueError("Extrapolating beyond input range.")
+
+        from numbers import Real
+        if isinstance(x, Real):
+            return self.table.gradient(x, y)
+        else:
+            x = np.ascontiguousarray(x, dtype=float)
+            y = np.ascontiguousarray(y, dtype=float)
+            dfdx = np.empty(x.shape, dtype=self.f.dtype)
+            dfdy = np.empty(x.shape, dtype=self.f.dtype)
+            self.table.gradientMany(x.ravel(), y.ravel(), dfdx.ravel(), dfdy.ravel())
+            return dfdx, dfdy
 
     def __str__(self):
         return ("galsim.LookupTable2D(x=[%s,...,%s], y=[%s,...,%s], "
@@ -617,8 +555,21 @@ class LookupTable2D(object):
 
     def __repr__(self):
         return ("galsim.LookupTable2D(x=array(%r), y=array(%r), "
-                "f=array(%r), interpolant=%r, edge_mode=%r)"%(
-            self.x.tolist(), self.y.tolist(), self.f.tolist(), self.interpolant, self.edge_mode))
+                "f=array(%r), interpolant=%r, edge_mode=%r, constant=%r)"%(
+            self.x.tolist(), self.y.tolist(), self.f.tolist(), self.interpolant, self.edge_mode,
+            self.constant))
+
+    def __getstate__(self):
+        # The C++ table references self.f rather than copying it, so rebuild it from self.f
+        # after unpickling rather than pickling a second copy of the values.
+        d = self.__dict__.copy()
+        del d['table']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        self.table = _makeTable2D(self.x, self.y, self.f, self.interpolant, self.edge_mode,
+                                  self.constant)
 
     def __eq__(self, other):
         return (isinstance(other, LookupTable2D) and
@@ -631,29 +582,72 @@ class LookupTable2D(object):
     def __hash__(self):
         return hash(("galsim._galsim._LookupTable2D", self.table, self.edge_mode))
 
+
+def _makeTable2D(x, y, f, interpolant, edge_mode, constant):
+    """Make the C++ table, using float values if f is a float32 array and double otherwise.
+    """
+    if f.dtype == np.float32:
+        return _galsim._LookupTable2DF(x, y, f, interpolant, edge_mode, constant)
+    else:
+        return _galsim._LookupTable2D(x, y, f, interpolant, edge_mode, constant)
+
+def _PeriodicLookupTable2D(x, y, f, interpolant='linear'):
+    """Make a LookupTable2D with edge_mode='wrap' from arrays that already include the repeated
+    final row and column needed by the C++ layer.  This skips the sanity checks and, if f is already
+    a C-contiguous float64 or float32 array, does not copy it, so the table shares f's memory.
+    Tables made from float32 arrays also return float32 values.
+
+    @param x            Equally spaced x positions, including the position of the repeated row.
+    @param y            Equally spaced y positions, including the position of the repeated column.
+    @param f            (len(x), len(y)) array of function values, where f[-1] == f[0] and
+                        f[:,-1] == f[:,0].
+    @param interpolant  Interpolant to use.  [default: 'linear']
+    """
+    ret = LookupTable2D.__new__(LookupTable2D)
+    ret.x = np.ascontiguousarray(x, dtype=float)
+    ret.y = np.ascontiguousarray(y, dtype=float)
+    if getattr(f, 'dtype', None) == np.float32:
+        ret.f = np.ascontiguousarray(f)
+    else:
+        ret.f = np.ascontiguousarray(f, dtype=float)
+    ret.interpolant = interpolant
+    ret.edge_mode = 'wrap'
+    ret.constant = 0.
+    ret.xperiod = ret.x[-1] - ret.x[0]
+    ret.yperiod = ret.y[-1] - ret.y[0]
+    ret.table = _makeTable2D(ret.x, ret.y, ret.f, ret.interpolant, ret.edge_mode, ret.constant)
+    return ret
+
 def _LookupTable2D_eq(self, other):
-    return (isinstance(other, _galsim._LookupTable2D)
+    return (isinstance(other, type(self))
             and np.array_equal(self.getXArgs(), other.getXArgs())
             and np.array_equal(self.getYArgs(), other.getYArgs())
             and np.array_equal(self.getVals(), other.getVals())
-            and self.getInterp() == other.getInterp())
+            and self.getInterp() == other.getInterp()
+            and self.getEdgeMode() == other.getEdgeMode()
+            and self.getConstant() == other.getConstant())
 
 def _LookupTable2D_str(self):
     x = self.getXArgs()
     y = self.getYArgs()
     f = self.getVals()
-    return ("galsim._galsim._LookupTable2D(x=[%s,...,%s], y=[%s,...,%s], "
-            "f=[[%s,...,%s],...,[%s,...,%s]], interpolant=%r)"%(
-            x[0], x[-1], y[0], y[-1], f[0,0], f[0,-1], f[-1,0], f[-1,-1], self.getInterp()))
-
-_galsim._LookupTable2D.__getinitargs__ = lambda self: \
-        (self.getXArgs(), self.getYArgs(), self.getVals(), self.getInterp())
-_galsim._LookupTable2D.__eq__ = _LookupTable2D_eq
-_galsim._LookupTable2D.__hash__ = lambda self: \
-        hash(("_galsim._LookupTable2D", tuple(self.getXArgs()), tuple(self.getYArgs()),
-              tuple(np.array(self.getVals()).ravel()), self.getInterp()))
-_galsim._LookupTable2D.__str__ = _LookupTable2D_str
-_galsim._LookupTable2D.__repr__ = lambda self: \
-        'galsim._galsim._LookupTable2D(array(%r), array(%r), array(%r), %r)'%(
-        self.getXArgs().tolist(), self.getYArgs().tolist(), self.getVals().tolist(),
-        self.getInterp())
+    return ("galsim._galsim.%s(x=[%s,...,%s], y=[%s,...,%s], "
+            "f=[[%s,...,%s],...,[%s,...,%s]], interpolant=%r, edge_mode=%r)"%(
+            type(self).__name__, x[0], x[-1], y[0], y[-1], f[0,0], f[0,-1], f[-1,0], f[-1,-1],
+            self.getInterp(), self.getEdgeMode()))
+
+for _cls in (_galsim._LookupTable2D, _galsim._LookupTable2DF):
+    _cls.__getinitargs__ = lambda self: \
+            (self.getXArgs(), self.getYArgs(), self.getVals(), self.getInterp(),
+             self.getEdgeMode(), self.getConstant())
+    _cls.__eq__ = _LookupTable2D_eq
+    _cls.__hash__ = lambda self: \
+            hash(("_galsim." + type(self).__name__, tuple(self.getXArgs()),
+                  tuple(self.getYArgs()), tuple(np.array(self.getVals()).ravel()),
+                  self.getInterp(), self.getEdgeMode(), self.getConstant()))
+    _cls.__str__ = _LookupTable2D_str
+    _cls.__repr__ = lambda self: \
+            'galsim._galsim.%s(array(%r), array(%r), array(%r, dtype=%s), %r, %r, %r)'%(
+            type(self).__name__, self.getXArgs().tolist(), self.getYArgs().tolist(),
+            self.getVals().tolist(), self.getVals().dtype.name, self.getInterp(),
+            self.getEdgeMode(), self.getConstant())
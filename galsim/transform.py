@@ -251,7 +251,7 @@ class Transformation(galsim.GSObject):
     def _fwd_normal(self, x, y):
         return self._jac[0] * x + self._jac[1] * y, self._jac[2] * x + self._jac[3] * y
 
-    def shoot(self, n_photons, rng=None):
+    def shoot(self, n_photons, rng=None, photons=None):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -259,6 +259,8 @@ class Transformation(galsim.GSObject):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param photons      If provided, a PhotonArray of size `n_photons` to fill with the shot
+                            photons, rather than allocating a new one.  [default: None]
         @returns PhotonArray.
         """
         # Depending on the jacobian, it can be significantly faster to use a specialized fwd func.
@@ -274,7 +276,7 @@ class Transformation(galsim.GSObject):
             det = abs(self._jac[0] * self._jac[3] - self._jac[1] * self._jac[2])
 
         ud = galsim.UniformDeviate(rng)
-        photon_array = self.original.shoot(n_photons, ud)
+        photon_array = self.original.shoot(n_photons, ud, photons)
 
         newx, newy = fwd(photon_array.x,photon_array.y)
         photon_array.x = newx + self.offset.x
@@ -0,0 +1,183 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2017 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+#ifndef GalSim_AliasTable_H
+#define GalSim_AliasTable_H
+
+#include <vector>
+#include <algorithm>
+#include <cmath>
+
+namespace galsim {
+
+    /**
+     * @brief Class to build an alias table for random draws among objects with known probabilities
+     *
+     * This class plays the same role as `ProbabilityTree`, and has the same interface, but it
+     * uses Vose's alias method rather than a binary search tree.  Each member of the vector is
+     * assigned a bin of equal probability, 1/N.  Within each bin, a fraction `prob` of the
+     * probability belongs to the member itself and the rest belongs to its `alias`, which is some
+     * other member with more than 1/N of the total probability.  A draw then only needs to select
+     * a bin and compare against `prob`, so `find()` takes constant time, regardless of how many
+     * members there are or how unequal their probabilities.
+     *
+     * The class FluxData can be anything that has a `getFlux()` call.  The absolute value of
+     * the return from `getFlux()` is taken as the relative probability that should be assigned
+     * to this member of the vector.
+     *
+     * To use the class, just append your members to this class using the std::vector
+     * methods.  Then call `buildTable()`, optionally specifying a minimum level of flux
+     * for members to be retained in the table (default is that any non-zero member is in).
+     * The `find()` method will now return random draws in O(1) time.
+     */
+    template <class FluxData>
+    class AliasTable :
+        //! @cond  This keeps doxygen from adding vector to our list of classes.
+        private std::vector<FluxData>
+        //! @endcond
+    {
+        typedef typename std::vector<FluxData>::iterator VecIter;
+    public:
+        using std::vector<FluxData>::size;
+        using std::vector<FluxData>::begin;
+        using std::vector<FluxData>::end;
+        using std::vector<FluxData>::push_back;
+        using std::vector<FluxData>::insert;
+        using std::vector<FluxData>::empty;
+        using std::vector<FluxData>::clear;
+
+        /// @brief Constructor - nothing to do.
+        AliasTable() : _nelem(0), _totalAbsFlux(0.) {}
+
+        /**
+         * @brief Choose a member of the table based on a uniform deviate
+         *
+         * The parameter unitRandom must be a uniform deviate in [0,1) interval.
+         * On output this parameter is replaced by another random value in the [0,1) interval,
+         * which is uniformly distributed within the winning member and independent of which
+         * member was chosen.
+         *
+         * @param[in,out] unitRandom On input, a random number between 0 and 1.  On output,
+         *               holds a new uniform deviate.
+         * @returns Pointer to the selected table member.
+         */
+        const FluxData* find(double& unitRandom) const
+        {
+            xassert(_nelem > 0);
+            double x = unitRandom * _nelem;
+            int i = int(x);
+            if (i >= _nelem) i = _nelem-1;
+            double frac = x - i;
+            const double p = _prob[i];
+            if (frac < p) {
+                unitRandom = frac / p;
+                return &(*this)[i];
+            } else {
+                unitRandom = (frac - p) / (1. - p);
+                return &(*this)[_alias[i]];
+            }
+        }
+
+        /**
+         * @brief Construct the alias table from current vector elements.
+         * @param[in] threshold that have flux <= this value are not included in the table.
+         */
+        void buildTable(double threshold=0.)
+        {
+            dbg<<"buildTable\n";
+            assert(!empty());
+            assert(_nelem == 0);
+
+            // Move any members with too little flux to the end, where they will be ignored.
+            VecIter last = end();
+            if (threshold != 0.) {
+                last = std::stable_partition(begin(), end(), AboveThreshold(threshold));
+            }
+            _nelem = last - begin();
+            dbg<<"N elements to build table with = "<<_nelem<<std::endl;
+            assert(_nelem > 0);
+
+            // NB. Accumulate from end for better numerical accuracy adding up small values.
+            _totalAbsFlux = 0.;
+            for (VecIter it=last; it!=begin();)
+                _totalAbsFlux += std::abs((--it)->getFlux());
+            dbg<<"totalAbsFlux = "<<_totalAbsFlux<<std::endl;
+
+            // Scale the probabilities so the mean is 1, and sort into small and large piles.
+            std::vector<double> scaled(_nelem);
+            std::vector<int> small, large;
+            small.reserve(_nelem);
+            large.reserve(_nelem);
+            for (int i=0; i<_nelem; ++i) {
+                scaled[i] = std::abs((*this)[i].getFlux()) * _nelem / _totalAbsFlux;
+                if (scaled[i] < 1.) small.push_back(i);
+                else large.push_back(i);
+            }
+
+            // Each small member fills the rest of its bin with flux from some large member.
+            _prob.resize(_nelem);
+            _alias.resize(_nelem);
+            while (!small.empty() && !large.empty()) {
+                int s = small.back(); small.pop_back();
+                int l = large.back(); large.pop_back();
+                _prob[s] = scaled[s];
+                _alias[s] = l;
+                scaled[l] = (scaled[l] + scaled[s]) - 1.;
+                if (scaled[l] < 1.) small.push_back(l);
+                else large.push_back(l);
+            }
+            // Anything left over has (up to rounding errors) exactly 1/N of the probability.
+            while (!large.empty()) {
+                int l = large.back(); large.pop_back();
+                _prob[l] = 1.;
+                _alias[l] = l;
+            }
+            while (!small.empty()) {
+                int s = small.back(); small.pop_back();
+                _prob[s] = 1.;
+                _alias[s] = s;
+            }
+            dbg<<"Done buildTable\n";
+        }
+
+        /// @brief Return the total unnormalized probability of the members in the table.
+        double getTotalAbsFlux() const { return _totalAbsFlux; }
+
+    private:
+
+        /// @brief Predicate to select members with more than some threshold flux.
+        class AboveThreshold
+        {
+        public:
+            AboveThreshold(double threshold) : _threshold(threshold) {}
+            bool operator()(const FluxData& data) const
+            { return std::abs(data.getFlux()) > _threshold; }
+        private:
+            double _threshold;
+        };
+
+        int _nelem; ///< Number of members used in the table
+        double _totalAbsFlux; ///< Stored total unnormalized probability
+        std::vector<double> _prob; ///< Probability of choosing the member itself in each bin
+        std::vector<int> _alias; ///< The other member to choose in each bin
+    };
+
+} // namespace galsim
+
+#endif
@@ -168,12 +168,12 @@ namespace galsim {
          * 1 due to shot noise in negative/positive photons, and small fluctuations in photon
          * weights.
          *
-         * @param[in] N number of photons to shoot
+         * @param[in,out] photons PhotonArray in which to write the vector of displacements for
+         *                        the interpolation kernel.  Its size sets the number of photons.
          * @param[in] ud UniformDeviate used to generate random values
-         * @returns a PhotonArray containing the vector of displacements for interpolation kernel.
          */
-        virtual boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const
-        { checkSampler(); return _sampler->shoot(N, ud); }
+        virtual void shoot(PhotonArray& photons, UniformDeviate ud) const
+        { checkSampler(); _sampler->shoot(photons, ud); }
 
         virtual std::string makeStr() const =0;
 
@@ -226,7 +226,7 @@ namespace galsim {
 
         virtual double getPositiveFlux() const=0;
         virtual double getNegativeFlux() const=0;
-        virtual boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const=0;
+        virtual void shoot(PhotonArray& photons, UniformDeviate ud) const=0;
     };
 
     /**
@@ -256,7 +256,7 @@ namespace galsim {
         // Photon-shooting routines:
         double getPositiveFlux() const;
         double getNegativeFlux() const;
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         // Access the 1d interpolant functions for more efficient 2d interps:
         double xval1d(double x) const { return _i1d->xval(x); }
@@ -308,7 +308,7 @@ namespace galsim {
         // Override the default numerical photon-shooting method
         double getPositiveFlux() const { return 1.; }
         double getNegativeFlux() const { return 0.; }
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         std::string makeStr() const;
 
@@ -352,7 +352,7 @@ namespace galsim {
         // Override the default numerical photon-shooting method
         double getPositiveFlux() const { return 1.; }
         double getNegativeFlux() const { return 0.; }
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         std::string makeStr() const;
 
@@ -393,7 +393,7 @@ namespace galsim {
         double xvalWrapped(double x, int N) const;
         double uval(double u) const;
 
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         std::string makeStr() const;
 
@@ -436,7 +436,7 @@ namespace galsim {
         double getPositiveFlux() const { return 1.; }
         double getNegativeFlux() const { return 0.; }
         // Linear interpolant has fast photon-shooting by adding two uniform deviates per
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         std::string makeStr() const;
 
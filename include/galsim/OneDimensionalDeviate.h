@@ -25,7 +25,7 @@
 #include <functional>
 #include "Random.h"
 #include "PhotonArray.h"
-#include "ProbabilityTree.h"
+#include "AliasTable.h"
 #include "SBProfile.h"
 #include "Std.h"
 
@@ -192,9 +192,9 @@ namespace galsim {
      * aim that the absolute value of flux be nearly constant so that statistical errors are
      * predictable.  This code does this by first dividing the domain of the function into
      * `Interval` objects, with known integrated (absolute) flux in each.  To shoot a photon, a
-     * UniformDeviate is selected and scaled to represent the cumulative flux that should exist
-     * within the position of the photon.  The class first uses the binary-search feature built into
-     * the Standard Library `set` container to locate the `Interval` that will contain the photon.
+     * UniformDeviate is selected and used to pick an `Interval` with probability proportional to
+     * its absolute flux.  The class uses an `AliasTable` for this, so the selection takes
+     * constant time per photon, regardless of the number of `Interval`s.
      * Then it asks the `Interval` to decide where within the `Interval` to place the photon.  As
      * noted in the `Interval` docstring, this can be done either by rejection sampling, or - if the
      * range of FluxDensity values within an interval is small - by simply adjusting the flux to
@@ -240,15 +240,16 @@ namespace galsim {
          *
          * If `_isRadial=true`, photons will populate the plane.  Otherwise only the x coordinate
          * of photons will be generated, for 1d distribution.
-         * @param[in] N number of photons to draw
+         * @param[in,out] photons PhotonArray in which to write the photons.  Its size sets the
+         *                        number of photons to draw.
          * @param[in] ud UniformDeviate used to produce random selections.
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
     private:
 
         const FluxDensity& _fluxDensity; // Function being sampled
-        ProbabilityTree<Interval> _pt; // Binary tree of intervals for photon shooting
+        AliasTable<Interval> _table; // Alias table of intervals for photon shooting
         double _positiveFlux; // Stored total positive flux
         double _negativeFlux; // Stored total negative flux
         const bool _isRadial; // True for 2d axisymmetric function, false for 1d function
@@ -91,11 +91,10 @@ namespace galsim {
          * SBAdd will divide the N photons among its summands with probabilities proportional to
          * their integrated (absolute) fluxes.  Note that the order of photons in output array will
          * not be random as different summands' outputs are simply concatenated.
-         * @param[in] N Total number of photons to produce.
+         * @param[in,out] photons PhotonArray in which to write the photon information
          * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
-         * @returns PhotonArray containing all the photons' info.
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         /**
          * @brief Give total positive flux of all summands
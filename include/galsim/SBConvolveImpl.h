@@ -108,11 +108,10 @@ namespace galsim {
          *
          * SBConvolve will add the displacements of photons generated by each convolved component.
          * Their fluxes are multiplied (modulo factor of N).
-         * @param[in] N Total number of photons to produce.
+         * @param[in,out] photons PhotonArray in which to write the photon information
          * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
-         * @returns PhotonArray containing all the photons' info.
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         // Overrides for better efficiency
         template <typename T>
@@ -193,7 +192,7 @@ namespace galsim {
         double getPositiveFlux() const;
         double getNegativeFlux() const;
 
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         // Overrides for better efficiency
         template <typename T>
@@ -269,7 +268,7 @@ namespace galsim {
         double getPositiveFlux() const;
         double getNegativeFlux() const;
 
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         // Overrides for better efficiency
         template <typename T>
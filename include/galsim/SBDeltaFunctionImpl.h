@@ -55,11 +55,10 @@ namespace galsim {
         /**
          * @brief Shoot photons through this SBDeltaFunction.
          *
-         * @param[in] N Total number of photons to produce.
+         * @param[in,out] photons PhotonArray in which to write the photon information
          * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
-         * @returns PhotonArray containing all the photons' info.
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         std::string serialize() const;
 
@@ -72,7 +72,7 @@ namespace galsim {
          *
          * Will require 2 uniform deviates per photon, plus analytic function (pow and sqrt)
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         double getBeta() const { return _beta; }
         double getScaleRadius() const { return _rD; }
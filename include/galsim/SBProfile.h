@@ -304,6 +304,19 @@ namespace galsim {
          */
         boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
 
+        /**
+         * @brief Shoot photons through this SBProfile into an existing PhotonArray.
+         *
+         * This is the same as shoot(N, ud), except that the photons are written into the
+         * provided array rather than a newly allocated one.  The number of photons is taken from
+         * the size of `photons`.  This lets a caller shooting photons in several batches reuse
+         * the same array for each batch.
+         *
+         * @param[in,out] photons PhotonArray in which to write the photon information.
+         * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
+         */
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
+
         /**
          * @brief Return expectation value of flux in positive photons when shoot() is called
          *
@@ -66,11 +66,10 @@ namespace galsim {
          * SBTransform will simply apply the affine transformation to coordinates of photons
          * generated by its adaptee, and rescale the flux by the determinant of the distortion
          * matrix.
-         * @param[in] N Total number of photons to produce.
+         * @param[in,out] photons PhotonArray in which to write the photon information
          * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
-         * @returns PhotonArray containing all the photons' info.
          */
-        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+        void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
         SBProfile getObj() const { return _adaptee; }
         void getJac(double& mA, double& mB, double& mC, double& mD) const
@@ -28,6 +28,8 @@
 #include <iostream>
 #include <functional>
 
+#include <boost/shared_ptr.hpp>
+
 #include "Std.h"
 #include "OneDimensionalDeviate.h"
 
@@ -214,17 +216,25 @@ namespace galsim {
     class Table2D
     {
     public:
-        enum interpolant { linear, floor, ceil, nearest };
+        enum interpolant { linear, floor, ceil, nearest, spline };
+        enum edge_mode { raise, wrap, constant };
 
         /// Table from xargs, yargs, vals
-        Table2D(const A* _xargs, const A* _yargs, const V* _vals, int Nx, int Ny, interpolant in);
+        /// For edge_mode wrap, the first and last rows and columns of vals must be identical,
+        /// and the periods are taken to be xmax-xmin and ymax-ymin.  For edge_mode constant,
+        /// values outside the table are given by the `constant` argument.
+        /// If owner is provided, the vals array is not copied; the table instead keeps owner
+        /// to manage the lifetime of the memory.  Otherwise the table keeps its own copy of vals.
+        Table2D(const A* _xargs, const A* _yargs, const V* _vals, int Nx, int Ny, interpolant in,
+                edge_mode edge=raise, V constant=V(0),
+                boost::shared_ptr<const V> owner=boost::shared_ptr<const V>());
 
         A xmin() const {return xargs.front();}
         A xmax() const {return xargs.back();}
         A ymin() const {return yargs.front();}
         A ymax() const {return yargs.back();}
 
-        /// interp, but exception if beyond bounds
+        /// interp, applying the edge mode if beyond bounds
         V lookup(const A x, const A y) const;
 
         /// interp many values at once
@@ -239,17 +249,30 @@ namespace galsim {
 
         const std::vector<A>& getXArgs() const { return xargs.getArgs(); }
         const std::vector<A>& getYArgs() const { return yargs.getArgs(); }
-        const std::vector<V>& getVals() const { return vals; }
+        const V* getVals() const { return vals; }
         int getNx() const {return Nx;}
         int getNy() const {return Ny;}
         interpolant getInterp() const { return iType; }
+        edge_mode getEdgeMode() const { return edge; }
+        V getConstant() const { return const_val; }
 
     private:
         interpolant iType;
+        edge_mode edge;
+        V const_val;
         const int Nx, Ny; // Array dimensions
         const ArgVec<A> xargs;
         const ArgVec<A> yargs;
-        const std::vector<V> vals;
+        boost::shared_ptr<const V> _owner;  // Manages the memory pointed to by vals.
+        const V* vals;
+
+        // Derivatives at the grid points, only used for spline interpolation.
+        std::vector<V> dfdx, dfdy, d2fdxdy;
+
+        // Apply the edge mode to the point (x,y).  For wrap, x and y are moved into the
+        // fundamental period.  Returns false if the point is out of bounds with edge mode
+        // constant, in which case the constant value should be used.
+        bool applyEdge(A& x, A& y) const;
 
         typedef V (Table2D<V,A>::*Table2DMemFn)(const A x, const A y, int i, int j) const;
         Table2DMemFn interpolate;
@@ -257,6 +280,12 @@ namespace galsim {
         V floorInterpolate(const A x, const A y, int i, int j) const;
         V ceilInterpolate(const A x, const A y, int i, int j) const;
         V nearestInterpolate(const A x, const A y, int i, int j) const;
+        V splineInterpolate(const A x, const A y, int i, int j) const;
+
+        void linearGradient(const A x, const A y, int i, int j, V& dfdx, V& dfdy) const;
+        void splineGradient(const A x, const A y, int i, int j, V& dfdx, V& dfdy) const;
+
+        void setupSpline();
     };
 }
 
@@ -127,6 +127,8 @@ namespace {
                      "Convolve this PhotonArray with another")
                 .def("setCorrelated", &PhotonArray::setCorrelated, (bp::arg("new_val")),
                      "Declare that the photons in this array are correlated.")
+                .def("isCorrelated", &PhotonArray::isCorrelated,
+                     "Returns whether the photons in this array are correlated.")
                 .enable_pickling()
                 ;
             bp::register_ptr_to_python< boost::shared_ptr<PhotonArray> >();
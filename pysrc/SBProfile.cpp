@@ -179,7 +179,14 @@ namespace galsim {
                 .def("shift", &SBProfile::shift, bp::args("delta"))
                 .def("expand", &SBProfile::expand, bp::args("scale"))
                 .def("transform", &SBProfile::transform, bp::args("dudx", "dudy", "dvdx", "dvdy"))
-                .def("shoot", &SBProfile::shoot, bp::args("n", "u"))
+                .def("shoot",
+                     (boost::shared_ptr<PhotonArray> (SBProfile::*)(int, UniformDeviate) const)
+                     &SBProfile::shoot, bp::args("n", "u"))
+                .def("shoot",
+                     (void (SBProfile::*)(PhotonArray&, UniformDeviate) const)&SBProfile::shoot,
+                     bp::args("photons", "u"),
+                     "Shoot photons into an existing PhotonArray, using its size as the number "
+                     "of photons.")
                 .def("__repr__", &SBProfile::repr)
                 .def("serialize", &SBProfile::serialize)
                 .enable_pickling()
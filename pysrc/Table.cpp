@@ -150,13 +150,17 @@ namespace {
 
     }; // struct PyTable
 
+    // Table2D is exported with both double and float values.  The float version halves the
+    // memory of very large tables, such as atmospheric phase screens.
+    template <typename V>
     struct PyTable2D{
-        static Table2D<double, double>* makeTable2D(
+        static Table2D<V,double>* makeTable2D(
             const bp::object& x, const bp::object& y, const bp::object& f,
-            const char* interp_c)
+            const char* interp_c, const char* edge_c, double constant)
         {
 
             const std::string interp = interp_c;
+            const std::string edge_mode = edge_c;
 
             const int Nx = GetNumpyArrayDim(f.ptr(), 0);
             const int Ny = GetNumpyArrayDim(f.ptr(), 1);
@@ -166,37 +170,55 @@ namespace {
             assert(Ny == Ny2);
             const double* xargs = GetNumpyArrayData<double>(x.ptr());
             const double* yargs = GetNumpyArrayData<double>(y.ptr());
-            const double* vals = GetNumpyArrayData<double>(f.ptr());
-            Table2D<double,double>::interpolant i = Table2D<double,double>::linear;
-            if (interp == "linear") i = Table2D<double,double>::linear;
-            else if (interp == "floor") i = Table2D<double,double>::floor;
-            else if (interp == "ceil") i = Table2D<double,double>::ceil;
-            else if (interp == "nearest") i = Table2D<double,double>::nearest;
+            // Reference the values in f directly rather than copying them.  The owner keeps the
+            // numpy array alive for as long as the table exists.
+            V* vals;
+            boost::shared_ptr<V> owner;
+            int step, stride;
+            CheckNumpyArray(f, 2, true, vals, owner, step, stride);
+            if (step != 1 || stride != Ny) {
+                PyErr_SetString(PyExc_ValueError, "f must be C-contiguous");
+                bp::throw_error_already_set();
+            }
+            typename Table2D<V,double>::interpolant i = Table2D<V,double>::linear;
+            if (interp == "linear") i = Table2D<V,double>::linear;
+            else if (interp == "floor") i = Table2D<V,double>::floor;
+            else if (interp == "ceil") i = Table2D<V,double>::ceil;
+            else if (interp == "nearest") i = Table2D<V,double>::nearest;
+            else if (interp == "spline") i = Table2D<V,double>::spline;
             else {
                 PyErr_SetString(PyExc_ValueError, "Invalid interpolant");
                 bp::throw_error_already_set();
             }
-            return new Table2D<double,double>(xargs, yargs, vals, Nx, Ny, i);
+            typename Table2D<V,double>::edge_mode e = Table2D<V,double>::raise;
+            if (edge_mode == "raise") e = Table2D<V,double>::raise;
+            else if (edge_mode == "wrap") e = Table2D<V,double>::wrap;
+            else if (edge_mode == "constant") e = Table2D<V,double>::constant;
+            else {
+                PyErr_SetString(PyExc_ValueError, "Invalid edge_mode");
+                bp::throw_error_already_set();
+            }
+            return new Table2D<V,double>(xargs, yargs, vals, Nx, Ny, i, e, V(constant), owner);
         }
 
-        static void interpMany(const Table2D<double,double>& table2d,
+        static void interpMany(const Table2D<V,double>& table2d,
                                const bp::object& x, const bp::object& y,
                                const bp::object& vals)
         {
             const double* xvec = GetNumpyArrayData<double>(x.ptr());
             const double* yvec = GetNumpyArrayData<double>(y.ptr());
-            double* valvec = GetNumpyArrayData<double>(vals.ptr());
+            V* valvec = GetNumpyArrayData<V>(vals.ptr());
             int N = GetNumpyArrayDim(x.ptr(), 0);
             table2d.interpMany(xvec, yvec, valvec, N);
         }
 
-        static void interpManyMesh(const Table2D<double,double>& table2d,
+        static void interpManyMesh(const Table2D<V,double>& table2d,
                                    const bp::object& x, const bp::object& y,
                                    const bp::object& vals)
         {
             const double* xvec = GetNumpyArrayData<double>(x.ptr());
             const double* yvec = GetNumpyArrayData<double>(y.ptr());
-            double* valvec = GetNumpyArrayData<double>(vals.ptr());
+            V* valvec = GetNumpyArrayData<V>(vals.ptr());
             int Nx = GetNumpyArrayDim(x.ptr(), 0);
             int Ny = GetNumpyArrayDim(y.ptr(), 0);
             assert(Nx == GetNumpyArrayDim(vals.ptr(), 0));
@@ -204,58 +226,61 @@ namespace {
             table2d.interpManyMesh(xvec, yvec, valvec, Nx, Ny);
         }
 
-        static bp::tuple Gradient(const Table2D<double,double>& table2d,
+        static bp::tuple Gradient(const Table2D<V,double>& table2d,
                                    double x, double y)
         {
-            double dfdx;
-            double dfdy;
+            V dfdx;
+            V dfdy;
             table2d.gradient(x, y, dfdx, dfdy);
             return bp::make_tuple(dfdx, dfdy);
         }
 
-        static void GradientMany(const Table2D<double,double>& table2d,
+        static void GradientMany(const Table2D<V,double>& table2d,
                                  const bp::object& x, const bp::object& y,
                                  const bp::object& dfdx, const bp::object& dfdy)
         {
             const double* xvec = GetNumpyArrayData<double>(x.ptr());
             const double* yvec = GetNumpyArrayData<double>(y.ptr());
-            double* dfdxvec = GetNumpyArrayData<double>(dfdx.ptr());
-            double* dfdyvec = GetNumpyArrayData<double>(dfdy.ptr());
+            V* dfdxvec = GetNumpyArrayData<V>(dfdx.ptr());
+            V* dfdyvec = GetNumpyArrayData<V>(dfdy.ptr());
             int N = GetNumpyArrayDim(x.ptr(), 0);
             table2d.gradientMany(xvec, yvec, dfdxvec, dfdyvec, N);
         }
 
-        static bp::object convertGetXArgs(const Table2D<double,double>& table2d)
+        static bp::object convertGetXArgs(const Table2D<V,double>& table2d)
         {
             const std::vector<double>& x = table2d.getXArgs();
             return MakeNumpyArray(&x[0], x.size(), 1, true);
         }
 
-        static bp::object convertGetYArgs(const Table2D<double,double>& table2d)
+        static bp::object convertGetYArgs(const Table2D<V,double>& table2d)
         {
             const std::vector<double>& y = table2d.getYArgs();
             return MakeNumpyArray(&y[0], y.size(), 1, true);
         }
 
-        static bp::object convertGetVals(const Table2D<double,double>& table2d)
+        static bp::object convertGetVals(const Table2D<V,double>& table2d)
         {
-            const std::vector<double>& v = table2d.getVals();
-            return MakeNumpyArray(&v[0], table2d.getNx(), table2d.getNy(), 1, table2d.getNy(),
-                                  true);
+            // Return a copy, since the values may be owned by some other numpy array.
+            bp::object vals = MakeNumpyArray(table2d.getVals(), table2d.getNx(), table2d.getNy(),
+                                             1, table2d.getNy(), true);
+            return vals.attr("copy")();
         }
 
-        static std::string convertGetInterp(const Table2D<double,double>& table2d)
+        static std::string convertGetInterp(const Table2D<V,double>& table2d)
         {
-            Table2D<double,double>::interpolant i = table2d.getInterp();
+            typename Table2D<V,double>::interpolant i = table2d.getInterp();
             switch (i) {
-                case Table2D<double,double>::linear:
+                case Table2D<V,double>::linear:
                     return std::string("linear");
-                case Table2D<double,double>::floor:
+                case Table2D<V,double>::floor:
                     return std::string("floor");
-                case Table2D<double,double>::ceil:
+                case Table2D<V,double>::ceil:
                     return std::string("ceil");
-                case Table2D<double,double>::nearest:
+                case Table2D<V,double>::nearest:
                     return std::string("nearest");
+                case Table2D<V,double>::spline:
+                    return std::string("spline");
                 default:
                     PyErr_SetString(PyExc_ValueError, "Invalid interpolant");
                     bp::throw_error_already_set();
@@ -264,29 +289,50 @@ namespace {
             return std::string("");
         }
 
-        static void wrap()
+        static std::string convertGetEdgeMode(const Table2D<V,double>& table2d)
+        {
+            typename Table2D<V,double>::edge_mode e = table2d.getEdgeMode();
+            switch (e) {
+                case Table2D<V,double>::raise:
+                    return std::string("raise");
+                case Table2D<V,double>::wrap:
+                    return std::string("wrap");
+                case Table2D<V,double>::constant:
+                    return std::string("constant");
+                default:
+                    PyErr_SetString(PyExc_ValueError, "Invalid edge_mode");
+                    bp::throw_error_already_set();
+            }
+            // Shouldn't get here...
+            return std::string("");
+        }
+
+        static void wrap(const char* name)
         {
-            bp::class_<Table2D<double,double> > pyTable2D("_LookupTable2D", bp::no_init);
+            bp::class_<Table2D<V,double> > pyTable2D(name, bp::no_init);
             pyTable2D
                 .def("__init__",
                     bp::make_constructor(
                         &makeTable2D, bp::default_call_policies(),
-                        (bp::arg("x"), bp::arg("y"), bp::arg("f"), bp::arg("interp"))
+                        (bp::arg("x"), bp::arg("y"), bp::arg("f"), bp::arg("interp"),
+                         bp::arg("edge_mode"), bp::arg("constant"))
                     )
                 )
-                .def("__call__", &Table2D<double,double>::lookup)
+                .def("__call__", &Table2D<V,double>::lookup)
                 .def("interpMany", &interpMany)
                 .def("interpManyMesh", &interpManyMesh)
                 .def("gradient", &Gradient)
                 .def("gradientMany", &GradientMany)
-                .def("xmin", &Table2D<double,double>::xmin)
-                .def("xmax", &Table2D<double,double>::xmax)
-                .def("ymin", &Table2D<double,double>::ymin)
-                .def("ymax", &Table2D<double,double>::ymax)
+                .def("xmin", &Table2D<V,double>::xmin)
+                .def("xmax", &Table2D<V,double>::xmax)
+                .def("ymin", &Table2D<V,double>::ymin)
+                .def("ymax", &Table2D<V,double>::ymax)
                 .def("getXArgs", &convertGetXArgs)
                 .def("getYArgs", &convertGetYArgs)
                 .def("getVals", &convertGetVals)
                 .def("getInterp", &convertGetInterp)
+                .def("getEdgeMode", &convertGetEdgeMode)
+                .def("getConstant", &Table2D<V,double>::getConstant)
                 .enable_pickling()
                 ;
         }
@@ -301,7 +347,8 @@ void pyExportTable()
 
 void pyExportTable2D()
 {
-    PyTable2D::wrap();
+    PyTable2D<double>::wrap("_LookupTable2D");
+    PyTable2D<float>::wrap("_LookupTable2DF");
 }
 
 } // namespace galsim
@@ -289,14 +289,14 @@ namespace galsim {
                     std::list<Interval> leftList = splitit.split(
                         _gsparams->small_fraction_of_flux * totalAbsoluteFlux);
                     xdbg<<"Add "<<leftList.size()<<" intervals on left of extremem\n";
-                    _pt.insert(_pt.end(), leftList.begin(), leftList.end());
+                    _table.insert(_table.end(), leftList.begin(), leftList.end());
                 }
                 {
                     Interval splitit(_fluxDensity, extremum, range[iRange+1], _isRadial, _gsparams);
                     std::list<Interval> rightList = splitit.split(
                         _gsparams->small_fraction_of_flux * totalAbsoluteFlux);
                     xdbg<<"Add "<<rightList.size()<<" intervals on right of extremem\n";
-                    _pt.insert(_pt.end(), rightList.begin(), rightList.end());
+                    _table.insert(_table.end(), rightList.begin(), rightList.end());
                 }
             } else {
                 // Just single Interval in this range, no extremum:
@@ -305,74 +305,95 @@ namespace galsim {
                 std::list<Interval> leftList = splitit.split(
                     _gsparams->small_fraction_of_flux * totalAbsoluteFlux);
                 xdbg<<"Add "<<leftList.size()<<" intervals\n";
-                _pt.insert(_pt.end(), leftList.begin(), leftList.end());
+                _table.insert(_table.end(), leftList.begin(), leftList.end());
             }
         }
-        dbg<<"Total of "<<_pt.size()<<" intervals\n";
-        // Build the ProbabilityTree
+        dbg<<"Total of "<<_table.size()<<" intervals\n";
+        // Build the AliasTable
         double thresh = std::numeric_limits<double>::epsilon() * totalAbsoluteFlux;
         dbg<<"thresh = "<<thresh<<std::endl;
-        _pt.buildTree(thresh);
+        _table.buildTable(thresh);
     }
 
-    boost::shared_ptr<PhotonArray> OneDimensionalDeviate::shoot(int N, UniformDeviate ud) const
+    void OneDimensionalDeviate::shoot(PhotonArray& photons, UniformDeviate ud) const
     {
+        const int N = photons.size();
         dbg<<"OneDimentionalDeviate shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = 1.\n";
         dbg<<"isradial? "<<_isRadial<<std::endl;
         dbg<<"N = "<<N<<std::endl;
         assert(N>=0);
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
-        if (N==0) return result;
+        if (N==0) return;
         double totalAbsoluteFlux = getPositiveFlux() + getNegativeFlux();
         dbg<<"totalAbsFlux = "<<totalAbsoluteFlux<<std::endl;
         double fluxPerPhoton = totalAbsoluteFlux / N;
         dbg<<"fluxPerPhoton = "<<fluxPerPhoton<<std::endl;
 
         // For each photon, first decide which Interval it's in, then drawWithin the interval.
-        for (int i=0; i<N; i++) {
-            if (_isRadial) {
+        // The selection of Intervals is done in a separate pass from the placement of the
+        // photons, so each loop is short and does the same work for every photon.
+        std::vector<double>& x = photons.getXVector();
+        std::vector<double>& y = photons.getYVector();
+        std::vector<double>& flux = photons.getFluxVector();
+        std::vector<double> unitRandom(N);
+        std::vector<const Interval*> chosen(N);
+        if (_isRadial) {
 #ifdef USE_COS_SIN
-                double unitRandom = ud();
-                Interval* chosen = _pt.find(unitRandom);
+            ud.generate(N, &unitRandom[0]);
+            for (int i=0; i<N; i++) chosen[i] = _table.find(unitRandom[i]);
+            for (int i=0; i<N; i++) {
                 // Now draw a radius from within selected interval
-                double radius, flux;
-                chosen->drawWithin(unitRandom, radius, flux, ud);
+                double radius, f;
+                chosen[i]->drawWithin(unitRandom[i], radius, f, ud);
                 // Draw second ud to get azimuth
                 double theta = 2.*M_PI*ud();
                 double sintheta, costheta;
                 (theta * radians).sincos(sintheta,costheta);
-                result->setPhoton(i, radius*costheta, radius*sintheta, flux*fluxPerPhoton);
+                x[i] = radius*costheta;
+                y[i] = radius*sintheta;
+                flux[i] = f*fluxPerPhoton;
+            }
 #else
-                // Alternate method: doesn't need sin & cos but needs sqrt
-                // First get a point uniformly distributed in unit circle
+            // Alternate method: doesn't need sin & cos but needs sqrt
+            // First get points uniformly distributed in unit circle.  Store them in x,y for now.
+            for (int i=0; i<N; i++) {
                 double xu, yu, rsq;
                 do {
                     xu = 2.*ud()-1.;
                     yu = 2.*ud()-1.;
                     rsq = xu*xu+yu*yu;
                 } while (rsq>=1. || rsq==0.);
+                x[i] = xu;
+                y[i] = yu;
                 // Now rsq is unit deviate from 0 to 1
-                double unitRandom = rsq;
-                const Interval* chosen = _pt.find(unitRandom);
+                flux[i] = rsq;
+                unitRandom[i] = rsq;
+            }
+            for (int i=0; i<N; i++) chosen[i] = _table.find(unitRandom[i]);
+            for (int i=0; i<N; i++) {
                 // Now draw a radius from within selected interval
-                double radius, flux;
-                chosen->drawWithin(unitRandom, radius, flux, ud);
+                double radius, f;
+                chosen[i]->drawWithin(unitRandom[i], radius, f, ud);
                 // Rescale x & y:
-                double rScale = radius / std::sqrt(rsq);
-                result->setPhoton(i, xu*rScale, yu*rScale, flux*fluxPerPhoton);
+                double rScale = radius / std::sqrt(flux[i]);
+                x[i] *= rScale;
+                y[i] *= rScale;
+                flux[i] = f*fluxPerPhoton;
+            }
 #endif
-            } else {
-                // Simple 1d interpolation
-                double unitRandom = ud();
-                const Interval* chosen = _pt.find(unitRandom);
+        } else {
+            // Simple 1d interpolation
+            ud.generate(N, &unitRandom[0]);
+            for (int i=0; i<N; i++) chosen[i] = _table.find(unitRandom[i]);
+            for (int i=0; i<N; i++) {
                 // Now draw an x from within selected interval
-                double x, flux;
-                chosen->drawWithin(unitRandom, x, flux, ud);
-                result->setPhoton(i, x, 0., flux*fluxPerPhoton);
+                double f;
+                chosen[i]->drawWithin(unitRandom[i], x[i], f, ud);
+                y[i] = 0.;
+                flux[i] = f*fluxPerPhoton;
             }
         }
-        dbg<<"OneDimentionalDeviate Realized flux = "<<result->getTotalFlux()<<std::endl;
+        dbg<<"OneDimentionalDeviate Realized flux = "<<photons.getTotalFlux()<<std::endl;
 
         // This next bit is probably a bad idea, especially for profiles that have some
         // negative flux.  It is possible for the random photons to end up totalling a
@@ -387,14 +408,13 @@ namespace galsim {
         // stochastic way.
         // So rescale the image to get the correct flux.
         double targetFlux = getPositiveFlux() - getNegativeFlux();
-        double realizedFlux = result->getTotalFlux();
+        double realizedFlux = photons.getTotalFlux();
         dbg<<"targetFlux = "<<targetFlux<<std::endl;
         dbg<<"realizedFlux = "<<realizedFlux<<std::endl;
         double scale = targetFlux / realizedFlux;
         dbg<<"Rescale result by "<<scale<<std::endl;
-        result->scaleFlux(scale);
+        photons.scaleFlux(scale);
 #endif
-        return result;
     }
 
 } // namespace galsim
@@ -223,16 +223,14 @@ namespace galsim {
         return result;
     }
 
-    boost::shared_ptr<PhotonArray> SBAdd::SBAddImpl::shoot(int N, UniformDeviate u) const
+    void SBAdd::SBAddImpl::shoot(PhotonArray& photons, UniformDeviate u) const
     {
+        const int N = photons.size();
         dbg<<"Add shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
         double totalAbsoluteFlux = getPositiveFlux() + getNegativeFlux();
         double fluxPerPhoton = totalAbsoluteFlux / N;
 
-        // Initialize the output array
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
-
         double remainingAbsoluteFlux = totalAbsoluteFlux;
         int remainingN = N;
         int istart = 0;  // The location in the result array where we assign the component arrays.
@@ -252,12 +250,13 @@ namespace galsim {
                 thisN = bd();
             }
             if (thisN > 0) {
-                boost::shared_ptr<PhotonArray> thisPA = pptr->shoot(thisN, u);
+                PhotonArray thisPA(thisN);
+                pptr->shoot(thisPA, u);
                 // Now rescale the photon fluxes so that they are each nominally fluxPerPhoton
                 // whereas the shoot() routine would have made them each nominally
                 // thisAbsoluteFlux/thisN
-                thisPA->scaleFlux(fluxPerPhoton*thisN/thisAbsoluteFlux);
-                result->assignAt(istart, *thisPA);
+                thisPA.scaleFlux(fluxPerPhoton*thisN/thisAbsoluteFlux);
+                photons.assignAt(istart, thisPA);
                 istart += thisN;
             }
             remainingN -= thisN;
@@ -265,13 +264,13 @@ namespace galsim {
             if (remainingN <=0) break;
             if (remainingAbsoluteFlux <= 0.) break;
         }
+        // If we stopped early, make sure any unused photons in the array carry no flux.
+        for (int i=istart; i<N; ++i) photons.setPhoton(i, 0., 0., 0.);
 
-        dbg<<"Add Realized flux = "<<result->getTotalFlux()<<std::endl;
+        dbg<<"Add Realized flux = "<<photons.getTotalFlux()<<std::endl;
 
         // This process produces correlated photons, so mark the resulting array as such.
-        if (_plist.size() > 1) result->setCorrelated();
-
-        return result;
+        if (_plist.size() > 1) photons.setCorrelated();
     }
 
 }
@@ -367,25 +367,24 @@ namespace galsim {
         this->_stepk = M_PI / R;
     }
 
-    boost::shared_ptr<PhotonArray> SBAiry::SBAiryImpl::shoot(int N, UniformDeviate u) const
+    void SBAiry::SBAiryImpl::shoot(PhotonArray& photons, UniformDeviate u) const
     {
+        const int N = photons.size();
         dbg<<"Airy shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
-        boost::shared_ptr<PhotonArray> result=_info->shoot(N, u);
+        _info->shoot(photons, u);
         // Then rescale for this flux & size
-        result->scaleFlux(_flux);
-        result->scaleXY(1./_D);
-        dbg<<"Airy Realized flux = "<<result->getTotalFlux()<<std::endl;
-        return result;
+        photons.scaleFlux(_flux);
+        photons.scaleXY(1./_D);
+        dbg<<"Airy Realized flux = "<<photons.getTotalFlux()<<std::endl;
     }
 
-    boost::shared_ptr<PhotonArray> AiryInfo::shoot(
-        int N, UniformDeviate u) const
+    void AiryInfo::shoot(PhotonArray& photons, UniformDeviate u) const
     {
         // Use the OneDimensionalDeviate to sample from scale-free distribution
         checkSampler();
         assert(_sampler.get());
-        return _sampler->shoot(N, u);
+        _sampler->shoot(photons, u);
     }
 
     void AiryInfoObs::checkSampler() const
@@ -245,16 +245,15 @@ namespace galsim {
         return M_PI / std::max(_width,_height);
     }
 
-    boost::shared_ptr<PhotonArray> SBBox::SBBoxImpl::shoot(int N, UniformDeviate u) const
+    void SBBox::SBBoxImpl::shoot(PhotonArray& photons, UniformDeviate u) const
     {
+        const int N = photons.size();
         dbg<<"Box shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
         double fluxPerPhoton = _flux/N;
         for (int i=0; i<N; i++)
-            result->setPhoton(i, _width*(u()-0.5), _height*(u()-0.5), fluxPerPhoton);
-        dbg<<"Box Realized flux = "<<result->getTotalFlux()<<std::endl;
-        return result;
+            photons.setPhoton(i, _width*(u()-0.5), _height*(u()-0.5), fluxPerPhoton);
+        dbg<<"Box Realized flux = "<<photons.getTotalFlux()<<std::endl;
     }
 
 
@@ -461,11 +460,11 @@ namespace galsim {
         return M_PI / _r0;
     }
 
-    boost::shared_ptr<PhotonArray> SBTopHat::SBTopHatImpl::shoot(int N, UniformDeviate u) const
+    void SBTopHat::SBTopHatImpl::shoot(PhotonArray& photons, UniformDeviate u) const
     {
+        const int N = photons.size();
         dbg<<"TopHat shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
         double fluxPerPhoton = _flux/N;
         // cf. SBGaussian's shoot function
         for (int i=0; i<N; i++) {
@@ -477,7 +476,7 @@ namespace galsim {
             (theta * radians).sincos(sint,cost);
             // Then map radius to the desired Gaussian with analytic transformation
             double r = sqrt(rsq) * _r0;;
-            result->setPhoton(i, r*cost, r*sint, fluxPerPhoton);
+            photons.setPhoton(i, r*cost, r*sint, fluxPerPhoton);
 #else
             double xu, yu, rsq;
             do {
@@ -485,10 +484,9 @@ namespace galsim {
                 yu = 2.*u()-1.;
                 rsq = xu*xu+yu*yu;
             } while (rsq>=1.);
-            result->setPhoton(i, xu * _r0, yu * _r0, fluxPerPhoton);
+            photons.setPhoton(i, xu * _r0, yu * _r0, fluxPerPhoton);
 #endif
         }
-        dbg<<"TopHat Realized flux = "<<result->getTotalFlux()<<std::endl;
-        return result;
+        dbg<<"TopHat Realized flux = "<<photons.getTotalFlux()<<std::endl;
     }
 }
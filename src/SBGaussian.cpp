@@ -284,11 +284,11 @@ namespace galsim {
         }
     }
 
-    boost::shared_ptr<PhotonArray> SBGaussian::SBGaussianImpl::shoot(int N, UniformDeviate u) const
+    void SBGaussian::SBGaussianImpl::shoot(PhotonArray& photons, UniformDeviate u) const
     {
+        const int N = photons.size();
         dbg<<"Gaussian shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
         double fluxPerPhoton = _flux/N;
         for (int i=0; i<N; i++) {
             // First get a point uniformly distributed on unit circle
@@ -299,7 +299,7 @@ namespace galsim {
             (theta * radians).sincos(sint,cost);
             // Then map radius to the desired Gaussian with analytic transformation
             double rFactor = _sigma * std::sqrt( -2. * std::log(rsq));
-            result->setPhoton(i, rFactor*cost, rFactor*sint, fluxPerPhoton);
+            photons.setPhoton(i, rFactor*cost, rFactor*sint, fluxPerPhoton);
 #else
             double xu, yu, rsq;
             do {
@@ -309,10 +309,9 @@ namespace galsim {
             } while (rsq>=1. || rsq==0.);
             // Then map radius to the desired Gaussian with analytic transformation
             double rFactor = _sigma * std::sqrt( -2. * std::log(rsq) / rsq);
-            result->setPhoton(i, rFactor*xu, rFactor*yu, fluxPerPhoton);
+            photons.setPhoton(i, rFactor*xu, rFactor*yu, fluxPerPhoton);
 #endif
         }
-        dbg<<"Gaussian Realized flux = "<<result->getTotalFlux()<<std::endl;
-        return result;
+        dbg<<"Gaussian Realized flux = "<<photons.getTotalFlux()<<std::endl;
     }
 }
@@ -159,9 +159,17 @@ namespace galsim {
     }
 
     boost::shared_ptr<PhotonArray> SBProfile::shoot(int N, UniformDeviate ud) const
+    {
+        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        shoot(*result, ud);
+        return result;
+    }
+
+    void SBProfile::shoot(PhotonArray& photons, UniformDeviate ud) const
     {
         assert(_pimpl.get());
-        return _pimpl->shoot(N,ud);
+        photons.setCorrelated(false);
+        _pimpl->shoot(photons, ud);
     }
 
     double SBProfile::getPositiveFlux() const
@@ -305,12 +305,25 @@ namespace galsim {
 
     // Table2D
 
+    template <class V>
+    struct ArrayDeleter
+    {
+        void operator()(const V* p) const { delete [] p; }
+    };
+
     template<class V, class A>
     Table2D<V,A>::Table2D(const A* _xargs, const A* _yargs, const V* _vals, int _Nx, int _Ny,
-        interpolant in) : iType(in), Nx(_Nx), Ny(_Ny),
-                          xargs(_xargs, _xargs+Nx), yargs(_yargs, _yargs+Ny),
-                          vals(_vals, _vals+Nx*Ny)
+        interpolant in, edge_mode _edge, V constant, boost::shared_ptr<const V> owner) :
+        iType(in), edge(_edge), const_val(constant), Nx(_Nx), Ny(_Ny),
+        xargs(_xargs, _xargs+Nx), yargs(_yargs, _yargs+Ny), _owner(owner), vals(_vals)
     {
+        if (!_owner) {
+            // Nobody else is managing the memory, so keep our own copy.
+            V* copy = new V[Nx*Ny];
+            std::copy(_vals, _vals+Nx*Ny, copy);
+            _owner.reset(copy, ArrayDeleter<V>());
+            vals = copy;
+        }
         // Map specific interpolator to `interpolate`.
         switch (iType) {
           case linear:
@@ -325,15 +338,80 @@ namespace galsim {
           case nearest:
                interpolate = &Table2D<V,A>::nearestInterpolate;
                break;
+          case spline:
+               interpolate = &Table2D<V,A>::splineInterpolate;
+               setupSpline();
+               break;
           default:
                throw TableError("interpolation method not yet implemented");
         }
     }
 
+    // Estimate the derivative of f along one axis at index i using finite differences.
+    // For periodic tables, the first and last points are the same point, so use the
+    // neighbors on either side of the seam.
+    template<class V, class A>
+    inline V FiniteDiff(const std::vector<A>& x, const V* f, int stride, int i, bool periodic)
+    {
+        const int N = x.size();
+        if (i > 0 && i < N-1)
+            return (f[(i+1)*stride] - f[(i-1)*stride]) / (x[i+1] - x[i-1]);
+        else if (periodic)
+            return (f[stride] - f[(N-2)*stride]) / ((x[1] - x[0]) + (x[N-1] - x[N-2]));
+        else if (i == 0)
+            return (f[stride] - f[0]) / (x[1] - x[0]);
+        else
+            return (f[(N-1)*stride] - f[(N-2)*stride]) / (x[N-1] - x[N-2]);
+    }
+
+    // Set up the derivatives at each grid point needed for bicubic Hermite interpolation.
+    template<class V, class A>
+    void Table2D<V,A>::setupSpline()
+    {
+        if (Nx < 2 || Ny < 2)
+            throw TableError("spline interpolation requires at least 2 points in each direction");
+        const bool periodic = (edge == wrap);
+        const std::vector<A>& x = xargs.getArgs();
+        const std::vector<A>& y = yargs.getArgs();
+        dfdx.resize(Nx*Ny);
+        dfdy.resize(Nx*Ny);
+        d2fdxdy.resize(Nx*Ny);
+        for (int i=0; i<Nx; ++i) {
+            for (int j=0; j<Ny; ++j) {
+                dfdx[i*Ny+j] = FiniteDiff(x, &vals[j], Ny, i, periodic);
+                dfdy[i*Ny+j] = FiniteDiff(y, &vals[i*Ny], 1, j, periodic);
+            }
+        }
+        for (int i=0; i<Nx; ++i) {
+            for (int j=0; j<Ny; ++j) {
+                d2fdxdy[i*Ny+j] = FiniteDiff(y, &dfdx[i*Ny], 1, j, periodic);
+            }
+        }
+    }
+
+    template<class V, class A>
+    bool Table2D<V,A>::applyEdge(A& x, A& y) const
+    {
+        if (edge == wrap) {
+            const A xperiod = xmax() - xmin();
+            const A yperiod = ymax() - ymin();
+            x = std::fmod(x - xmin(), xperiod);
+            if (x < 0) x += xperiod;
+            x += xmin();
+            y = std::fmod(y - ymin(), yperiod);
+            if (y < 0) y += yperiod;
+            y += ymin();
+        } else if (edge == constant) {
+            return (x >= xmin() && x <= xmax() && y >= ymin() && y <= ymax());
+        }
+        return true;
+    }
+
     //lookup and interpolate function value.
     template<class V, class A>
-    V Table2D<V,A>::lookup(const A x, const A y) const
+    V Table2D<V,A>::lookup(A x, A y) const
     {
+        if (!applyEdge(x, y)) return const_val;
         int i = xargs.upperIndex(x);
         int j = yargs.upperIndex(y);
         return (this->*interpolate)(x, y, i, j);
@@ -345,11 +423,15 @@ namespace galsim {
     template<class V, class A>
     void Table2D<V,A>::interpMany(const A* xvec, const A* yvec, V* valvec, int N) const
     {
-        int i, j;
-        for (int k=0; k<N; k++) {
-            i = xargs.upperIndex(xvec[k]);
-            j = yargs.upperIndex(yvec[k]);
-            *valvec++ = (this->*interpolate)(xvec[k], yvec[k], i, j);
+        if (edge == raise) {
+            int i, j;
+            for (int k=0; k<N; k++) {
+                i = xargs.upperIndex(xvec[k]);
+                j = yargs.upperIndex(yvec[k]);
+                *valvec++ = (this->*interpolate)(xvec[k], yvec[k], i, j);
+            }
+        } else {
+            for (int k=0; k<N; k++) *valvec++ = lookup(xvec[k], yvec[k]);
         }
     }
 
@@ -359,27 +441,43 @@ namespace galsim {
     void Table2D<V,A>::interpManyMesh(const A* xvec, const A* yvec, V* valvec,
                                        int outNx, int outNy) const
     {
-        int i, j;
-        for (int outi=0; outi<outNx; outi++) {
-            i = xargs.upperIndex(xvec[outi]);
-            for (int outj=0; outj<outNy; outj++) {
-                j = yargs.upperIndex(yvec[outj]);
-                *valvec++ = (this->*interpolate)(xvec[outi], yvec[outj], i, j);
+        if (edge == raise) {
+            int i, j;
+            for (int outi=0; outi<outNx; outi++) {
+                i = xargs.upperIndex(xvec[outi]);
+                for (int outj=0; outj<outNy; outj++) {
+                    j = yargs.upperIndex(yvec[outj]);
+                    *valvec++ = (this->*interpolate)(xvec[outi], yvec[outj], i, j);
+                }
             }
+        } else {
+            for (int outi=0; outi<outNx; outi++)
+                for (int outj=0; outj<outNy; outj++)
+                    *valvec++ = lookup(xvec[outi], yvec[outj]);
         }
     }
 
-    /// Estimate many df/dx and df/dy values
+    /// Estimate df/dx and df/dy at a single location
     template <class V, class A>
-    void Table2D<V,A>::gradient(const A x, const A y, V& dfdx, V& dfdy) const
+    void Table2D<V,A>::gradient(A x, A y, V& dfdx, V& dfdy) const
     {
-        // Note: This is really only accurate for linear interpolation.
-        // The derivative for floor, ceil, nearest interpolation doesn't really make
-        // much sense, so this is probably what the user would want.  However, if we
-        // eventually implement spline interpolation for Table2D, then this function will
-        // need to be revisited.
+        if (!applyEdge(x, y)) {
+            dfdx = dfdy = V(0);
+            return;
+        }
         int i = xargs.upperIndex(x);
         int j = yargs.upperIndex(y);
+        if (iType == spline) splineGradient(x, y, i, j, dfdx, dfdy);
+        else linearGradient(x, y, i, j, dfdx, dfdy);
+    }
+
+    template <class V, class A>
+    void Table2D<V,A>::linearGradient(const A x, const A y, int i, int j,
+                                      V& dfdx, V& dfdy) const
+    {
+        // Note: This is really only accurate for linear interpolation.
+        // The derivative for floor, ceil, nearest interpolation doesn't really make
+        // much sense, so this is probably what the user would want.
         A dx = xargs[i] - xargs[i-1];
         A dy = yargs[j] - yargs[j-1];
         V f00 = vals[(i-1)*Ny+j-1];
@@ -445,5 +543,67 @@ namespace galsim {
         return vals[i*Ny+j];
     }
 
+    // The cubic Hermite basis functions and their derivatives.
+    // h0 and h1 multiply the values at t=0 and t=1.  g0 and g1 multiply the derivatives.
+    template<class A>
+    inline void HermiteBasis(A t, A* h, A* g, A* dh, A* dg)
+    {
+        A t2 = t*t;
+        A t3 = t2*t;
+        h[0] = 2*t3 - 3*t2 + 1;
+        h[1] = -2*t3 + 3*t2;
+        g[0] = t3 - 2*t2 + t;
+        g[1] = t3 - t2;
+        dh[0] = 6*t2 - 6*t;
+        dh[1] = -6*t2 + 6*t;
+        dg[0] = 3*t2 - 4*t + 1;
+        dg[1] = 3*t2 - 2*t;
+    }
+
+    template<class V, class A>
+    V Table2D<V,A>::splineInterpolate(const A x, const A y, int i, int j) const
+    {
+        A dx = xargs[i] - xargs[i-1];
+        A dy = yargs[j] - yargs[j-1];
+        A hx[2], gx[2], dhx[2], dgx[2];
+        A hy[2], gy[2], dhy[2], dgy[2];
+        HermiteBasis((x - xargs[i-1]) / dx, hx, gx, dhx, dgx);
+        HermiteBasis((y - yargs[j-1]) / dy, hy, gy, dhy, dgy);
+
+        V result = V(0);
+        for (int a=0; a<2; ++a) {
+            for (int b=0; b<2; ++b) {
+                int k = (i-1+a)*Ny + j-1+b;
+                result += (hx[a]*hy[b]*vals[k] + dx*gx[a]*hy[b]*dfdx[k] +
+                           dy*hx[a]*gy[b]*dfdy[k] + dx*dy*gx[a]*gy[b]*d2fdxdy[k]);
+            }
+        }
+        return result;
+    }
+
+    template<class V, class A>
+    void Table2D<V,A>::splineGradient(const A x, const A y, int i, int j,
+                                      V& dfdxval, V& dfdyval) const
+    {
+        A dx = xargs[i] - xargs[i-1];
+        A dy = yargs[j] - yargs[j-1];
+        A hx[2], gx[2], dhx[2], dgx[2];
+        A hy[2], gy[2], dhy[2], dgy[2];
+        HermiteBasis((x - xargs[i-1]) / dx, hx, gx, dhx, dgx);
+        HermiteBasis((y - yargs[j-1]) / dy, hy, gy, dhy, dgy);
+
+        dfdxval = dfdyval = V(0);
+        for (int a=0; a<2; ++a) {
+            for (int b=0; b<2; ++b) {
+                int k = (i-1+a)*Ny + j-1+b;
+                dfdxval += (dhx[a]*hy[b]*vals[k] / dx + dgx[a]*hy[b]*dfdx[k] +
+                            dy/dx*dhx[a]*gy[b]*dfdy[k] + dy*dgx[a]*gy[b]*d2fdxdy[k]);
+                dfdyval += (hx[a]*dhy[b]*vals[k] / dy + dx/dy*gx[a]*dhy[b]*dfdx[k] +
+                            hx[a]*dgy[b]*dfdy[k] + dx*gx[a]*dgy[b]*d2fdxdy[k]);
+            }
+        }
+    }
+
     template class Table2D<double,double>;
+    template class Table2D<float,double>;
 }
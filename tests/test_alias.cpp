@@ -0,0 +1,129 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2017 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+#include "galsim/Std.h"
+#include "galsim/AliasTable.h"
+#define BOOST_TEST_DYN_LINK
+
+#include "galsim/IgnoreWarnings.h"
+
+#define BOOST_NO_CXX11_SMART_PTR
+#include <boost/test/unit_test.hpp>
+#include <boost/test/floating_point_comparison.hpp>
+
+// A minimal member type for the table.  The table only needs getFlux().
+class Weight
+{
+public:
+    Weight(int id, double flux) : _id(id), _flux(flux) {}
+    double getFlux() const { return _flux; }
+    int getId() const { return _id; }
+private:
+    int _id;
+    double _flux;
+};
+
+// Select members for M evenly spaced deviates in [0,1).  Since each bin of the alias table
+// is split at a fixed fraction, the counts are then exact up to 1 per bin boundary, so
+// we can compare the frequencies to the weights with a tight tolerance.
+// Also accumulate the sum of the new unitRandom values returned for each member.
+static void countSelections(const galsim::AliasTable<Weight>& table, int nmembers, int M,
+                            std::vector<int>& counts, std::vector<double>& usum)
+{
+    counts.assign(nmembers, 0);
+    usum.assign(nmembers, 0.);
+    for (int k=0; k<M; ++k) {
+        double u = (k + 0.5) / M;
+        const Weight* w = table.find(u);
+        BOOST_CHECK(u >= 0. && u < 1.);
+        counts[w->getId()] += 1;
+        usum[w->getId()] += u;
+    }
+}
+
+BOOST_AUTO_TEST_SUITE(alias_tests);
+
+BOOST_AUTO_TEST_CASE( TestAliasFrequencies )
+{
+    // Include a negative weight, which counts by its absolute value, and one that is much
+    // smaller than the others.
+    const int n = 6;
+    const double weights[n] = { 1., 2., 3., -4., 0.5, 1.e-3 };
+    double total = 0.;
+    galsim::AliasTable<Weight> table;
+    for (int i=0; i<n; ++i) {
+        table.push_back(Weight(i, weights[i]));
+        total += std::abs(weights[i]);
+    }
+    table.buildTable();
+    BOOST_CHECK_CLOSE(table.getTotalAbsFlux(), total, 1.e-10);
+
+    const int M = 1000000;
+    std::vector<int> counts;
+    std::vector<double> usum;
+    countSelections(table, n, M, counts, usum);
+    for (int i=0; i<n; ++i) {
+        double expected = std::abs(weights[i]) / total;
+        BOOST_CHECK_SMALL(double(counts[i])/M - expected, 2.*n/M);
+        // The new deviates should be uniform within each member, so average to 0.5.
+        BOOST_CHECK_SMALL(usum[i]/counts[i] - 0.5, 1.e-2);
+    }
+}
+
+BOOST_AUTO_TEST_CASE( TestAliasZeroWeight )
+{
+    // Members with zero weight must never be selected, whether they are kept in the table
+    // (threshold = 0) or dropped by the threshold.
+    const int n = 5;
+    const double weights[n] = { 0., 1., 0., 3., 0. };
+    for (int ithresh=0; ithresh<2; ++ithresh) {
+        galsim::AliasTable<Weight> table;
+        for (int i=0; i<n; ++i) table.push_back(Weight(i, weights[i]));
+        table.buildTable(ithresh == 0 ? 0. : 1.e-10);
+        BOOST_CHECK_CLOSE(table.getTotalAbsFlux(), 4., 1.e-10);
+
+        const int M = 100000;
+        std::vector<int> counts;
+        std::vector<double> usum;
+        countSelections(table, n, M, counts, usum);
+        BOOST_CHECK_EQUAL(counts[0], 0);
+        BOOST_CHECK_EQUAL(counts[2], 0);
+        BOOST_CHECK_EQUAL(counts[4], 0);
+        BOOST_CHECK_SMALL(double(counts[1])/M - 0.25, 2.*n/M);
+        BOOST_CHECK_SMALL(double(counts[3])/M - 0.75, 2.*n/M);
+    }
+}
+
+BOOST_AUTO_TEST_CASE( TestAliasSingle )
+{
+    // With a single member, every draw selects it and the deviate is passed through unchanged.
+    galsim::AliasTable<Weight> table;
+    table.push_back(Weight(0, 2.5));
+    table.buildTable();
+    BOOST_CHECK_CLOSE(table.getTotalAbsFlux(), 2.5, 1.e-10);
+    for (int k=0; k<100; ++k) {
+        double u0 = (k + 0.5) / 100.;
+        double u = u0;
+        const Weight* w = table.find(u);
+        BOOST_CHECK_EQUAL(w->getId(), 0);
+        BOOST_CHECK_CLOSE(u, u0, 1.e-10);
+    }
+}
+
+BOOST_AUTO_TEST_SUITE_END();
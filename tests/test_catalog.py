@@ -42,9 +42,23 @@ def test_basic_catalog():
     np.testing.assert_equal(cat.get(1,11), '15')
     np.testing.assert_equal(cat.getInt(1,11), 15)
     np.testing.assert_almost_equal(cat.getFloat(2,1), 8000)
+    assert cat.data.shape == (3, 12)
 
     do_pickle(cat)
 
+    # With typed=True, columns are parsed into the type that can hold all their values.
+    cat = galsim.Catalog(dir='config_input', file_name='catalog.txt', typed=True)
+    assert cat.data.shape == (3, 12)
+    np.testing.assert_equal(cat.get(1,11), 15)
+    np.testing.assert_equal(cat.getInt(1,11), 15)
+    np.testing.assert_equal(cat.get(2,1), 8000.)
+    np.testing.assert_equal(cat.get(0,5), 'yes')
+    np.testing.assert_equal(cat.get(2,7), '"kicked')
+    assert isinstance(cat.get(0,2), (int, np.integer))
+    assert isinstance(cat.get(0,0), float)
+    assert cat != galsim.Catalog(dir='config_input', file_name='catalog.txt')
+    do_pickle(cat)
+
     # Next the FITS version
     cat = galsim.Catalog(dir='config_input', file_name='catalog.fits')
     np.testing.assert_equal(cat.ncols, 12)
@@ -118,6 +132,105 @@ def test_single_row():
         err_msg="galsim.Catalog.__init__ failed to read 1-row file")
 
 
+@timer
+def test_ascii_cache():
+    """Test the binary cache file for ASCII catalogs."""
+    file_name = os.path.join('output', 'test_ascii_cache.dat')
+    cache_name = file_name + '.npz'
+    if os.path.isfile(cache_name):
+        os.remove(cache_name)
+    ntot = 1000
+    rng = galsim.UniformDeviate(1234)
+    with open(file_name, 'w') as f:
+        f.write('# id  x  name  flux  # A comment\n')
+        for i in range(ntot):
+            f.write('%d %.12f obj%d %r\n'%(i, rng(), i, rng()*1.e4))
+
+    cat = galsim.Catalog(file_name)
+    assert not os.path.isfile(cache_name)
+    cat1 = galsim.Catalog(file_name, cache=True)
+    assert os.path.isfile(cache_name)
+    # This one reads from the cache file.
+    cat2 = galsim.Catalog(file_name, cache=True)
+    assert cat == cat1 == cat2
+    np.testing.assert_equal(cat2.nobjects, ntot)
+    np.testing.assert_equal(cat2.ncols, 4)
+    for i in [0, 17, ntot-1]:
+        for c in [cat1, cat2]:
+            for col in range(4):
+                np.testing.assert_equal(c.get(i,col), cat.get(i,col))
+            np.testing.assert_equal(c.getInt(i,0), i)
+            np.testing.assert_equal(c.getFloat(i,3), cat.getFloat(i,3))
+            np.testing.assert_equal(c.get(i,2), 'obj%d'%i)
+            np.testing.assert_equal(c.get(i,0), str(i))
+    do_pickle(cat2)
+
+    # Typed columns can also come from the cache file.
+    cat5 = galsim.Catalog(file_name, cache=True, typed=True)
+    assert cat5.get(17,0) == 17
+    assert cat5.get(17,1) == float(cat.get(17,1))
+    assert cat5.get(17,2) == 'obj17'
+    assert cat5.get(17,3) == cat.getFloat(17,3)
+    # Now the converted columns are in the cache file too, so the next one doesn't redo them.
+    with np.load(cache_name) as cache:
+        assert 'typed0' in cache.files
+        np.testing.assert_equal(cache['typed0'].dtype, np.int64)
+    cat7 = galsim.Catalog(file_name, cache=True, typed=True)
+    assert cat7 == cat5
+    for col in range(4):
+        np.testing.assert_array_equal(cat7._columns[col], cat5._columns[col])
+    np.testing.assert_array_equal(cat7.data, cat.data)
+
+    # Parsing in small chunks gives the same array.
+    np.testing.assert_array_equal(galsim.catalog._parseAscii(file_name, '#', chunk_size=7),
+                                  cat.data)
+
+    # If the catalog changes, the cache is rebuilt.
+    with open(file_name, 'a') as f:
+        f.write('%d 0.5 extra 12.\n'%ntot)
+    cat3 = galsim.Catalog(file_name, cache=True)
+    np.testing.assert_equal(cat3.nobjects, ntot+1)
+    np.testing.assert_equal(cat3.get(ntot,2), 'extra')
+    cat4 = galsim.Catalog(file_name, cache=True)
+    np.testing.assert_equal(cat4.nobjects, ntot+1)
+
+    # typed can also be set in a config catalog.
+    config = { 'input' : { 'catalog' : { 'file_name' : file_name, 'typed' : True } } }
+    galsim.config.ProcessInput(config)
+    cat9 = config['input_objs']['catalog'][0]
+    assert cat9.get(17,0) == 17
+    assert cat9.get(17,2) == 'obj17'
+
+    # The cache is only used with the same comments string.
+    comment_file = os.path.join('output', 'test_ascii_cache_comments.dat')
+    with open(comment_file, 'w') as f:
+        f.write('1 2 3 ! 4 5 6\n')
+        f.write('7 8 9 ! 10 11 12\n')
+    for comments, ncols in [ ('#', 6), ('!', 3), ('#', 6) ]:
+        cat8 = galsim.Catalog(comment_file, comments=comments, cache=True)
+        np.testing.assert_equal(cat8.ncols, ncols)
+        np.testing.assert_equal(cat8.get(1,2), '9')
+
+    # Integers too large for an int64 stay exact as str rather than becoming floats.
+    big_file = os.path.join('output', 'test_ascii_bigint.dat')
+    with open(big_file, 'w') as f:
+        f.write('1 12345678901234567890123 1.5\n')
+        f.write('2 3 2\n')
+    cat6 = galsim.Catalog(big_file, typed=True)
+    assert cat6.get(0,0) == 1
+    assert cat6.get(0,1) == '12345678901234567890123'
+    assert cat6.get(1,1) == '3'
+    assert cat6.get(1,2) == 2.
+
+    # Rows with the wrong number of columns are an error.
+    with open(file_name, 'a') as f:
+        f.write('1 2 3\n')
+    try:
+        np.testing.assert_raises(IOError, galsim.Catalog, file_name)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_output_catalog():
     """Test basic operations on Catalog."""
@@ -206,8 +319,67 @@ def test_output_catalog():
     do_pickle(out_cat2)
 
 
+@timer
+def test_output_catalog_stream():
+    """Test writing an OutputCatalog in chunks with openFile."""
+    names = [ 'id', 'flux', 'name', 'flag', 'angle', 'pos', 'shear' ]
+    types = [ int, float, str, bool, galsim.Angle, galsim.PositionI, galsim.Shear ]
+    ntot = 1000
+    rng = galsim.UniformDeviate(1234)
+    rows = []
+    for i in range(ntot):
+        # Make the strings get longer at the end to check that the FITS column is wide enough.
+        rows.append( (i, rng()*100, 'obj' + 'x' * (i//100), rng() > 0.5, rng() * galsim.radians,
+                      galsim.PositionI(i, -i), galsim.Shear(g1=rng()*0.2, g2=-0.1)) )
+
+    ref_cat = galsim.OutputCatalog(names, types)
+    for row in rows:
+        ref_cat.addRow(row)
+    np.testing.assert_equal(ref_cat.nobjects, ntot)
+    np.testing.assert_equal(ref_cat.rows[17][0], 17)
+    np.testing.assert_equal(ref_cat.rows[17][5], galsim.PositionI(17,-17))
+
+    for ext in ['dat', 'fits']:
+        ref_name = os.path.join('output', 'ref_stream.' + ext)
+        file_name = os.path.join('output', 'test_stream.' + ext)
+        ref_cat.write(ref_name)
+
+        out_cat = galsim.OutputCatalog(names, types)
+        out_cat.openFile(file_name, chunk_size=64)
+        for i, row in enumerate(rows):
+            out_cat.addRow(row)
+            np.testing.assert_equal(out_cat.nobjects, i+1)
+            # Never more than one chunk in memory.
+            assert len(out_cat.rows) < 64
+        try:
+            np.testing.assert_raises(ValueError, out_cat.addRow, rows[0], sort_key=3)
+            np.testing.assert_raises(RuntimeError, out_cat.writeFitsHdu)
+            np.testing.assert_raises(RuntimeError, out_cat.openFile, file_name)
+        except ImportError:
+            print('The assert_raises tests require nose')
+        out_cat.close()
+
+        ref = galsim.Catalog(ref_name)
+        cat = galsim.Catalog(file_name)
+        np.testing.assert_equal(cat.nobjects, ntot)
+        np.testing.assert_equal(cat.ncols, ref.ncols)
+        cols = ref.names if ref.isFits() else range(ref.ncols)
+        for i in [0, 63, 64, 500, ntot-1]:
+            for col in cols:
+                np.testing.assert_equal(cat.get(i,col), ref.get(i,col))
+
+    # Sort keys work the same as before when not streaming.
+    out_cat = galsim.OutputCatalog(names, types)
+    for i in [3, 1, 2, 0]:
+        out_cat.addRow(rows[i], sort_key=i)
+    np.testing.assert_array_equal(out_cat.makeData()['id'], [0, 1, 2, 3])
+    do_pickle(out_cat)
+
+
 if __name__ == "__main__":
     test_basic_catalog()
     test_basic_dict()
     test_single_row()
+    test_ascii_cache()
     test_output_catalog()
+    test_output_catalog_stream()
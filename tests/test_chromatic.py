@@ -272,6 +272,85 @@ def test_ChromaticConvolution_InterpolatedImage():
         err_msg="ChromaticConvolution * 2 resulted in wrong flux.")
 
 
+@timer
+def test_effective_prof_disk_cache():
+    """Check that the effective profiles of ChromaticConvolution can be cached on disk."""
+    import glob
+    cache_dir = os.path.join('output', 'effective_prof_cache')
+    for f in glob.glob(os.path.join(cache_dir, 'effective_prof_*')):
+        os.remove(f)
+
+    star = galsim.Gaussian(fwhm=1.e-8) * bulge_SED
+    PSF = galsim.ChromaticAtmosphere(galsim.Gaussian(half_light_radius=PSF_hlr),
+                                     base_wavelength=500.0, zenith_angle=zenith_angle)
+    final = galsim.Convolve(star, PSF)
+    image = galsim.ImageD(32, 32, scale=0.2)
+
+    ref_image = final.drawImage(bandpass, image=image.copy())
+
+    galsim.ChromaticConvolution.cache_dir = cache_dir
+    try:
+        # Clear the in-memory cache, so we really go through _get_effective_prof.
+        galsim.ChromaticConvolution.resize_effective_prof_cache(0)
+        galsim.ChromaticConvolution.resize_effective_prof_cache(10)
+        im1 = final.drawImage(bandpass, image=image.copy())
+        files = glob.glob(os.path.join(cache_dir, 'effective_prof_*.fits'))
+        assert len(files) == 1, "Effective profile was not written to cache_dir"
+        np.testing.assert_array_almost_equal(im1.array, ref_image.array, 10)
+
+        # Now it should be read back from disk, as it would be in a new process.
+        galsim.ChromaticConvolution.resize_effective_prof_cache(0)
+        galsim.ChromaticConvolution.resize_effective_prof_cache(10)
+        im2 = final.drawImage(bandpass, image=image.copy())
+        np.testing.assert_array_equal(im2.array, im1.array)
+        assert len(glob.glob(os.path.join(cache_dir, 'effective_prof_*.fits'))) == 1
+
+        # A different bandpass gets a different file.  With a small size limit, only the most
+        # recent one is kept.
+        galsim.ChromaticConvolution.cache_max_bytes = os.path.getsize(files[0])
+        final.drawImage(bandpass.truncate(blue_limit=550), image=image.copy())
+        new_files = glob.glob(os.path.join(cache_dir, 'effective_prof_*.fits'))
+        assert len(new_files) == 1
+        assert new_files != files
+
+        # Profiles that can't be reproduced in another process are not stored on disk.
+        func_SED = galsim.SED(lambda w: w/500., wave_type='nm', flux_type='fphotons')
+        galsim.Convolve(galsim.Gaussian(fwhm=1.e-8) * func_SED, PSF).drawImage(
+                bandpass, image=image.copy())
+        assert glob.glob(os.path.join(cache_dir, 'effective_prof_*.fits')) == new_files
+
+        # The file name depends on every pixel of an image, not just the ones that numpy
+        # shows in its repr, which is cut short for large arrays.
+        im1 = galsim.ImageD(64, 64, scale=0.2, init_value=1.)
+        im2 = im1.copy()
+        im2.setValue(30, 30, 1. + 1.e-12)
+        integrator = galsim.integ.ContinuousIntegrator(galsim.integ.midptRule)
+        names = [ galsim.chromatic._effective_prof_file(
+                      galsim.ChromaticAtmosphere(galsim.InterpolatedImage(im),
+                                                 base_wavelength=500.0,
+                                                 zenith_angle=zenith_angle),
+                      bandpass, None, integrator, 1.0)
+                  for im in [im1, im1.copy(), im2] ]
+        assert names[0] is not None
+        assert names[0] == names[1]
+        assert names[0] != names[2]
+
+        # Objects can also opt out explicitly.
+        gal = galsim.Gaussian(fwhm=1.)
+        insep_obj = galsim.ChromaticAtmosphere(gal, base_wavelength=500.0,
+                                               zenith_angle=zenith_angle)
+        assert galsim.chromatic._effective_prof_file(
+                insep_obj, bandpass, None, integrator, 1.0) is not None
+        gal._reproducible = False
+        assert galsim.chromatic._effective_prof_file(
+                insep_obj, bandpass, None, integrator, 1.0) is None
+    finally:
+        galsim.ChromaticConvolution.cache_dir = None
+        galsim.ChromaticConvolution.cache_max_bytes = 1024**3
+        galsim.ChromaticConvolution.resize_effective_prof_cache(0)
+        galsim.ChromaticConvolution.resize_effective_prof_cache(10)
+
+
 @timer
 def test_chromatic_add():
     """Test the `+` operator on ChromaticObjects"""
@@ -1603,6 +1682,71 @@ def test_interpolated_ChromaticObject():
         assert not hasattr(trans_interp_psf, 'waves')
 
 
+@timer
+def test_interpolated_ChromaticObject_nproc_io():
+    """Test building an InterpolatedChromaticObject in parallel and writing it to a file."""
+    psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), base_wavelength=500.,
+                                     zenith_angle=zenith_angle)
+    waves = np.linspace(bandpass.blue_limit, bandpass.red_limit, 7)
+    interp1 = psf.interpolate(waves)
+    interp2 = psf.interpolate(waves, nproc=3)
+    assert interp2 == interp1
+    for im1, im2 in zip(interp1.ims, interp2.ims):
+        np.testing.assert_array_equal(im2.array, im1.array)
+    np.testing.assert_array_equal(interp2.stepk_vals, interp1.stepk_vals)
+    np.testing.assert_array_equal(interp2.maxk_vals, interp1.maxk_vals)
+    np.testing.assert_array_equal(interp2.fluxes, interp1.fluxes)
+
+    star = galsim.Gaussian(fwhm=1.e-8) * bulge_SED
+    im1 = galsim.Convolve(star, interp1).drawImage(bandpass, nx=32, ny=32, scale=0.2)
+
+    file_name = os.path.join('output', 'interpolated_chromatic.fits')
+    interp1.write(file_name)
+    interp3 = galsim.InterpolatedChromaticObject.read(file_name)
+    assert interp3 == galsim.InterpolatedChromaticObject.read(file_name)
+    assert interp3 != interp1
+    assert interp3.deinterpolated is interp3
+    assert interp3.separable == interp1.separable
+    assert interp3.SED == interp1.SED
+    np.testing.assert_array_equal(interp3.wave_list, interp1.wave_list)
+    np.testing.assert_array_equal(interp3.waves, interp1.waves)
+    for im1, im3 in zip(interp1.ims, interp3.ims):
+        np.testing.assert_array_equal(im3.array, im1.array)
+        assert im3.scale == im1.scale
+    im3 = galsim.Convolve(star, interp3).drawImage(bandpass, nx=32, ny=32, scale=0.2)
+    np.testing.assert_array_equal(im3.array, im1.array)
+    do_pickle(interp3)
+
+    interp4 = psf.interpolate(waves, oversample_fac=1.5, use_exact_SED=False, nproc=-1)
+    interp4.write(file_name)
+    interp5 = galsim.InterpolatedChromaticObject.read(file_name)
+    assert interp5.oversample == 1.5
+    assert not interp5.use_exact_SED
+    np.testing.assert_array_equal(interp5.fluxes, interp4.fluxes)
+
+    # A separable object with a tabulated SED stores the SED at its wave_list, so drawing
+    # the object read back in gives the same image.
+    gal = galsim.Gaussian(fwhm=0.5) * disk_SED
+    interp6 = gal.interpolate(waves)
+    interp6.write(file_name)
+    interp7 = galsim.InterpolatedChromaticObject.read(file_name)
+    assert interp7.separable
+    assert interp7.SED.spectral
+    np.testing.assert_array_equal(interp7.wave_list, interp6.wave_list)
+    np.testing.assert_allclose(interp7.SED(interp6.wave_list), interp6.SED(interp6.wave_list),
+                               rtol=1.e-10)
+    im6 = interp6.drawImage(bandpass, nx=32, ny=32, scale=0.2)
+    im7 = interp7.drawImage(bandpass, nx=32, ny=32, scale=0.2)
+    np.testing.assert_allclose(im7.array, im6.array, rtol=1.e-8, atol=1.e-12)
+    do_pickle(interp7)
+
+    # Chromatic transformations need the exact object, which a read object doesn't have.
+    try:
+        np.testing.assert_raises(TypeError, interp3.dilate, lambda w: (w/500.)**0.2)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_ChromaticOpticalPSF():
     """Test the ChromaticOpticalPSF functionality."""
@@ -1698,6 +1842,152 @@ def test_ChromaticOpticalPSF():
         im_r.array, im_r_ref.array, decimal=3,
         err_msg='Interpolated ChromaticOpticalPSF results disagree with reference in r band')
 
+
+@timer
+def test_ChromaticOpticalPSF_reuse():
+    """Test that ChromaticOpticalPSF reuses the aperture and wavefront across wavelengths."""
+    aberrations = np.zeros(12)
+    aberrations[4] = 0.3
+    aberrations[8] = -0.2
+    lam = 600.
+    diam = 2.4
+    obscuration = 0.18
+    nstruts = 4
+    psf = galsim.ChromaticOpticalPSF(lam=lam, diam=diam, aberrations=aberrations,
+                                     obscuration=obscuration, nstruts=nstruts)
+    waves = [500., 620., 780.]
+    objs = [psf.evaluateAtWavelength(w) for w in waves]
+    for w, obj in zip(waves, objs):
+        # Should match an OpticalPSF built from scratch at this wavelength.
+        ref = galsim.OpticalPSF(lam=w, diam=diam, aberrations=aberrations*(lam/w),
+                                obscuration=obscuration, nstruts=nstruts)
+        im = obj.drawImage(nx=32, ny=32, scale=0.02, method='no_pixel')
+        im_ref = ref.drawImage(nx=32, ny=32, scale=0.02, method='no_pixel')
+        np.testing.assert_array_almost_equal(
+                im.array, im_ref.array, decimal=10,
+                err_msg="ChromaticOpticalPSF disagrees with OpticalPSF at %s nm"%w)
+        # The aperture is shared.
+        assert obj._psf.aper is objs[0]._psf.aper
+
+    # The wavefront (in nm) is only computed once.
+    u, v = objs[0]._psf.aper._illuminated_uv()
+    wf0 = objs[0]._screens._wavefront(u, v, None, None)
+    wf1 = objs[1]._screens._wavefront(u, v, None, None)
+    assert wf0 is wf1
+
+    # But changing the coordinates in place gives a new wavefront.
+    u2 = np.array(u)
+    v2 = np.array(v)
+    wf2 = objs[1]._screens._wavefront(u2, v2, None, None)
+    np.testing.assert_array_equal(wf2, wf0)
+    u2 *= 0.5
+    wf3 = objs[1]._screens._wavefront(u2, v2, None, None)
+    screen = galsim.OpticalScreen(diam=diam, aberrations=aberrations, lam_0=lam)
+    np.testing.assert_array_almost_equal(wf3, screen.wavefront(u2, v2), decimal=10)
+    assert not np.allclose(wf3, wf0)
+
+    # The aperture uses the user's sampling parameters, not OpticalPSF's defaults.
+    psf2 = galsim.ChromaticOpticalPSF(lam=lam, diam=diam, aberrations=aberrations,
+                                      obscuration=obscuration, oversampling=2., pad_factor=0.8)
+    obj = psf2.evaluateAtWavelength(700.)
+    ref = galsim.OpticalPSF(lam=700., diam=diam, aberrations=aberrations*(lam/700.),
+                            obscuration=obscuration, oversampling=2., pad_factor=0.8)
+    assert obj._psf.aper.npix == ref._psf.aper.npix
+    assert obj._psf.aper.pupil_plane_scale == ref._psf.aper.pupil_plane_scale
+
+    # The cached aperture and wavefront are not pickled, but are remade as needed.
+    do_pickle(psf)
+    do_pickle(objs[1])
+
+
+@timer
+def test_chromatic_phot():
+    """Test drawing chromatic objects with photon shooting, with per-photon wavelengths."""
+    def moments(im):
+        y, x = np.mgrid[:im.array.shape[0], :im.array.shape[1]]
+        f = im.array.sum()
+        xc = (x*im.array).sum() / f
+        yc = (y*im.array).sum() / f
+        rsq = (((x-xc)**2 + (y-yc)**2) * im.array).sum() / f
+        return f, xc, yc, rsq
+
+    bulge = galsim.DeVaucouleurs(half_light_radius=0.3) * bulge_SED
+    disk = galsim.Exponential(half_light_radius=0.6).shear(e1=0.3, e2=0.1) * disk_SED
+    psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), 500.,
+                                     zenith_angle=50*galsim.degrees,
+                                     parallactic_angle=30*galsim.degrees)
+    airy = galsim.ChromaticAiry(lam=700., diam=4.)
+    for obj in [galsim.Convolve(bulge, psf),
+                galsim.Convolve(bulge + disk, psf, airy),
+                galsim.Convolve(disk, galsim.ChromaticOpticalPSF(lam=700., diam=4., defocus=0.5))]:
+        im_fft = obj.drawImage(bandpass, nx=48, ny=48, scale=0.1)
+        flux = obj.calculateFlux(bandpass)
+        im_phot = obj.drawImage(bandpass, nx=48, ny=48, scale=0.1, method='phot',
+                                n_photons=10**6, rng=galsim.BaseDeviate(1234))
+        f1, x1, y1, rsq1 = moments(im_fft)
+        f2, x2, y2, rsq2 = moments(im_phot)
+        print('fft moments = ', f1, x1, y1, rsq1)
+        print('phot moments = ', f2, x2, y2, rsq2)
+        # Some flux falls off the edge of the image, but the same amount for both.
+        np.testing.assert_allclose(f1, flux, rtol=2.e-2)
+        np.testing.assert_allclose(f2, f1, rtol=3.e-3)
+        np.testing.assert_allclose([x2, y2], [x1, y1], atol=0.03)
+        np.testing.assert_allclose(rsq2, rsq1, rtol=0.03)
+
+    # The monochromatic profiles are made once per image, not once per batch of photons.
+    optics = galsim.ChromaticOpticalPSF(lam=700., diam=4., defocus=0.5)
+    evaluate = optics.evaluateAtWavelength
+    n_eval = [0]
+    def counting_evaluate(w):
+        n_eval[0] += 1
+        return evaluate(w)
+    optics.evaluateAtWavelength = counting_evaluate
+    obj = galsim.Convolve(disk, optics)
+    obj.drawImage(bandpass, nx=48, ny=48, scale=0.1, method='phot', n_photons=10**4, maxN=1000,
+                  rng=galsim.BaseDeviate(1234))
+    print('n_eval = ', n_eval[0])
+    assert 1 < n_eval[0] <= optics._shoot_nwave
+
+    try:
+        np.testing.assert_raises(ValueError, obj.drawImage, bandpass, method='phot',
+                                 integrator='midpoint')
+        np.testing.assert_raises(ValueError, obj.drawImage, bandpass, method='phot', iimult=2)
+        np.testing.assert_raises(ValueError, bulge.drawImage, bandpass, method='phot',
+                                 integrator=galsim.integ.SampleIntegrator(galsim.integ.trapzRule))
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+    # The photons should have wavelengths drawn from the SED * bandpass.
+    class RecordWaves(object):
+        def applyTo(self, photon_array):
+            self.waves = photon_array.wavelength.copy()
+    rec = RecordWaves()
+    obj = galsim.Convolve(bulge, psf)
+    obj.drawImage(bandpass, nx=48, ny=48, scale=0.1, method='phot', n_photons=10**5,
+                  rng=galsim.BaseDeviate(5678), surface_ops=[rec])
+    assert len(rec.waves) == 10**5
+    assert np.min(rec.waves) >= bandpass.blue_limit
+    assert np.max(rec.waves) <= bandpass.red_limit
+    sed_bp = bulge_SED * bandpass
+    mean_wave = (galsim.integ.int1d(lambda w: w * sed_bp(w), bandpass.blue_limit,
+                                    bandpass.red_limit) /
+                 galsim.integ.int1d(sed_bp, bandpass.blue_limit, bandpass.red_limit))
+    np.testing.assert_allclose(np.mean(rec.waves), mean_wave, rtol=1.e-3)
+
+    # The refraction of each photon depends on its own wavelength.  Check that the centroid shift
+    # in the red half of the photons matches the DCR at their mean wavelength.
+    star = galsim.DeltaFunction() * bulge_SED
+    obj = galsim.Convolve(star, psf)
+    shooter = galsim.chromatic._ChromaticShooter(obj, bandpass, psf.evaluateAtWavelength(500.))
+    photons = shooter.shoot(10**5, galsim.BaseDeviate(9876))
+    red = photons.wavelength > 650.
+    shift = galsim.dcr.get_refraction(photons.wavelength[red], psf.zenith_angle)
+    shift -= psf.base_refraction
+    shift *= galsim.radians / galsim.arcsec
+    sinp, cosp = psf.parallactic_angle.sincos()
+    np.testing.assert_allclose(np.mean(photons.x[red]), -np.mean(shift)*sinp, atol=3.e-3)
+    np.testing.assert_allclose(np.mean(photons.y[red]), np.mean(shift)*cosp, atol=3.e-3)
+
     # Finally, check that flux normalization is preserved when we convolve with a chromatic object.
     gal = galsim.Exponential(half_light_radius = 2.*scale)
     gal = gal.shear(g2 = 0.3)
@@ -2195,6 +2485,7 @@ def test_ne():
 if __name__ == "__main__":
     test_draw_add_commutativity()
     test_ChromaticConvolution_InterpolatedImage()
+    test_effective_prof_disk_cache()
     test_chromatic_add()
     test_dcr_moments()
     test_chromatic_seeing_moments()
@@ -2214,7 +2505,10 @@ if __name__ == "__main__":
     test_separable_ChromaticSum()
     test_centroid()
     test_interpolated_ChromaticObject()
+    test_interpolated_ChromaticObject_nproc_io()
     test_ChromaticOpticalPSF()
+    test_ChromaticOpticalPSF_reuse()
+    test_chromatic_phot()
     test_ChromaticAiry()
     test_chromatic_fiducial_wavelength()
     test_chromatic_image_setup()
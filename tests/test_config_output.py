@@ -743,6 +743,8 @@ def test_extra_truth():
             }
         }
     }
+    stream_config = galsim.config.CopyConfig(config)
+    skip_config = galsim.config.CopyConfig(config)
 
     galsim.config.Process(config)
 
@@ -766,6 +768,29 @@ def test_extra_truth():
     np.testing.assert_almost_equal(cat.data['pos.x'], obj_num * 32 + 16.5)
     np.testing.assert_almost_equal(cat.data['pos.y'], 16.5)
 
+    # With chunk_size, a truth catalog in its own file is written as the stamps are built.
+    del stream_config['output']['truth']['hdu']
+    stream_config['output']['truth']['file_name'] = 'test_truth_stream.fits'
+    stream_config['output']['truth']['chunk_size'] = 4
+    stream_config['output']['dir'] = 'output'
+    with CaptureLog() as cl:
+        galsim.config.Process(stream_config, logger=cl.logger)
+    assert ("Writing truth catalog to output/test_truth_stream.fits in chunks of 4 rows"
+            in cl.output)
+    cat2 = galsim.Catalog('output/test_truth_stream.fits')
+    for name in ['object_id', 'flux', 'sigma', 'hlr', 'fwhm', 'pos.x', 'pos.y']:
+        np.testing.assert_almost_equal(cat2.data[name], cat.data[name])
+
+    # If the first stamps are skipped, the rows after them are still written.
+    del skip_config['output']['truth']['hdu']
+    skip_config['output']['truth']['file_name'] = 'output/test_truth_skip.fits'
+    skip_config['output']['truth']['chunk_size'] = 2
+    skip_config['stamp'] = { 'skip' : '$obj_num < 2' }
+    galsim.config.Process(skip_config)
+    cat3 = galsim.Catalog('output/test_truth_skip.fits')
+    for name in ['object_id', 'flux', 'sigma', 'hlr', 'fwhm', 'pos.x', 'pos.y']:
+        np.testing.assert_almost_equal(cat3.data[name], cat.data[name][2:])
+
 
 @timer
 def test_retry_io():
@@ -282,6 +282,8 @@ def test_meds_config():
         'output' : { 'type' : 'MEDS',
                      'nobjects' : nobj,
                      'nstamps_per_object' : n_per_obj,
+                     # Build the objects in several chunks.
+                     'chunk_size' : 2,
                      'file_name' : file_name
                    }
     }
@@ -409,6 +411,117 @@ def test_meds_config():
             numpy.testing.assert_almost_equal(info['position_offset'], 0.)
 
 
+@timer
+def test_meds_writer():
+    """Check that MEDSWriter writes the objects one at a time into a valid MEDS file.
+    """
+    rng = galsim.BaseDeviate(1234)
+    ud = galsim.UniformDeviate(rng)
+    objlist = []
+    for k in range(5):
+        n_cutout = k%3 + 1
+        box_size = [32,48][k%2]
+        images = []
+        weight = []
+        psf = []
+        wcs = []
+        for i in range(n_cutout):
+            im = galsim.ImageF(box_size, box_size)
+            im.addNoise(galsim.GaussianNoise(rng))
+            images.append(im)
+            weight.append(galsim.ImageF(box_size, box_size, init_value=ud()))
+            psf.append(galsim.ImageF(box_size, box_size, init_value=ud()))
+            wcs.append(galsim.AffineTransform(ud(), ud(), ud(), ud(),
+                                              galsim.PositionD(ud(), ud())))
+        objlist.append(galsim.des.MultiExposureObject(images=images, weight=weight, psf=psf,
+                                                      wcs=wcs, id=k+10))
+
+    for file_name in ['output/test_meds_writer.fits', 'output/test_meds_writer.fits.gz',
+                      'output/test_meds_writer.fits.bz2']:
+        writer = galsim.des.MEDSWriter(file_name)
+        for obj in objlist:
+            writer.addObject(obj)
+        writer.close()
+
+        # The temporary files should be gone.
+        tmp_files = [ f for f in os.listdir('output')
+                      if f.startswith(os.path.basename(file_name) + '.') ]
+        numpy.testing.assert_equal(tmp_files, [])
+
+        with pyfits.open(file_name) as hdu_list:
+            object_data = hdu_list['object_data'].data
+            numpy.testing.assert_array_equal(object_data['id'], [k+10 for k in range(5)])
+            numpy.testing.assert_array_equal(object_data['ncutout'], [k%3+1 for k in range(5)])
+            image_vec = hdu_list['image_cutouts'].data
+            weight_vec = hdu_list['weight_cutouts'].data
+            psf_vec = hdu_list['psf'].data
+            numpy.testing.assert_equal(image_vec.dtype.kind, 'f')
+            for k, obj in enumerate(objlist):
+                for i in range(obj.n_cutouts):
+                    n = obj.box_size**2
+                    start = object_data['start_row'][k][i]
+                    numpy.testing.assert_array_equal(image_vec[start:start+n],
+                                                  obj.images[i].array.ravel())
+                    numpy.testing.assert_array_equal(weight_vec[start:start+n],
+                                                  obj.weight[i].array.ravel())
+                    start = object_data['psf_start_row'][k][i]
+                    numpy.testing.assert_array_equal(psf_vec[start:start+n],
+                                                  obj.psf[i].array.ravel())
+                    numpy.testing.assert_almost_equal(object_data['dudcol'][k][i], obj.wcs[i].dudx)
+                    numpy.testing.assert_almost_equal(object_data['cutout_row'][k][i],
+                                                   obj.wcs[i].origin.y)
+                for i in range(obj.n_cutouts, galsim.des.des_meds.MAX_NCUTOUTS):
+                    numpy.testing.assert_equal(object_data['start_row'][k][i],
+                                            galsim.des.des_meds.EMPTY_START_INDEX)
+
+    # WriteMEDS uses a MEDSWriter, so it should write the same data.
+    galsim.des.WriteMEDS(objlist, 'output/test_meds_writer2.fits')
+    with pyfits.open('output/test_meds_writer.fits') as hdu_list1:
+        with pyfits.open('output/test_meds_writer2.fits') as hdu_list2:
+            for name in ['image_cutouts', 'weight_cutouts', 'seg_cutouts', 'psf']:
+                numpy.testing.assert_array_equal(hdu_list1[name].data, hdu_list2[name].data)
+            numpy.testing.assert_array_equal(hdu_list1['object_data'].data['start_row'],
+                                          hdu_list2['object_data'].data['start_row'])
+
+    # If something goes wrong, the temporary files are removed.
+    def tmp_files(file_name):
+        return [ f for f in os.listdir('output')
+                 if f.startswith(os.path.basename(file_name) + '.') ]
+    writer = galsim.des.MEDSWriter('output/test_meds_abort.fits')
+    writer.addObject(objlist[0])
+    assert len(tmp_files('output/test_meds_abort.fits')) > 0
+    writer.abort()
+    numpy.testing.assert_equal(tmp_files('output/test_meds_abort.fits'), [])
+    try:
+        numpy.testing.assert_raises(AttributeError, galsim.des.WriteMEDS,
+                                    [objlist[0], None], 'output/test_meds_abort.fits')
+    except ImportError:
+        print('The assert_raises tests require nose')
+    numpy.testing.assert_equal(tmp_files('output/test_meds_abort.fits'), [])
+
+    # Unsigned images are stored with BZERO, as pyfits does, so they read back unchanged.
+    # Later images with a wider type promote the whole vector, rather than being truncated.
+    us_images = [ galsim.ImageUS(32, 32, init_value=60000+i) for i in range(2) ]
+    us_obj = galsim.des.MultiExposureObject(images=us_images, id=1)
+    f_obj = galsim.des.MultiExposureObject(images=[ galsim.ImageF(32, 32, init_value=0.5) ], id=2)
+    for objs, dtype in [ ([us_obj], numpy.uint16), ([us_obj, f_obj], numpy.float32) ]:
+        galsim.des.WriteMEDS(objs, 'output/test_meds_writer3.fits')
+        with pyfits.open('output/test_meds_writer3.fits') as hdu_list:
+            image_vec = hdu_list['image_cutouts'].data
+            numpy.testing.assert_equal(image_vec.dtype.type, dtype)
+            if dtype == numpy.uint16:
+                numpy.testing.assert_equal(hdu_list['image_cutouts'].header['BZERO'], 32768)
+            numpy.testing.assert_array_equal(image_vec[:1024], 60000)
+            numpy.testing.assert_array_equal(image_vec[1024:2048], 60001)
+            numpy.testing.assert_array_equal(image_vec[2048:], 0.5)
+
+    try:
+        numpy.testing.assert_raises(IOError, galsim.des.MEDSWriter,
+                                 'output/test_meds_writer.fits', clobber=False)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_nan_fits():
     """Test reading in a FITS file that has NAN.0 entries in the header.
@@ -662,6 +775,7 @@ def test_psf_config():
 if __name__ == "__main__":
     test_meds()
     test_meds_config()
+    test_meds_writer()
     test_nan_fits()
     test_psf()
     test_psf_config()
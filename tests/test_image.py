@@ -2987,6 +2987,143 @@ def test_FITS_bad_type():
     # Don't forget to set it back to the original.
     setattr(galsim.Image,'valid_dtypes',orig_dtypes)
 
+@timer
+def test_FITS_gzip_threads():
+    """Test the in-process, multi-threaded gzip compression used for writing .fits.gz files.
+    """
+    import gzip
+    orig_settings = (galsim.fits.gzip_nthreads, galsim.fits.gzip_block_size,
+                     galsim.fits.background_gzip)
+    orig_write = galsim.fits._write_gzip_data
+    ud = galsim.UniformDeviate(1234)
+    ref_image = galsim.ImageD(200, 150, scale=0.3)
+    ref_image.addNoise(galsim.GaussianNoise(ud, sigma=10.))
+    ref_list = [ref_image, ref_image * 2., ref_image * 3.]
+    test_file = os.path.join(datadir, "test_threads_internal.fits.gz")
+    try:
+        # Use small blocks so there are many gzip members.
+        galsim.fits.gzip_block_size = 10000
+        for nthreads in [1, 4, None]:
+            galsim.fits.gzip_nthreads = nthreads
+            ref_image.write(test_file)
+            test_image = galsim.fits.read(test_file)
+            np.testing.assert_array_equal(test_image.array, ref_image.array,
+                    err_msg="Image read failed for threaded gzip with nthreads=%s"%nthreads)
+
+            # Python's gzip and pyfits can also read the file.
+            with gzip.open(test_file, 'rb') as fin:
+                with pyfits.open(fin) as fits:
+                    np.testing.assert_array_equal(fits[0].data, ref_image.array)
+
+            galsim.fits.writeMulti(ref_list, test_file)
+            test_list = galsim.fits.readMulti(test_file)
+            for im1, im2 in zip(ref_list, test_list):
+                np.testing.assert_array_equal(im2.array, im1.array)
+
+        # Write in the background.  Changing the image afterwards shouldn't affect what is written.
+        galsim.fits.background_gzip = True
+        image = ref_image.copy()
+        image.write(test_file)
+        image.fill(0.)
+        galsim.fits.waitForWrites()
+        test_image = galsim.fits.read(test_file)
+        np.testing.assert_array_equal(test_image.array, ref_image.array,
+                err_msg="Image read failed for background gzip")
+
+        # Reading right away needs to wait for the write to finish.
+        galsim.fits.writeCube(ref_list, test_file)
+        test_list = galsim.fits.readCube(test_file)
+        for im1, im2 in zip(ref_list, test_list):
+            np.testing.assert_array_equal(im2.array, im1.array)
+
+        # If the threaded compression fails in the background, the file is still written, and
+        # later writes move on to the next method.
+        def fail(data, file):
+            raise IOError("Simulated failure")
+        galsim.fits._write_gzip_data = fail
+        image = ref_image.copy()
+        image.write(test_file)
+        image.fill(0.)
+        galsim.fits.waitForWrites()
+        test_image = galsim.fits.read(test_file)
+        np.testing.assert_array_equal(test_image.array, ref_image.array,
+                err_msg="Image read failed after background gzip fallback")
+        assert galsim.fits._write_file.gz != galsim.fits._write_file.gzip_threads
+        ref_image.write(test_file)
+        test_image = galsim.fits.read(test_file)
+        np.testing.assert_array_equal(test_image.array, ref_image.array)
+    finally:
+        galsim.fits.waitForWrites()
+        (galsim.fits.gzip_nthreads, galsim.fits.gzip_block_size,
+         galsim.fits.background_gzip) = orig_settings
+        galsim.fits._write_gzip_data = orig_write
+        galsim.fits._write_file.gz_index = 0
+        galsim.fits._write_file.gz = galsim.fits._write_file.gzip_threads
+
+
+@timer
+def test_FITS_read_bounds():
+    """Test reading only part of an image from a FITS file.
+    """
+    ud = galsim.UniformDeviate(1234)
+    wcs = galsim.AffineTransform(0.26, 0.02, -0.03, 0.25, origin=galsim.PositionD(100,130))
+    ref_image = galsim.ImageF(300, 250, wcs=wcs, xmin=-20, ymin=5)
+    ref_image.addNoise(galsim.GaussianNoise(ud, sigma=10.))
+    bounds = galsim.BoundsI(10, 42, 100, 140)
+
+    for ext in ['.fits', '.fits.fz', '.fits.gz']:
+        test_file = os.path.join(datadir, "test_bounds_internal" + ext)
+        ref_image.write(test_file)
+        test_image = galsim.fits.read(test_file, bounds=bounds)
+        assert test_image.bounds == bounds
+        assert test_image.wcs == ref_image.wcs
+        np.testing.assert_array_equal(test_image.array, ref_image[bounds].array,
+                                      err_msg="Reading with bounds failed for %s"%ext)
+
+    # Can also read several stamps from an already open file.
+    test_file = os.path.join(datadir, "test_bounds_internal.fits")
+    with pyfits.open(test_file) as hdu_list:
+        for b in [bounds, ref_image.bounds, galsim.BoundsI(-20, -20, 5, 5)]:
+            test_image = galsim.fits.read(hdu_list=hdu_list, bounds=b)
+            assert test_image.bounds == b
+            np.testing.assert_array_equal(test_image.array, ref_image[b].array)
+
+    # Also works with BZERO/BSCALE scaled data.
+    ref_imageU = galsim.ImageUS((np.abs(ref_image.array) * 100).astype(np.uint16), xmin=-20, ymin=5)
+    ref_imageU.write(test_file)
+    test_image = galsim.fits.read(test_file, bounds=bounds)
+    np.testing.assert_array_equal(test_image.array, ref_imageU[bounds].array)
+    assert test_image.dtype == galsim.fits.read(test_file).dtype
+
+    # readMulti and readCube can read the same part of each image.
+    ref_list = [ref_image, ref_image * 2., ref_image * 3.]
+    for ext in ['.fits', '.fits.fz']:
+        test_file = os.path.join(datadir, "test_bounds_multi_internal" + ext)
+        galsim.fits.writeMulti(ref_list, test_file)
+        test_list = galsim.fits.readMulti(test_file, bounds=bounds)
+        assert len(test_list) == len(ref_list)
+        for im1, im2 in zip(ref_list, test_list):
+            assert im2.bounds == bounds
+            np.testing.assert_array_equal(im2.array, im1[bounds].array)
+    test_file = os.path.join(datadir, "test_bounds_cube_internal.fits")
+    galsim.fits.writeCube(ref_list, test_file)
+    test_list = galsim.fits.readCube(test_file, bounds=bounds)
+    assert len(test_list) == len(ref_list)
+    for im1, im2 in zip(ref_list, test_list):
+        assert im2.bounds == bounds
+        assert im2.wcs == ref_image.wcs
+        np.testing.assert_array_equal(im2.array, im1[bounds].array)
+    test_file = os.path.join(datadir, "test_bounds_internal.fits")
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.fits.read, test_file,
+                                 bounds=galsim.BoundsI(-30, 10, 10, 20))
+        np.testing.assert_raises(TypeError, galsim.fits.read, test_file,
+                                 bounds=galsim.BoundsD(10, 20, 10, 20))
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_bin():
     """Test the bin and subsample methods"""
@@ -3142,4 +3279,6 @@ if __name__ == "__main__":
     test_int_image_arith()
     test_wrap()
     test_FITS_bad_type()
+    test_FITS_gzip_threads()
+    test_FITS_read_bounds()
     test_bin()
@@ -246,6 +246,115 @@ def test_trapz_basic():
         err_msg='Test of trapzRule() with points failed for f(x)=x^2 from 0 to 1')
 
 
+@timer
+def test_rule_weights():
+    """Test that midptWeights and trapzWeights match midptRule and trapzRule.
+    """
+    x = np.sort(np.random.RandomState(1234).uniform(0, 10, size=37))
+    func = lambda x: np.sin(x) + x**2
+    np.testing.assert_almost_equal(
+        np.dot(galsim.integ.midptWeights(x), func(x)), galsim.integ.midptRule(func, x),
+        decimal=10, err_msg='midptWeights disagrees with midptRule')
+    np.testing.assert_almost_equal(
+        np.dot(galsim.integ.trapzWeights(x), func(x)), galsim.integ.trapzRule(func, x),
+        decimal=10, err_msg='trapzWeights disagrees with trapzRule')
+    try:
+        np.testing.assert_raises(ValueError, galsim.integ.midptWeights, [1.])
+        np.testing.assert_raises(ValueError, galsim.integ.trapzWeights, [1.])
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
+@timer
+def test_image_integrator_accumulate():
+    """Test that the accumulating ImageIntegrator matches letting the rule combine the images.
+    """
+    bandpass = galsim.Bandpass(lambda w: 1.0 - ((w-550.)/100.)**2, 'nm',
+                               blue_limit=450, red_limit=650)
+    gal = galsim.Gaussian(sigma=0.5) * galsim.SED(lambda w: (w/500.)**-1, 'nm', 'fphotons')
+    psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.6), 500.,
+                                     zenith_angle=30*galsim.degrees)
+    obj = galsim.Convolve(gal, psf)
+
+    for rule in [galsim.integ.midptRule, galsim.integ.trapzRule]:
+        # Wrapping the rule in a lambda hides it from the accumulating code path.
+        integ1 = galsim.integ.ContinuousIntegrator(rule, N=20)
+        integ2 = galsim.integ.ContinuousIntegrator(lambda f, xs: rule(f, xs), N=20)
+        im1 = galsim.ChromaticObject.drawImage(obj, bandpass, nx=32, ny=32, scale=0.2,
+                                               integrator=integ1)
+        im2 = galsim.ChromaticObject.drawImage(obj, bandpass, nx=32, ny=32, scale=0.2,
+                                               integrator=integ2)
+        np.testing.assert_array_almost_equal(
+            im1.array, im2.array, decimal=12,
+            err_msg='Accumulating integrator disagrees with rule for %s'%rule.__name__)
+        assert integ1.last_n_eval == 21
+
+        kim1 = galsim.ChromaticObject.drawKImage(obj, bandpass, nx=16, ny=16, scale=0.5,
+                                                 integrator=integ1)
+        kim2 = galsim.ChromaticObject.drawKImage(obj, bandpass, nx=16, ny=16, scale=0.5,
+                                                 integrator=integ2)
+        np.testing.assert_array_almost_equal(
+            kim1.array, kim2.array, decimal=12,
+            err_msg='Accumulating integrator disagrees with rule for drawKImage')
+
+
+@timer
+def test_adaptive_integrator():
+    """Test that AdaptiveIntegrator matches a dense ContinuousIntegrator with fewer draws.
+    """
+    bandpass = galsim.Bandpass(lambda w: 1.0 - ((w-550.)/100.)**2, 'nm',
+                               blue_limit=450, red_limit=650)
+    gal = galsim.Exponential(half_light_radius=0.4) * galsim.SED(lambda w: (w/500.)**-1.5,
+                                                                  'nm', 'fphotons')
+    psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.6), 500.,
+                                     zenith_angle=40*galsim.degrees)
+    obj = galsim.Convolve(gal, psf)
+
+    dense = galsim.integ.ContinuousIntegrator(galsim.integ.trapzRule, N=250)
+    adaptive = galsim.integ.AdaptiveIntegrator(rel_tol=1.e-4)
+    im1 = galsim.ChromaticObject.drawImage(obj, bandpass, nx=32, ny=32, scale=0.2,
+                                           integrator=dense)
+    im2 = galsim.ChromaticObject.drawImage(obj, bandpass, nx=32, ny=32, scale=0.2,
+                                           integrator=adaptive)
+    print('adaptive n_eval = ', adaptive.last_n_eval, adaptive.last_n_proxy)
+    np.testing.assert_allclose(im2.array, im1.array, atol=1.e-4*im1.array.max(),
+                               err_msg='AdaptiveIntegrator disagrees with ContinuousIntegrator')
+    assert adaptive.last_n_eval <= 50
+    assert obj._last_n_eval == adaptive.last_n_eval
+
+    # Reaching max_n_eval stops the refinement.
+    adaptive = galsim.integ.AdaptiveIntegrator(rel_tol=1.e-12, max_n_eval=20)
+    galsim.ChromaticObject.drawImage(obj, bandpass, nx=32, ny=32, scale=0.2,
+                                     integrator=adaptive)
+    assert adaptive.last_n_eval == 20
+
+    # The profiles are made once for each proxy evaluation and again for each drawn image, rather
+    # than all being kept until the end.
+    waves = []
+    def evaluate(w):
+        waves.append(w)
+        return obj.evaluateAtWavelength(w)
+    image = galsim.ImageD(32, 32, scale=0.2)
+    adaptive = galsim.integ.AdaptiveIntegrator(rel_tol=1.e-4)
+    im3 = adaptive(evaluate, bandpass, image, {})
+    assert len(waves) == adaptive.last_n_proxy + adaptive.last_n_eval
+    np.testing.assert_allclose(im3.array.sum(), im2.array.sum(), rtol=1.e-3)
+
+    # Also works for drawKImage
+    kim1 = galsim.ChromaticObject.drawKImage(obj, bandpass, nx=16, ny=16, scale=0.5,
+                                             integrator=dense)
+    kim2 = galsim.ChromaticObject.drawKImage(obj, bandpass, nx=16, ny=16, scale=0.5,
+                                             integrator=galsim.integ.AdaptiveIntegrator())
+    np.testing.assert_allclose(kim2.array, kim1.array, atol=1.e-4*np.abs(kim1.array).max())
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.integ.AdaptiveIntegrator, N_init=1)
+        np.testing.assert_raises(ValueError, galsim.integ.AdaptiveIntegrator, N_init=10,
+                                 max_n_eval=5)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 if __name__ == "__main__":
     test_gaussian_finite_limits()
     test_gaussian_infinite_limits()
@@ -255,3 +364,6 @@ if __name__ == "__main__":
     test_invroot_infinite_limits()
     test_midpoint_basic()
     test_trapz_basic()
+    test_rule_weights()
+    test_image_integrator_accumulate()
+    test_adaptive_integrator()
@@ -53,6 +53,55 @@ def test_aperture():
     assert aper1 == aper2, err_str
 
 
+@timer
+def test_aperture_cache():
+    """Test that Apertures with the same geometry share cached arrays."""
+    aper1 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=3, strut_angle=10*galsim.degrees)
+    aper2 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=3, strut_angle=10*galsim.degrees)
+    assert aper1 == aper2
+    assert aper1.illuminated is aper2.illuminated
+    assert aper1.u is aper2.u
+    assert aper1.rho is aper2.rho
+    assert not aper1.illuminated.flags.writeable
+    aper3 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=3, strut_angle=20*galsim.degrees)
+    assert aper1 != aper3
+
+    # Apertures from the same pupil image share arrays too, whether the image is given as an image
+    # or a file name.
+    im = galsim.fits.read(os.path.join(imgdir, pp_file))
+    aper1 = galsim.Aperture(diam=1.0, pupil_plane_im=im, pupil_angle=5*galsim.degrees)
+    aper2 = galsim.Aperture(diam=1.0, pupil_plane_im=im.copy(), pupil_angle=5*galsim.degrees)
+    assert aper1.illuminated is aper2.illuminated
+    aper3 = galsim.Aperture(diam=1.0, pupil_plane_im=os.path.join(imgdir, pp_file),
+                            pupil_angle=5*galsim.degrees)
+    aper4 = galsim.Aperture(diam=1.0, pupil_plane_im=os.path.join(imgdir, pp_file),
+                            pupil_angle=5*galsim.degrees)
+    assert aper1 == aper3
+    assert aper3.illuminated is aper4.illuminated
+
+    # Check the on-disk cache.
+    import shutil
+    cache_dir = os.path.join('output', 'aperture_cache')
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.makedirs(cache_dir)
+    save_cache = galsim.phase_psf._pupil_plane_cache
+    try:
+        galsim.Aperture.cache_dir = cache_dir
+        aper1 = galsim.Aperture(diam=1.3, obscuration=0.2, nstruts=4)
+        assert len(os.listdir(cache_dir)) == 1
+        # Empty the in-memory cache, so the arrays have to come from disk.
+        galsim.phase_psf._pupil_plane_cache = galsim.utilities.LRU_Cache(
+                save_cache.user_function)
+        aper2 = galsim.Aperture(diam=1.3, obscuration=0.2, nstruts=4)
+        assert aper1 == aper2
+        assert aper1.illuminated is not aper2.illuminated
+        assert len(os.listdir(cache_dir)) == 1
+    finally:
+        galsim.Aperture.cache_dir = None
+        galsim.phase_psf._pupil_plane_cache = save_cache
+
+
 @timer
 def test_atm_screen_size():
     """Test for consistent AtmosphericScreen size and scale."""
@@ -103,6 +152,106 @@ def test_structure_function():
                                    err_msg="Simulated structure function not close to prediction.")
 
 
+@timer
+def test_shared_screen():
+    """Test that screens in shared memory match ordinary screens and are not copied by pickling."""
+    import multiprocessing
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    aper = galsim.Aperture(diam=1.0)
+    kwargs = dict(screen_size=10.0, altitude=5.0, vx=2.0)
+    screen1 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), **kwargs)
+    screen2 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), mp_context=multiprocessing,
+                                       **kwargs)
+    assert screen1 == screen2
+    np.testing.assert_array_equal(screen1.wavefront(aper.u, aper.v, 0.3),
+                                  screen2.wavefront(aper.u, aper.v, 0.3))
+
+    # The lookup table references the screen rather than a padded copy of it.
+    shared = screen2._sharedScreen()
+    assert np.may_share_memory(screen2._tab2d.f, shared)
+    screen3 = pickle.loads(pickle.dumps(screen2))
+    assert np.may_share_memory(screen3._tab2d.f, shared)
+    np.testing.assert_array_equal(screen3.wavefront(aper.u, aper.v, 0.3),
+                                  screen2.wavefront(aper.u, aper.v, 0.3))
+    do_pickle(screen2)
+    do_pickle(screen2, func=lambda x: x._wavefront(aper.u, aper.v, None, theta0).sum())
+
+    # Each screen gets its own entry in the shared memory dict, which is removed when the screen
+    # is deleted.  Copies made by pickling keep working, since they reference the memory directly.
+    screen4 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), mp_context=multiprocessing,
+                                       **kwargs)
+    assert screen4._shared_key != screen2._shared_key
+    key = screen2._shared_key
+    assert key in galsim.phase_screens._GSScreenShare
+    wf = screen2.wavefront(aper.u, aper.v, 0.3)
+    del screen2, shared
+    import gc
+    gc.collect()
+    assert key not in galsim.phase_screens._GSScreenShare
+    np.testing.assert_array_equal(screen3.wavefront(aper.u, aper.v, 0.3), wf)
+
+    # Shared float32 screens.
+    screen5 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), mp_context=multiprocessing,
+                                       dtype=np.float32, **kwargs)
+    assert screen5._sharedScreen().dtype == np.float32
+    assert np.may_share_memory(screen5._tab2d.f, screen5._sharedScreen())
+    np.testing.assert_allclose(screen5.wavefront(aper.u, aper.v, 0.3), wf,
+                               rtol=0, atol=1.e-5*np.max(np.abs(wf)))
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.AtmosphericScreen, alpha=0.99, time_step=0.01,
+                                 mp_context=multiprocessing, **kwargs)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
+@timer
+def test_screen_dtype_tiled():
+    """Test float32 screens and screens generated with a tiled FFT."""
+    aper = galsim.Aperture(diam=1.0)
+    for kwargs in [dict(screen_size=10.0, altitude=5.0, vx=2.0),
+                   dict(screen_size=10.0, altitude=5.0, vx=2.0, alpha=0.99, time_step=0.03)]:
+        screen1 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), **kwargs)
+        screen2 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), dtype=np.float32,
+                                           **kwargs)
+        screen3 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), fft_tile=7, **kwargs)
+        screen4 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), fft_tile=7,
+                                           dtype=np.float32, **kwargs)
+        assert screen1 != screen2
+        assert screen1 != screen3
+        assert screen2._tab2d.f.dtype == np.float32
+        assert screen3._tab2d.f.dtype == np.float64
+        for t in [0.0, 0.1]:
+            wf1 = screen1.wavefront(aper.u, aper.v, t)
+            atol = 1.e-5*np.max(np.abs(wf1))
+            np.testing.assert_allclose(screen2.wavefront(aper.u, aper.v, t), wf1,
+                                       rtol=0, atol=atol)
+            np.testing.assert_allclose(screen3.wavefront(aper.u, aper.v, t), wf1,
+                                       rtol=0, atol=1.e-10*np.max(np.abs(wf1)))
+            np.testing.assert_allclose(screen4.wavefront(aper.u, aper.v, t), wf1,
+                                       rtol=0, atol=atol)
+        do_pickle(screen2)
+        do_pickle(screen3)
+        do_pickle(screen4, func=lambda x: x._wavefront(aper.u, aper.v, None, theta0).sum())
+
+    # Precomputed boiling screens use the same dtype.
+    screen5 = galsim.AtmosphericScreen(rng=galsim.BaseDeviate(2468), dtype=np.float32,
+                                       **kwargs)
+    screen5.precompute(0.1)
+    assert screen5._timeline.dtype == np.float32
+    np.testing.assert_array_equal(screen5.wavefront(aper.u, aper.v, 0.1),
+                                  screen2.wavefront(aper.u, aper.v, 0.1))
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.AtmosphericScreen, dtype=np.int32, **kwargs)
+        np.testing.assert_raises(ValueError, galsim.AtmosphericScreen, fft_tile=0, **kwargs)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_phase_screen_list():
     """Test list-like behaviors of PhaseScreenList."""
@@ -319,6 +468,84 @@ def test_phase_psf_reset():
     np.testing.assert_array_equal(wf1, wf3, "Phase screen didn't reset")
 
 
+@timer
+def test_precompute():
+    """Test that precomputed boiling screens match those generated step by step."""
+    import os
+    aper = galsim.Aperture(diam=1.0, lam=500.0)
+    times = [0.0, 0.035, 0.1, 0.02, 0.08, 0.0, 0.15, 0.01]
+
+    def make_screen():
+        return galsim.AtmosphericScreen(screen_size=10.0, altitude=10.0, vx=1.0, alpha=0.99,
+                                        time_step=0.01, rng=galsim.BaseDeviate(4321))
+
+    screen = make_screen()
+    ref = []
+    for t in times:
+        screen._seek(t)
+        ref.append(screen._wavefront(aper.u, aper.v, None, theta0))
+
+    file_name = os.path.join('output', 'test_precompute.dat')
+    for kwargs in [dict(), dict(buffer_size=4), dict(file_name=file_name)]:
+        screen = make_screen()
+        screen.precompute(0.1, **kwargs)
+        for t, wf in zip(times, ref):
+            screen._seek(t)
+            np.testing.assert_array_equal(
+                screen._wavefront(aper.u, aper.v, None, theta0), wf,
+                "Precomputed screen differs from screen generated step by step with %s"%kwargs)
+        screen._reset()
+        np.testing.assert_array_equal(screen._wavefront(aper.u, aper.v, None, theta0), ref[0])
+
+    # Frozen screens don't need to precompute anything.
+    screen = galsim.AtmosphericScreen(screen_size=10.0, altitude=10.0, vx=1.0)
+    screen.precompute(1.0)
+    assert screen._timeline is None
+
+    try:
+        screen = make_screen()
+        np.testing.assert_raises(ValueError, screen.precompute, -1.0)
+        np.testing.assert_raises(ValueError, screen.precompute, 1.0, buffer_size=0)
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
+@timer
+def test_boiling_time_sorting():
+    """Test that wavefronts and gradients of boiling screens at many random times match those
+    evaluated one time at a time.
+    """
+    rng = galsim.BaseDeviate(8765)
+    screen = galsim.AtmosphericScreen(screen_size=10.0, altitude=5.0, vx=3.0, vy=-1.0, alpha=0.98,
+                                      time_step=0.02, rng=rng)
+    ud = galsim.UniformDeviate(rng)
+    n = 50
+    u = np.empty(n)
+    v = np.empty(n)
+    t = np.empty(n)
+    ud.generate(u)
+    ud.generate(v)
+    ud.generate(t)
+    u -= 0.5
+    v -= 0.5
+    t *= 0.2
+
+    wf = screen.wavefront(u, v, t, theta0)
+    dwdu, dwdv = screen.wavefront_gradient(u, v, t, theta0)
+    for i in np.argsort(t):
+        screen._seek(t[i])
+        np.testing.assert_equal(wf[i], screen._wavefront(u[i:i+1], v[i:i+1], t[i:i+1], theta0))
+        ref_dwdu, ref_dwdv = screen._wavefront_gradient(u[i:i+1], v[i:i+1], t[i:i+1], theta0)
+        np.testing.assert_equal(dwdu[i], ref_dwdu)
+        np.testing.assert_equal(dwdv[i], ref_dwdv)
+
+    # Geometric photon shooting through boiling screens should also work.
+    screen._reset()
+    psf = galsim.PhaseScreenList(screen).makePSF(lam=500.0, diam=1.0, exptime=0.2)
+    photons = psf.shoot(1000, rng)
+    np.testing.assert_almost_equal(photons.getTotalFlux(), 1.0)
+
+
 @timer
 def test_phase_psf_batch():
     """Test that PSFs generated and drawn serially match those generated and drawn in batch."""
@@ -349,6 +576,38 @@ def test_phase_psf_batch():
             "Individually generated AtmosphericPSF differs from AtmosphericPSF generated in batch")
 
 
+@timer
+def test_phase_psf_batch_threads():
+    """Test that the batch size and number of threads used for batched PSFs don't change results."""
+    rng = galsim.BaseDeviate(5678)
+    atm = galsim.Atmosphere(screen_size=10.0, altitude=[0.0, 10.0], speed=[5.0, 10.0],
+                            time_step=0.01, rng=rng)
+    atm.append(galsim.OpticalScreen(diam=1.0, defocus=0.3, coma1=0.2))
+    theta = [(i*galsim.arcsec, -i*galsim.arcsec) for i in range(7)]
+    kwargs = dict(lam=700.0, exptime=0.05, time_step=0.01, diam=1.0)
+
+    psfs = [atm.makePSF(theta=th, **kwargs) for th in theta]
+    imgs = [psf.drawImage(nx=32, ny=32, scale=0.05) for psf in psfs]
+
+    atm._reset()
+    atm.nthreads = 3
+    atm.batch_size = 4
+    psfs = [atm.makePSF(theta=th, **kwargs) for th in theta]
+    more_imgs = [psf.drawImage(nx=32, ny=32, scale=0.05) for psf in psfs]
+
+    for img1, img2 in zip(imgs, more_imgs):
+        np.testing.assert_array_equal(
+            img1, img2,
+            "Threaded batch calculation of PSFs differs from unthreaded calculation")
+
+    # Also check that the vectorized wavefronts match those for each field angle individually.
+    u = np.linspace(-0.5, 0.5, 10)
+    v = np.linspace(0.5, -0.5, 10)
+    wfs = atm._wavefront_many(u, v, None, theta)
+    for th, wf in zip(theta, wfs):
+        np.testing.assert_array_almost_equal(wf, atm._wavefront(u, v, None, th), 12)
+
+
 @timer
 def test_opt_indiv_aberrations():
     """Test that aberrations specified by name match those specified in `aberrations` list."""
@@ -674,12 +933,18 @@ def test_speedup():
 
 if __name__ == "__main__":
     test_aperture()
+    test_aperture_cache()
     test_atm_screen_size()
     test_structure_function()
+    test_shared_screen()
+    test_screen_dtype_tiled()
     test_phase_screen_list()
     test_frozen_flow()
     test_phase_psf_reset()
+    test_precompute()
+    test_boiling_time_sorting()
     test_phase_psf_batch()
+    test_phase_psf_batch_threads()
     test_opt_indiv_aberrations()
     test_scale_unit()
     test_stepk_maxk()
@@ -313,8 +313,55 @@ def test_photon_io():
     np.testing.assert_array_equal(photons2.wavelength, photons.wavelength)
 
 
+@timer
+def test_shoot_into_buffer():
+    """Test shooting photons into a preallocated PhotonArray
+    """
+    nphotons = 1000
+
+    objs = [ galsim.Exponential(flux=1.7, scale_radius=2.3),
+             galsim.Gaussian(sigma=1.2).shear(g1=0.2, g2=-0.1).shift(0.3, 0.1),
+             galsim.Gaussian(sigma=1.2) + galsim.Exponential(half_light_radius=0.8),
+             galsim.Convolve(galsim.Exponential(flux=1.7, scale_radius=2.3),
+                             galsim.Moffat(beta=3.5, fwhm=0.9)) ]
+    for obj in objs:
+        photon_array = obj.shoot(nphotons, galsim.UniformDeviate(1234))
+        buf = galsim.PhotonArray(nphotons)
+        photon_array2 = obj.shoot(nphotons, galsim.UniformDeviate(1234), photons=buf)
+        assert photon_array2 is buf
+        np.testing.assert_array_equal(photon_array2.x, photon_array.x)
+        np.testing.assert_array_equal(photon_array2.y, photon_array.y)
+        np.testing.assert_array_equal(photon_array2.flux, photon_array.flux)
+
+        # Shooting again into the same buffer overwrites the old photons completely.
+        obj.shoot(nphotons, galsim.UniformDeviate(5678), photons=buf)
+        photon_array3 = obj.shoot(nphotons, galsim.UniformDeviate(5678))
+        np.testing.assert_array_equal(buf.x, photon_array3.x)
+        np.testing.assert_array_equal(buf.y, photon_array3.y)
+        np.testing.assert_array_equal(buf.flux, photon_array3.flux)
+
+        # The buffer must have the right size.
+        np.testing.assert_raises(ValueError, obj.shoot, nphotons, photons=galsim.PhotonArray(10))
+
+    # Drawing in several batches reuses one buffer, but gives the same image as drawing all the
+    # photons at once.  With 10 flux units per photon, the pixel values are exact.
+    obj = objs[1].withFlux(1.e4)
+    im1 = obj.drawImage(nx=64, ny=64, scale=0.3, method='phot', n_photons=nphotons,
+                        poisson_flux=False, rng=galsim.BaseDeviate(1234), dtype=np.float64)
+    im2 = obj.drawImage(nx=64, ny=64, scale=0.3, method='phot', n_photons=nphotons,
+                        poisson_flux=False, rng=galsim.BaseDeviate(1234), maxN=300,
+                        dtype=np.float64)
+    im3 = obj.drawImage(nx=64, ny=64, scale=0.3, method='phot', n_photons=nphotons,
+                        poisson_flux=False, rng=galsim.BaseDeviate(1234), maxN=300,
+                        dtype=np.int32)
+    np.testing.assert_almost_equal(im1.array.sum(), obj.flux, decimal=6)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    np.testing.assert_array_equal(im3.array, im1.array)
+
+
 if __name__ == '__main__':
     test_photon_array()
     test_wavelength_sampler()
     test_photon_angles()
     test_photon_io()
+    test_shoot_into_buffer()
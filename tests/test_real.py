@@ -462,6 +462,124 @@ def test_ne():
         do_pickle(crg1, irreprable=True)
         do_pickle(covspec1, irreprable=True)
 
+@timer
+def test_shared_preload():
+    """Check that the shared preload option gives the same images as reading the files."""
+    import pickle
+    preload_file = os.path.join('output', 'real_shared_preload.bin')
+    for f in [preload_file, preload_file + '.index.npz']:
+        if os.path.isfile(f):
+            os.remove(f)
+
+    rgc = galsim.RealGalaxyCatalog(catalog_file, dir=image_dir)
+    rgc1 = galsim.RealGalaxyCatalog(catalog_file, dir=image_dir, shared_preload=preload_file)
+    assert os.path.isfile(preload_file)
+    assert rgc1 == rgc
+    mtime = os.path.getmtime(preload_file)
+
+    # A second catalog (e.g. in another process) just uses the existing file.
+    rgc2 = galsim.RealGalaxyCatalog(catalog_file, dir=image_dir, shared_preload=preload_file)
+    assert os.path.getmtime(preload_file) == mtime
+    rgc3 = pickle.loads(pickle.dumps(rgc2))
+
+    for i in range(rgc.nobjects):
+        for cat in [rgc1, rgc2, rgc3]:
+            gal_im = cat.getGalImage(i)
+            psf_im = cat.getPSFImage(i)
+            np.testing.assert_array_equal(gal_im.array, rgc.getGalImage(i).array)
+            np.testing.assert_array_equal(psf_im.array, rgc.getPSFImage(i).array)
+            assert gal_im.scale == rgc.getGalImage(i).scale
+            # These are views into the shared file, so they can't be changed.
+            assert gal_im.isconst
+            assert psf_im.isconst
+            # And they keep the data type of the image files.
+            from galsim._pyfits import pyfits
+            with pyfits.open(rgc.gal_file_name[i]) as fits:
+                file_dtype = fits[rgc.gal_hdu[i]].data.dtype.type
+            assert gal_im.dtype == (np.float32 if file_dtype == np.float32 else np.float64)
+
+    gal = galsim.RealGalaxy(rgc2, index=ind_real)
+    gal_ref = galsim.RealGalaxy(rgc, index=ind_real)
+    np.testing.assert_array_equal(gal.drawImage(nx=32, ny=32, scale=0.2).array,
+                                  gal_ref.drawImage(nx=32, ny=32, scale=0.2).array)
+    rgc1.close()
+    rgc2.close()
+
+
+@timer
+def test_loaded_files_cache():
+    """Check that the open image files are kept in a bounded LRU cache."""
+    import pickle
+    cat_file = 'AEGIS_F814w_catalog.fits'
+    rgc = galsim.RealGalaxyCatalog(cat_file, dir=image_dir)
+    rgc1 = galsim.RealGalaxyCatalog(cat_file, dir=image_dir, max_open_files=1)
+    all_files = set(rgc.gal_file_name) | set(rgc.psf_file_name)
+    assert len(all_files) > 1
+
+    for i in range(rgc.nobjects):
+        for cat in [rgc, rgc1]:
+            cat.getGalImage(i)
+            cat.getPSFImage(i)
+        np.testing.assert_array_equal(rgc1.getGalImage(i).array, rgc.getGalImage(i).array)
+        np.testing.assert_array_equal(rgc1.getPSFImage(i).array, rgc.getPSFImage(i).array)
+        assert len(rgc1.loaded_files) == 1
+    assert len(rgc.loaded_files) == len(all_files)
+    assert rgc.loaded_files.misses == len(all_files)
+    assert rgc.loaded_files.evictions == 0
+    assert rgc.loaded_files.hits == 4*rgc.nobjects - len(all_files)
+    assert rgc1.loaded_files.evictions == rgc1.loaded_files.misses - 1
+    assert rgc1.loaded_files.hits + rgc1.loaded_files.misses == 4*rgc.nobjects
+    assert rgc.loaded_files.nbytes == sum([os.path.getsize(f) for f in all_files])
+
+    # The byte limit works the same way.
+    max_size = max([os.path.getsize(f) for f in all_files])
+    rgc2 = galsim.RealGalaxyCatalog(cat_file, dir=image_dir, max_loaded_bytes=max_size)
+    for i in range(rgc.nobjects):
+        np.testing.assert_array_equal(rgc2.getGalImage(i).array, rgc.getGalImage(i).array)
+        np.testing.assert_array_equal(rgc2.getPSFImage(i).array, rgc.getPSFImage(i).array)
+        assert rgc2.loaded_files.nbytes <= max_size
+    assert rgc2.loaded_files.evictions > 0
+
+    # Preloading removes the limits.
+    rgc3 = galsim.RealGalaxyCatalog(cat_file, dir=image_dir, max_open_files=1, preload=True)
+    assert len(rgc3.loaded_files) == len(all_files)
+    assert rgc3.loaded_files.evictions == 0
+
+    # Pickling keeps the limits, but not the open files.
+    rgc4 = pickle.loads(pickle.dumps(rgc1))
+    assert len(rgc4.loaded_files) == 0
+    assert rgc4.loaded_files.max_files == 1
+    rgc4.getGalImage(0)
+    rgc4.getPSFImage(0)
+    assert len(rgc4.loaded_files) == 1
+
+    for cat in [rgc, rgc1, rgc2, rgc3, rgc4]:
+        cat.close()
+        assert len(cat.loaded_files) == 0
+        assert cat.loaded_files.nbytes == 0
+
+    # Evicted files are closed, but not while they are still being read.
+    class File(object):
+        closed = False
+        def close(self): self.closed = True
+    cache = galsim.real._LoadedFiles(max_files=1)
+    names = sorted(all_files)
+    f1, f2, f3 = File(), File(), File()
+    cache[names[0]] = f1
+    cache[names[1]] = f2
+    assert f1.closed
+    assert not f2.closed
+    cache.use(f2)
+    cache[names[0]] = f3
+    assert names[1] not in cache
+    assert not f2.closed
+    cache.release(f2)
+    assert f2.closed
+    assert not f3.closed
+    cache.clear()
+    assert f3.closed
+
+
 @timer
 def test_noise():
     """Check consistency of noise-related routines."""
@@ -773,6 +891,8 @@ if __name__ == "__main__":
     test_crg_roundtrip()
     test_crg_roundtrip_larger_target_psf()
     test_ne()
+    test_shared_preload()
+    test_loaded_files_cache()
     test_noise()
     test_area_norm()
     test_crg_noise_draw_transform_commutativity()
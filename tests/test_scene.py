@@ -279,7 +279,103 @@ def test_cosmos_random():
         ud2.discard(n_rng_calls)
         assert ud()==ud2(), '_n_rng_calls kwarg did not give proper tracking of RNG calls'
 
+@timer
+def test_cosmos_batch():
+    """Check that making many parametric galaxies at once matches making them one at a time."""
+    cat = galsim.COSMOSCatalog(file_name='real_galaxy_catalog_23.5_example.fits',
+                               dir=datapath, exclusion_level='marginal')
+    indices = np.arange(cat.nobjects)
+    for sersic_prec in [0.05, 0.]:
+        gal_list = cat.makeGalaxy(indices, gal_type='parametric', sersic_prec=sersic_prec)
+        assert len(gal_list) == cat.nobjects
+        for i, gal in zip(indices, gal_list):
+            record = cat.getParametricRecord(i)
+            gal1 = galsim.COSMOSCatalog._buildParametric(record, sersic_prec, None, False)
+            assert gal == gal1, "Batched parametric galaxy %d is different"%i
+            assert gal.index == cat.getOrigIndex(i)
+            # Same as making just one galaxy.
+            assert gal == cat.makeGalaxy(i, gal_type='parametric', sersic_prec=sersic_prec)
+    assert cat.makeGalaxy([], gal_type='parametric') == []
+
+    # In chromatic mode, the SED normalizations are only computed once for each redshift, but
+    # in the same way as SED.withMagnitude, so the results are the same.
+    indices = indices[:20]
+    chrom_list = cat.makeGalaxy(indices, gal_type='parametric', chromatic=True)
+    bandpass = cat._bandpass
+    sed = cat._sed
+    for i, gal in zip(indices, chrom_list):
+        record = cat.getParametricRecord(i)
+        gal1 = galsim.COSMOSCatalog._buildParametric(record, 0.05, None, True, bandpass, sed)
+        assert gal == gal1, "Batched chromatic parametric galaxy %d is different"%i
+        assert gal.calculateFlux(bandpass) == gal1.calculateFlux(bandpass)
+    # The bandpass and SEDs are shared between calls.
+    cat.makeGalaxy(indices, gal_type='parametric', chromatic=True)
+    assert cat._bandpass is bandpass
+    assert cat._sed is sed
+
+
+@timer
+def test_cosmos_cache():
+    """Check that the cache_dir option gives the same catalog as reading the files."""
+    import shutil
+    cache_dir = os.path.join('output', 'cosmos_cache')
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+
+    kwargs = dict(file_name='real_galaxy_catalog_23.5_example.fits', dir=datapath,
+                  exclusion_level='marginal', min_hlr=0.1, max_flux=500.)
+    cat = galsim.COSMOSCatalog(**kwargs)
+    cat1 = galsim.COSMOSCatalog(cache_dir=cache_dir, **kwargs)
+    assert len(os.listdir(cache_dir)) == 2
+    # The second one reads from the cache.
+    cat2 = galsim.COSMOSCatalog(cache_dir=cache_dir, **kwargs)
+    assert len(os.listdir(cache_dir)) == 2
+    for c in [cat1, cat2]:
+        assert c.nobjects == cat.nobjects
+        assert c.getNTot() == cat.getNTot()
+        np.testing.assert_array_equal(c.orig_index, cat.orig_index)
+        np.testing.assert_array_equal(c.param_cat['sersicfit'], cat.param_cat['sersicfit'])
+        assert hasattr(c, 'real_cat')
+        # The cached catalog should have the same attributes as the fresh one.
+        assert sorted(vars(c)) == sorted(vars(cat))
+        assert c.use_sample == cat.use_sample
+        np.testing.assert_array_equal(c.selection_cat, cat.selection_cat)
+        gal = c.makeGalaxy(index=[0,1], gal_type='parametric')
+        gal_ref = cat.makeGalaxy(index=[0,1], gal_type='parametric')
+        assert gal == gal_ref
+        assert gal[0].index == gal_ref[0].index
+        assert c.selectRandomIndex(5, rng=galsim.BaseDeviate(123)).tolist() == \
+                cat.selectRandomIndex(5, rng=galsim.BaseDeviate(123)).tolist()
+
+    # Different selection criteria share the parametric catalog, but not the indices.
+    kwargs['min_hlr'] = 0.
+    cat3 = galsim.COSMOSCatalog(cache_dir=cache_dir, **kwargs)
+    assert len(os.listdir(cache_dir)) == 3
+    assert cat3.nobjects >= cat.nobjects
+    assert cat3.nobjects == galsim.COSMOSCatalog(**kwargs).nobjects
+
+    # use_real=False doesn't make the stamp flux cut, so it also gets its own indices.
+    cat4 = galsim.COSMOSCatalog(cache_dir=cache_dir, use_real=False, **kwargs)
+    assert not hasattr(cat4, 'real_cat')
+    assert cat4.nobjects == galsim.COSMOSCatalog(use_real=False, **kwargs).nobjects
+    assert len(os.listdir(cache_dir)) == 4
+    cat5 = galsim.COSMOSCatalog(cache_dir=cache_dir, use_real=False, **kwargs)
+    np.testing.assert_array_equal(cat5.orig_index, cat4.orig_index)
+    assert len(os.listdir(cache_dir)) == 4
+    assert sorted(vars(cat5)) == sorted(vars(cat4))
+
+    # Without the selection criteria, there is no selection_cat on either path.
+    kwargs['exclusion_level'] = 'none'
+    cat6 = galsim.COSMOSCatalog(cache_dir=cache_dir, **kwargs)
+    cat7 = galsim.COSMOSCatalog(cache_dir=cache_dir, **kwargs)
+    assert not hasattr(cat6, 'selection_cat')
+    assert sorted(vars(cat7)) == sorted(vars(cat6))
+    np.testing.assert_array_equal(cat7.orig_index, cat6.orig_index)
+
+
 if __name__ == "__main__":
     test_cosmos_basic()
     test_cosmos_fluxnorm()
     test_cosmos_random()
+    test_cosmos_batch()
+    test_cosmos_cache()
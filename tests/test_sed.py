@@ -571,6 +571,52 @@ def test_redshift_calculateFlux():
             print('z = {} flux = {}'.format(z, sedz.calculateFlux(bp)))
 
 
+@timer
+def test_calculateFluxes():
+    """Check that the batched flux and magnitude calculations match the one at a time ones."""
+    seds = [ galsim.SED(os.path.join(sedpath, 'CWW_E_ext.sed'), wave_type='Ang',
+                        flux_type='flambda'),
+             galsim.SED(os.path.join(sedpath, 'CWW_Sbc_ext.sed'), wave_type='Ang',
+                        flux_type='flambda').atRedshift(0.3) * 2.,
+             galsim.SED('wave**-1.5', wave_type='nm', flux_type='fphotons') ]
+    bands = [ galsim.Bandpass(os.path.join(bppath, 'LSST_%s.dat'%f), 'nm').withZeropoint('AB')
+              for f in 'griz' ]
+    bands.append(galsim.Bandpass('1', 'nm', blue_limit=600., red_limit=700.).withZeropoint(25.))
+    zs = [0., 0.1, 0.77, 1.5]
+
+    fluxes = galsim.sed.calculateFluxes(seds, bands, zs)
+    mags = galsim.sed.calculateMagnitudes(seds, bands, zs)
+    assert fluxes.shape == (3, 4, 5)
+    assert mags.shape == (3, 4, 5)
+    for i, sed in enumerate(seds):
+        for k, z in enumerate(zs):
+            sedz = sed.atRedshift(z)
+            for j, bp in enumerate(bands):
+                np.testing.assert_allclose(fluxes[i,k,j], sedz.calculateFlux(bp), rtol=1.e-3,
+                                           err_msg="calculateFluxes disagrees with calculateFlux")
+                np.testing.assert_allclose(mags[i,k,j], sedz.calculateMagnitude(bp), atol=1.e-3,
+                                           err_msg="calculateMagnitudes disagrees with "
+                                           "calculateMagnitude")
+
+    # Without redshifts, use the SEDs as they are.
+    fluxes = galsim.sed.calculateFluxes(seds, bands, wave_step=0.5)
+    assert fluxes.shape == (3, 5)
+    for i, sed in enumerate(seds):
+        for j, bp in enumerate(bands):
+            np.testing.assert_allclose(fluxes[i,j], sed.calculateFlux(bp), rtol=1.e-4)
+
+    try:
+        # SED doesn't cover the bandpass at high redshift
+        np.testing.assert_raises(ValueError, galsim.sed.calculateFluxes, seds[:1], bands, [100.])
+        np.testing.assert_raises(ValueError, galsim.sed.calculateFluxes, seds, bands, [-1.])
+        np.testing.assert_raises(TypeError, galsim.sed.calculateFluxes,
+                                 [galsim.SED('1', 'nm', '1')], bands)
+        np.testing.assert_raises(RuntimeError, galsim.sed.calculateMagnitudes, seds,
+                                 [galsim.Bandpass(os.path.join(bppath, 'LSST_r.dat'), 'nm')])
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_SED_calculateDCRMomentShifts():
     # compute some moment shifts
@@ -631,12 +677,18 @@ def test_SED_sampleWavelength():
                                'nm')
     sedbp = sed*bandpass
 
+    # Start with an empty cache of wavelength tables.
+    cache = galsim.sed._wavelength_table_cache
+    cache.resize(0)
+    cache.resize(100)
+    def ntables():
+        return len([ k for k in cache.cache if isinstance(k, tuple) ])
+
     out = sed.sampleWavelength(3,None)
-    np.testing.assert_equal(hasattr(sed,'deviate'),True,"Creating SED deviate cache failed.")
-    np.testing.assert_equal(len(sed.deviate),1,"Creating SED deviate failed.")
+    np.testing.assert_equal(ntables(),1,"Creating SED wavelength table failed.")
 
     out = sed.sampleWavelength(3,None,rng=seed)
-    np.testing.assert_equal(len(sed.deviate),1,"Accessing existing SED deviate failed.")
+    np.testing.assert_equal(ntables(),1,"Accessing existing SED wavelength table failed.")
 
     test0 = np.array([ 4.15562438,  4.737775  ,  1.93594078])
     np.testing.assert_array_almost_equal(out,test0,8,"Unexpected SED sample values.")
@@ -645,13 +697,13 @@ def test_SED_sampleWavelength():
     np.testing.assert_array_almost_equal(out,test0,8,"Failed to pass 'UniformDeviate'.")
 
     out = sed.sampleWavelength(3,bandpass,rng=seed)
-    np.testing.assert_equal(len(sed.deviate),2,"Creating new SED deviate failed.")
+    np.testing.assert_equal(ntables(),2,"Creating new SED wavelength table failed.")
 
     test1 = np.array([ 4.16227593,  4.6166918 ,  2.95075946])
     np.testing.assert_array_almost_equal(out,test1,8,"Unexpected SED sample values.")
 
     out = sed.sampleWavelength(1e3,bandpass,rng=seed,npoints=256)
-    np.testing.assert_equal(len(sed.deviate),2,"Unexpected number of SED deviates.")
+    np.testing.assert_equal(ntables(),2,"Unexpected number of SED wavelength tables.")
     np.testing.assert_equal(len(out),1e3,"Unexpected number of SED samples.")
 
     np.testing.assert_equal(np.sum(out > sedbp.red_limit),0,
@@ -660,7 +712,7 @@ def test_SED_sampleWavelength():
                             "SED sample outside of function bounds.")
 
     out2 = sed.sampleWavelength(1e3,bandpass,rng=seed,npoints=512)
-    np.testing.assert_equal(len(sed.deviate),3,"Unexpected number of SED deviates.")
+    np.testing.assert_equal(ntables(),3,"Unexpected number of SED wavelength tables.")
     np.testing.assert_almost_equal(out,out2,0,"SED samples using different npoints don't match "
                                    "to the nearest integer.")
 
@@ -711,6 +763,24 @@ def test_SED_sampleWavelength():
     np.testing.assert_almost_equal(cdf1, cdf2, 2,
                                    "Sampled CDF does not match input redshifted SED.")
 
+    # SEDs that differ only in normalization and redshift share the rest-frame table.
+    ntab = ntables()
+    sed2 = (sed * 3.7).atRedshift(0.7)
+    out2 = sed2.sampleWavelength(1e3,None,rng=seed)
+    np.testing.assert_almost_equal(out2/1.7, out[:1000], 10,
+                                   "Rescaled, redshifted SED samples don't match.")
+    np.testing.assert_equal(ntables(), ntab, "Rest-frame wavelength table was not reused.")
+
+    # With a bandpass, the normalization still doesn't matter, but the redshift does.
+    out3 = sed.withFlux(2.3, bandpass).sampleWavelength(3,bandpass,rng=seed)
+    np.testing.assert_array_almost_equal(out3,test1,8,"Rescaled SED samples don't match.")
+    np.testing.assert_equal(ntables(), ntab, "Rescaled SED wavelength table was not reused.")
+    sed2.sampleWavelength(3,bandpass,rng=seed)
+    np.testing.assert_equal(ntables(), ntab+1, "Redshifted SED made no new wavelength table.")
+
+    # Pickling an SED after sampling from it should still work.
+    do_pickle(sed2)
+
 
 @timer
 def test_fnu_vs_flambda():
@@ -810,6 +880,7 @@ if __name__ == "__main__":
     test_SED_withFluxDensity()
     test_SED_calculateMagnitude()
     test_redshift_calculateFlux()
+    test_calculateFluxes()
     test_SED_calculateDCRMomentShifts()
     test_SED_calculateSeeingMomentRatio()
     test_SED_sampleWavelength()
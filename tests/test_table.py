@@ -544,6 +544,85 @@ def test_table2d_gradient():
     np.testing.assert_array_equal(0.0, test_dfdy[:,:,1])
 
 
+@timer
+def test_table2d_spline():
+    """Check LookupTable2D with interpolant='spline'
+    """
+    def f(x_, y_):
+        return np.sin(x_) * np.cos(y_) + x_
+    def dfdx(x_, y_):
+        return np.cos(x_) * np.cos(y_) + 1.
+    def dfdy(x_, y_):
+        return -np.sin(x_) * np.sin(y_)
+
+    # Use a much coarser grid than in test_table2d_gradient.
+    x = np.linspace(0.1, 3.3, 40)
+    y = np.linspace(0.2, 10.4, 50)
+    yy, xx = np.meshgrid(y, x)
+    z = f(xx, yy)
+
+    tab2d = galsim.LookupTable2D(x, y, z, interpolant='spline')
+    lin2d = galsim.LookupTable2D(x, y, z)
+    do_pickle(tab2d)
+    do_pickle(tab2d.table)
+
+    newx = np.linspace(0.2, 3.1, 45)
+    newy = np.linspace(0.3, 10.1, 85)
+    newyy, newxx = np.meshgrid(newy, newx)
+
+    # The spline goes through the grid points exactly.
+    np.testing.assert_array_almost_equal(tab2d(xx, yy), z, decimal=12)
+
+    # And it is much more accurate than linear interpolation in between them.
+    ref = f(newxx, newyy)
+    np.testing.assert_array_almost_equal(tab2d(newxx, newyy), ref, decimal=3)
+    assert np.max(np.abs(tab2d(newxx, newyy)-ref)) < 0.2 * np.max(np.abs(lin2d(newxx, newyy)-ref))
+    np.testing.assert_array_almost_equal(tab2d(newxx, newyy),
+                                         np.array([[tab2d(x0, y0) for y0 in newy]
+                                                   for x0 in newx]))
+
+    # The gradient is analytic, so it should match finite differences of the spline.
+    test_dfdx, test_dfdy = tab2d.gradient(newxx, newyy)
+    h = 1.e-6
+    np.testing.assert_array_almost_equal(
+            test_dfdx, (tab2d(newxx+h, newyy) - tab2d(newxx-h, newyy))/(2*h), decimal=6)
+    np.testing.assert_array_almost_equal(
+            test_dfdy, (tab2d(newxx, newyy+h) - tab2d(newxx, newyy-h))/(2*h), decimal=6)
+    np.testing.assert_allclose(test_dfdx, dfdx(newxx, newyy), atol=0.02)
+    np.testing.assert_allclose(test_dfdy, dfdy(newxx, newyy), atol=0.02)
+    x1,y1 = 1.1, 4.9
+    np.testing.assert_allclose(tab2d.gradient(x1,y1), (dfdx(x1,y1), dfdy(x1,y1)), atol=0.02)
+
+    # Check wrapping with a periodic function.  The spline should be smooth across the seam.
+    def g(x_, y_):
+        return np.sin(x_) * np.cos(2*y_)
+    x = np.linspace(0, 2*np.pi, 30, endpoint=False)
+    y = np.linspace(0, 2*np.pi, 40, endpoint=False)
+    yy, xx = np.meshgrid(y, x)
+    tab2d = galsim.LookupTable2D(x, y, g(xx, yy), interpolant='spline', edge_mode='wrap')
+    do_pickle(tab2d)
+    np.testing.assert_array_almost_equal(tab2d(newxx-8*np.pi, newyy+6*np.pi),
+                                         g(newxx, newyy), decimal=2)
+    np.testing.assert_array_almost_equal(tab2d(newxx, newyy),
+                                         tab2d(newxx+3*tab2d.xperiod, newyy-2*tab2d.yperiod))
+    seam = np.array([-1.e-8, 1.e-8])
+    np.testing.assert_array_almost_equal(tab2d.gradient(seam, [1., 1.])[0],
+                                         [np.cos(0.)*np.cos(2.)]*2, decimal=2)
+
+    # And constant edge_mode.
+    tab2d = galsim.LookupTable2D(x, y, g(xx, yy), interpolant='spline', edge_mode='constant',
+                                 constant=3)
+    np.testing.assert_array_equal(tab2d([-1., 10.], [1., 1.]), [3., 3.])
+    np.testing.assert_array_equal(tab2d.gradient(np.array([-1., 10.]), np.array([1., 1.])),
+                                  [[0., 0.], [0., 0.]])
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.LookupTable2D, x, y, g(xx, yy),
+                                 interpolant='cubic')
+    except ImportError:
+        print('The assert_raises tests require nose')
+
+
 @timer
 def test_ne():
     """ Check that inequality works as expected."""
@@ -561,6 +640,50 @@ def test_ne():
     all_obj_diff(lts)
 
 
+@timer
+def test_periodic_table2d():
+    """Test the fast constructor for periodic LookupTable2Ds that share memory with their input."""
+    x = np.linspace(0, 2*np.pi, 20, endpoint=False)
+    y = np.linspace(0, 2*np.pi, 30, endpoint=False)
+    f = np.sin(x)[:,np.newaxis] * np.cos(2*y)
+    tab2d = galsim.LookupTable2D(x, y, f, edge_mode='wrap')
+
+    fpad = np.pad(f, [(0,1), (0,1)], mode='wrap')
+    tab2d_fast = galsim.table._PeriodicLookupTable2D(tab2d.x, tab2d.y, fpad)
+    assert tab2d == tab2d_fast
+    xx = np.linspace(-10, 10, 37)
+    yy = np.linspace(12, -8, 37)
+    np.testing.assert_array_equal(tab2d(xx, yy), tab2d_fast(xx, yy))
+    # Note: the repr of a wrapped table doesn't round trip, since the table is padded again.
+    do_pickle(tab2d_fast, irreprable=True)
+    do_pickle(tab2d_fast, lambda t: t(1.1, 2.2), irreprable=True)
+
+    # The fast version doesn't copy f, so changes to f show up in the table.
+    assert tab2d_fast.f is fpad
+    fpad *= 2
+    np.testing.assert_array_almost_equal(tab2d_fast(xx, yy), 2*tab2d(xx, yy))
+
+    # But the public constructor does copy f, including when no padding is needed.
+    f2 = f.copy()
+    tab2d_raise = galsim.LookupTable2D(x, y, f2)
+    assert not np.may_share_memory(tab2d_raise.f, f2)
+    f2 *= 2
+    np.testing.assert_array_equal(tab2d_raise.f, f)
+
+    # float32 values are kept as float32, still without a copy.
+    f32 = (fpad/2).astype(np.float32)
+    tab2d_f32 = galsim.table._PeriodicLookupTable2D(tab2d.x, tab2d.y, f32)
+    assert tab2d_f32.f is f32
+    assert isinstance(tab2d_f32.table, galsim._galsim._LookupTable2DF)
+    assert tab2d_f32(xx, yy).dtype == np.float32
+    np.testing.assert_allclose(tab2d_f32(xx, yy), tab2d(xx, yy), rtol=0, atol=1.e-6)
+    np.testing.assert_allclose(tab2d_f32.gradient(xx, yy), tab2d.gradient(xx, yy),
+                               rtol=0, atol=1.e-5)
+    assert tab2d_f32 != tab2d_fast
+    do_pickle(tab2d_f32.table)
+    do_pickle(tab2d_f32, lambda t: t(1.1, 2.2), irreprable=True)
+
+
 if __name__ == "__main__":
     test_table()
     test_init()
@@ -569,4 +692,6 @@ if __name__ == "__main__":
     test_roundoff()
     test_table2d()
     test_table2d_gradient()
+    test_table2d_spline()
+    test_periodic_table2d()
     test_ne()